@@ -0,0 +1,286 @@
+"""Non-GUI building blocks used by the Brickadia Mod Loader"""
+from .errors import (
+    ModLoaderError,
+    ModNotFoundError,
+    ModStateError,
+    ProfileNotFoundError,
+    UE4SSMissingError,
+)
+from .archive import (
+    ARCHIVE_EXTENSIONS,
+    ArchiveError,
+    ArchiveMember,
+    ModArchive,
+    find_member,
+    safe_relative_path,
+    setup_winrar,
+)
+from .manifest import (
+    MOD_TYPE_PAK,
+    MOD_TYPE_UE4SS,
+    ArchiveManifest,
+    PakGroup,
+)
+from .record import FIELD_DEFAULTS, ModRecord, ModType, encode_record, records_from_dicts
+from .installer import InstallResult, allocate_mod_folder, install_archive
+from .install_queue import (
+    EVENT_FAILED,
+    EVENT_FINISHED,
+    EVENT_PROGRESS,
+    EVENT_STARTED,
+    InstallEvent,
+    InstallQueue,
+)
+from .blobstore import STORE_DIR_NAME, BlobStore, hash_file, hash_stream
+from .deploy import (
+    DEPLOY_AUTO,
+    DEPLOY_COPY,
+    DEPLOY_HARDLINK,
+    DEPLOY_REFLINK,
+    DEPLOY_STRATEGIES,
+    DEPLOY_SYMLINK,
+    LOAD_ORDER_WIDTH,
+    MODS_DIR_NAME,
+    DeploymentError,
+    deploy_file,
+    deploy_mod,
+    deploy_target,
+    game_base_path,
+    is_deployed,
+    mods_folder,
+    normalize_game_paths,
+    order_folder,
+    remove_deployed,
+    remove_empty_folders,
+    ue4ss_dll_path,
+    undeploy_mod,
+)
+from .database import (
+    BACKEND_JSON,
+    BACKEND_SQLITE,
+    DATABASE_BACKENDS,
+    ModDatabase,
+    open_database,
+)
+from .fingerprint import (
+    FINGERPRINT_FILE_NAME,
+    PARTIAL_HASH_BYTES,
+    FingerprintCache,
+    partial_hash_file,
+    stat_fingerprint,
+)
+from .journal import (
+    ACTION_DEPLOY,
+    ACTION_REORDER,
+    ACTION_UNDEPLOY,
+    JOURNAL_FILE_NAME,
+    DeploymentJournal,
+    JournalTransaction,
+)
+from .loadorder import (
+    LOAD_ORDER_STEP,
+    assign_order_keys,
+    enabled_in_order,
+    materialize_order,
+    next_order_key,
+    order_in_place,
+    order_sort_key,
+)
+from .pak import PAK_MAGIC, PakError, asset_path, read_pak_index
+from .iostore import UTOC_MAGIC, IoStoreToc, read_utoc
+from .conflicts import (
+    ASSET_INDEX_FILE_NAME,
+    CONTAINER_EXTENSIONS,
+    AssetIndexCache,
+    find_asset_conflicts,
+    read_assets,
+)
+from .modinfo import MODINFO_FILE_NAME, LoadRules, ModInfoCache, name_list
+from .dependencies import (
+    DEPENDENCY_FIELDS,
+    DependencyError,
+    DependencyGraph,
+    Requirement,
+    Resolution,
+    VersionRange,
+    dependency_fields,
+    parse_requirements,
+    parse_version,
+)
+from .solver import LoadOrderSolution, solve_load_order
+from .planner import DeploymentPlan, PlanResult, apply_plan, plan_deployment
+
+from .duplicates import (
+    DUPLICATE_FILE,
+    DUPLICATE_HASH,
+    DUPLICATE_NAME,
+    IGNORED_FILE_NAMES,
+    IGNORED_FILE_SUFFIXES,
+    DuplicateIndex,
+    find_duplicates,
+    find_identical_files,
+    is_ignored_file,
+)
+from .profiles import PROFILES_FILE_NAME, ProfileStore
+from .search import SearchIndex, normalize
+from .sqlitedb import SQLITE_FILE_NAME, SQLiteModDatabase, SQLiteProfileStore
+from .thumbnails import (
+    ORDER_ICON_SIZE,
+    THUMBNAIL_DIR_NAME,
+    THUMBNAIL_SIZES,
+    TREE_ICON_SIZE,
+    ThumbnailCache,
+)
+from .manager import (
+    EVENT_DEPLOY_PROGRESS,
+    EVENT_INSTALL_PROGRESS,
+    EVENT_MOD_DELETED,
+    EVENT_MOD_DISABLED,
+    EVENT_MOD_ENABLED,
+    EVENT_MOD_INSTALLED,
+    ManagerEvent,
+    ModManager,
+    is_ue4ss_mod,
+)
+
+__all__ = [
+    'ModLoaderError',
+    'ModNotFoundError',
+    'ModStateError',
+    'ProfileNotFoundError',
+    'UE4SSMissingError',
+    'ARCHIVE_EXTENSIONS',
+    'ArchiveError',
+    'ArchiveMember',
+    'ModArchive',
+    'find_member',
+    'safe_relative_path',
+    'setup_winrar',
+    'MOD_TYPE_PAK',
+    'MOD_TYPE_UE4SS',
+    'ArchiveManifest',
+    'PakGroup',
+    'FIELD_DEFAULTS',
+    'ModRecord',
+    'ModType',
+    'encode_record',
+    'records_from_dicts',
+    'InstallResult',
+    'allocate_mod_folder',
+    'install_archive',
+    'EVENT_FAILED',
+    'EVENT_FINISHED',
+    'EVENT_PROGRESS',
+    'EVENT_STARTED',
+    'InstallEvent',
+    'InstallQueue',
+    'STORE_DIR_NAME',
+    'BlobStore',
+    'hash_file',
+    'hash_stream',
+    'DEPLOY_AUTO',
+    'DEPLOY_COPY',
+    'DEPLOY_HARDLINK',
+    'DEPLOY_REFLINK',
+    'DEPLOY_STRATEGIES',
+    'DEPLOY_SYMLINK',
+    'LOAD_ORDER_WIDTH',
+    'MODS_DIR_NAME',
+    'DeploymentError',
+    'deploy_file',
+    'deploy_mod',
+    'deploy_target',
+    'game_base_path',
+    'is_deployed',
+    'mods_folder',
+    'normalize_game_paths',
+    'order_folder',
+    'remove_deployed',
+    'remove_empty_folders',
+    'ue4ss_dll_path',
+    'undeploy_mod',
+    'BACKEND_JSON',
+    'BACKEND_SQLITE',
+    'DATABASE_BACKENDS',
+    'ModDatabase',
+    'open_database',
+    'FINGERPRINT_FILE_NAME',
+    'PARTIAL_HASH_BYTES',
+    'FingerprintCache',
+    'partial_hash_file',
+    'stat_fingerprint',
+    'ACTION_DEPLOY',
+    'ACTION_REORDER',
+    'ACTION_UNDEPLOY',
+    'JOURNAL_FILE_NAME',
+    'DeploymentJournal',
+    'JournalTransaction',
+    'LOAD_ORDER_STEP',
+    'assign_order_keys',
+    'enabled_in_order',
+    'materialize_order',
+    'next_order_key',
+    'order_in_place',
+    'order_sort_key',
+    'PAK_MAGIC',
+    'PakError',
+    'asset_path',
+    'read_pak_index',
+    'UTOC_MAGIC',
+    'IoStoreToc',
+    'read_utoc',
+    'ASSET_INDEX_FILE_NAME',
+    'CONTAINER_EXTENSIONS',
+    'AssetIndexCache',
+    'find_asset_conflicts',
+    'read_assets',
+    'MODINFO_FILE_NAME',
+    'LoadRules',
+    'ModInfoCache',
+    'name_list',
+    'DEPENDENCY_FIELDS',
+    'DependencyError',
+    'DependencyGraph',
+    'Requirement',
+    'Resolution',
+    'VersionRange',
+    'dependency_fields',
+    'parse_requirements',
+    'parse_version',
+    'LoadOrderSolution',
+    'solve_load_order',
+    'DeploymentPlan',
+    'PlanResult',
+    'apply_plan',
+    'plan_deployment',
+    'DUPLICATE_FILE',
+    'DUPLICATE_HASH',
+    'DUPLICATE_NAME',
+    'IGNORED_FILE_NAMES',
+    'IGNORED_FILE_SUFFIXES',
+    'DuplicateIndex',
+    'find_duplicates',
+    'find_identical_files',
+    'is_ignored_file',
+    'PROFILES_FILE_NAME',
+    'ProfileStore',
+    'SearchIndex',
+    'normalize',
+    'SQLITE_FILE_NAME',
+    'SQLiteModDatabase',
+    'SQLiteProfileStore',
+    'ORDER_ICON_SIZE',
+    'THUMBNAIL_DIR_NAME',
+    'THUMBNAIL_SIZES',
+    'TREE_ICON_SIZE',
+    'ThumbnailCache',
+    'EVENT_DEPLOY_PROGRESS',
+    'EVENT_INSTALL_PROGRESS',
+    'EVENT_MOD_DELETED',
+    'EVENT_MOD_DISABLED',
+    'EVENT_MOD_ENABLED',
+    'EVENT_MOD_INSTALLED',
+    'ManagerEvent',
+    'ModManager',
+    'is_ue4ss_mod',
+]
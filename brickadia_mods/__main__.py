@@ -0,0 +1,6 @@
+"""python -m brickadia_mods: run the brickadia-mods command line"""
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,213 @@
+"""Streaming access to .zip and .rar mod archives"""
+import fnmatch
+import os
+import shutil
+import subprocess
+import time
+import zipfile
+from pathlib import Path, PurePosixPath
+
+import rarfile
+
+from .errors import ModLoaderError
+
+# Read/write buffer used when streaming members out of an archive
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# Suffix for files that are still being written
+STAGING_SUFFIX = ".part"
+
+ARCHIVE_EXTENSIONS = ('.zip', '.rar')
+
+
+def setup_winrar():
+    """Find and set WinRAR executable path"""
+    possible_paths = [
+        r"C:\Program Files\WinRAR\UnRAR.exe",
+        r"C:\Program Files (x86)\WinRAR\UnRAR.exe",
+        r"C:\Program Files\WinRAR\Rar.exe",
+        r"C:\Program Files (x86)\WinRAR\Rar.exe",
+    ]
+
+    for path in possible_paths:
+        if os.path.exists(path):
+            rarfile.UNRAR_TOOL = path
+            return True
+
+    # Check if unrar is in PATH
+    try:
+        subprocess.run(['unrar'], capture_output=True)
+        return True
+    except OSError:
+        pass
+
+    return False
+
+
+class ArchiveError(ModLoaderError):
+    """Raised when an archive can't be opened or contains unsafe entries"""
+
+
+class ArchiveMember:
+    """A single file entry from an archive's central directory"""
+    __slots__ = ('name', 'size', 'crc', 'info')
+
+    def __init__(self, name, size, crc, info):
+        self.name = name
+        self.size = size
+        self.crc = crc
+        self.info = info
+
+    @property
+    def path(self):
+        return PurePosixPath(self.name)
+
+    @property
+    def basename(self):
+        return self.path.name
+
+    def __repr__(self):
+        return f"ArchiveMember({self.name!r}, {self.size})"
+
+
+def safe_relative_path(name):
+    """Turn an archive member name into a relative path that stays inside its target folder"""
+    parts = [p for p in PurePosixPath(name.replace('\\', '/')).parts if p not in ('', '.')]
+    if not parts or parts[0].endswith(':') or name.startswith('/') or '..' in parts:
+        raise ArchiveError(f"Unsafe path in archive: {name}")
+    return Path(*parts)
+
+
+def move_into_place(staging, destination):
+    """os.replace staging onto destination, dropping staging if both already are the same file
+
+    Renaming a hardlink onto another link to the same file does nothing on
+    POSIX, which would leave the staging name behind.
+    """
+    try:
+        same = os.path.samestat(os.lstat(staging), os.lstat(destination))
+    except OSError:
+        same = False
+    if same:
+        os.remove(staging)
+    else:
+        os.replace(staging, destination)
+
+
+def find_member(members, pattern):
+    """Find a member the way Path.rglob(pattern) would, preferring the shallowest match"""
+    pattern_parts = [p for p in PurePosixPath(pattern.replace('\\', '/')).parts if p not in ('', '.', '/')]
+    if not pattern_parts:
+        return None
+    pattern_parts = [p.lower() for p in pattern_parts]
+    count = len(pattern_parts)
+
+    matches = []
+    for member in members:
+        parts = [p.lower() for p in member.path.parts]
+        if len(parts) < count:
+            continue
+        if all(fnmatch.fnmatchcase(part, pat) for part, pat in zip(parts[-count:], pattern_parts)):
+            matches.append((len(parts), member))
+    if not matches:
+        return None
+    return min(matches, key=lambda item: item[0])[1]
+
+
+class ModArchive:
+    """Read-only view over a mod archive that extracts members on demand"""
+
+    def __init__(self, archive_path):
+        self.path = str(archive_path)
+        lower = self.path.lower()
+        if lower.endswith('.zip'):
+            self._archive = zipfile.ZipFile(self.path, 'r')
+        elif lower.endswith('.rar'):
+            self._archive = rarfile.RarFile(self.path, 'r')
+        else:
+            raise ArchiveError(f"File must be .zip or .rar\n{self.path}")
+        self._members = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self._archive.close()
+
+    def members(self):
+        """List the file entries of the archive without decompressing anything"""
+        if self._members is None:
+            members = []
+            for info in self._archive.infolist():
+                if info.is_dir():
+                    continue
+                members.append(ArchiveMember(info.filename.replace('\\', '/'),
+                                             info.file_size, info.CRC, info))
+            self._members = members
+        return self._members
+
+    def read(self, member):
+        """Read a (small) member fully into memory"""
+        return self._archive.read(member.info)
+
+    def open(self, member):
+        """Open a member for streaming reads"""
+        return self._archive.open(member.info)
+
+    def extract_to(self, member, destination, staging=True):
+        """Stream one member to destination in a single pass
+
+        With staging enabled the data goes to a temporary name next to the
+        destination first and is moved into place with os.replace, so a
+        half-written file never appears under its final name.
+        """
+        destination = Path(destination)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        target = destination.with_name(destination.name + STAGING_SUFFIX) if staging else destination
+
+        try:
+            with self.open(member) as src, open(target, 'wb') as dst:
+                shutil.copyfileobj(src, dst, STREAM_CHUNK_SIZE)
+            self._apply_mtime(member, target)
+            if staging:
+                os.replace(target, destination)
+        except BaseException:
+            try:
+                os.remove(target)
+            except OSError:
+                pass
+            raise
+        return destination
+
+    def extract_members(self, plan, staging=True, progress=None):
+        """Stream a list of (member, destination) pairs, reading the archive front to back
+
+        progress, if given, is called as progress(done, total, member) after
+        each member is written.
+        """
+        ordered = self.ordered(plan)
+        written = []
+        for member, destination in ordered:
+            written.append(self.extract_to(member, destination, staging))
+            if progress:
+                progress(len(written), len(ordered), member)
+        return written
+
+    @staticmethod
+    def ordered(plan):
+        """Sort (member, destination) pairs by their position in the archive"""
+        return sorted(plan, key=lambda item: getattr(item[0].info, 'header_offset', 0) or 0)
+
+    def _apply_mtime(self, member, target):
+        """Keep the archived modification time like extractall + copy2 did"""
+        date_time = member.info.date_time
+        if not date_time:
+            return
+        try:
+            mtime = time.mktime(tuple(date_time) + (0, 0, -1))
+            os.utime(target, (mtime, mtime))
+        except (OverflowError, ValueError, OSError):
+            pass
@@ -0,0 +1,229 @@
+"""Content-addressed file store with hardlinked mod folders"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+from .archive import STAGING_SUFFIX, STREAM_CHUNK_SIZE, move_into_place
+
+# Folder inside the mods storage that holds the store
+STORE_DIR_NAME = ".store"
+
+
+def hash_stream(src):
+    """SHA-256 of everything left in a binary stream"""
+    digest = hashlib.sha256()
+    while True:
+        chunk = src.read(STREAM_CHUNK_SIZE)
+        if not chunk:
+            break
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_file(path):
+    """SHA-256 of a file on disk"""
+    with open(path, 'rb') as f:
+        return hash_stream(f)
+
+
+class BlobStore:
+    """Stores every file once under its SHA-256 and hands out hardlinks to it
+
+    Mod folders hold hardlinks into the store, so identical files installed
+    by different mods (or installed twice) take disk space once. When a
+    hardlink isn't possible the file is copied instead, which keeps mod
+    folders complete on their own either way.
+
+    Archive members are also remembered by (size, CRC-32, file name) so a
+    member that is already in the store is only hashed, not written again.
+
+    A blob's link count is its reference count, so finding or committing a
+    blob and linking it happen under one lock, and release() takes the same
+    lock: a blob can't be deleted between being found and being linked.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.tmp_dir = self.root / "tmp"
+        self.index_file = self.root / "index.json"
+        self._lock = threading.RLock()
+        self._index_dirty = False
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        self._member_index = self._load_index()
+
+    @classmethod
+    def for_storage(cls, mods_storage_path):
+        return cls(Path(mods_storage_path) / STORE_DIR_NAME)
+
+    def blob_path(self, sha):
+        return self.objects_dir / sha[:2] / sha
+
+    def has(self, sha):
+        return self.blob_path(sha).is_file()
+
+    # ----- adding content -----
+
+    def ingest_stream(self, src, destination=None):
+        """Copy a stream into the store while hashing it, returns the SHA-256
+
+        With a destination the blob is linked there before anything can
+        release it.
+        """
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir, suffix=".part")
+        try:
+            with os.fdopen(fd, 'wb') as dst:
+                while True:
+                    chunk = src.read(STREAM_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    dst.write(chunk)
+            sha = digest.hexdigest()
+            self._commit_tmp(tmp_path, sha, destination)
+            return sha
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def ingest_file(self, path):
+        """Add an existing file to the store and turn it into a link to the blob"""
+        path = Path(path)
+        sha = hash_file(path)
+        blob = self.blob_path(sha)
+        with self._lock:
+            if not blob.exists():
+                blob.parent.mkdir(parents=True, exist_ok=True)
+                try:
+                    os.link(path, blob)
+                    return sha
+                except OSError:
+                    shutil.copy2(path, blob)
+            elif not self._same_file(path, blob):
+                self.link_to(sha, path)
+        return sha
+
+    def materialize_member(self, archive, member, destination):
+        """Place an archive member at destination through the store, returns its SHA-256
+
+        A member found in the member index is still hashed (without writing
+        it anywhere) so a CRC-32 collision can't hand out the wrong blob.
+        """
+        key = self._member_key(member)
+        with self._lock:
+            known = self._member_index.get(key) if key else None
+        if known and self.has(known):
+            with archive.open(member) as src:
+                sha = hash_stream(src)
+            if sha == known:
+                with self._lock:
+                    if self.has(sha):
+                        self.link_to(sha, destination)
+                        return sha
+
+        # Decompress outside the lock; the blob is linked as it's committed
+        with archive.open(member) as src:
+            sha = self.ingest_stream(src, destination)
+        if key:
+            with self._lock:
+                self._member_index[key] = sha
+                self._index_dirty = True
+        return sha
+
+    # ----- using content -----
+
+    def link_to(self, sha, destination):
+        """Hardlink a blob to destination (copying if links aren't possible)"""
+        destination = Path(destination)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        staging = destination.with_name(destination.name + STAGING_SUFFIX)
+        try:
+            os.remove(staging)
+        except OSError:
+            pass
+        with self._lock:
+            try:
+                os.link(self.blob_path(sha), staging)
+                method = 'hardlink'
+            except OSError:
+                shutil.copy2(self.blob_path(sha), staging)
+                method = 'copy'
+        move_into_place(staging, destination)
+        return method
+
+    def release(self, shas):
+        """Delete blobs that no mod folder links to anymore"""
+        removed = 0
+        with self._lock:
+            for sha in set(shas):
+                blob = self.blob_path(sha)
+                try:
+                    if os.stat(blob).st_nlink <= 1:
+                        os.remove(blob)
+                        removed += 1
+                except OSError:
+                    pass
+        if removed:
+            with self._lock:
+                stale = [key for key, value in self._member_index.items() if not self.has(value)]
+                for key in stale:
+                    del self._member_index[key]
+                self._index_dirty = self._index_dirty or bool(stale)
+            self.save_index()
+        return removed
+
+    def save_index(self):
+        """Write the member index if it changed"""
+        with self._lock:
+            if not self._index_dirty:
+                return
+            fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir, suffix=".json")
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self._member_index, f, separators=(',', ':'))
+            os.replace(tmp_path, self.index_file)
+            self._index_dirty = False
+
+    # ----- helpers -----
+
+    def _commit_tmp(self, tmp_path, sha, destination=None):
+        blob = self.blob_path(sha)
+        with self._lock:
+            if blob.exists():
+                # Already stored - nothing new takes up space
+                os.remove(tmp_path)
+            else:
+                blob.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp_path, blob)
+            if destination is not None:
+                self.link_to(sha, destination)
+
+    def _load_index(self):
+        if self.index_file.exists():
+            try:
+                with open(self.index_file, 'r') as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                pass
+        return {}
+
+    @staticmethod
+    def _member_key(member):
+        if member.crc is None:
+            return None
+        return f"{member.size}:{member.crc:08x}:{member.basename.lower()}"
+
+    @staticmethod
+    def _same_file(a, b):
+        try:
+            return os.path.samefile(a, b)
+        except OSError:
+            return False
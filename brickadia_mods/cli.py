@@ -0,0 +1,295 @@
+"""brickadia-mods: command-line interface for scripted mod management
+
+Runs on the headless ModManager, so it never creates a Tk window or
+imports tkinterdnd2/PIL. Paths come from the same config.ini the GUI uses
+unless they're given on the command line.
+"""
+import argparse
+import configparser
+import json
+import sys
+from pathlib import Path
+
+from .archive import setup_winrar
+from .database import BACKEND_JSON, DATABASE_BACKENDS
+from .deploy import DEPLOY_AUTO, DEPLOY_STRATEGIES
+from .errors import ModLoaderError, UE4SSMissingError
+from .manager import ModManager, is_ue4ss_mod
+from .record import encode_record
+
+PROG = "brickadia-mods"
+
+# Exit codes
+EXIT_OK = 0
+EXIT_FAILED = 1
+
+
+def default_storage_path():
+    return str(Path.home() / 'BrickadiaModLoader' / 'Mods')
+
+
+def read_settings(config_file=None):
+    """Paths and strategy from config.ini, the way the GUI finds them
+
+    The GUI starts from config.ini in the working folder and then moves to
+    the copy inside the mods storage folder, so both are read in that order.
+    """
+    config = configparser.ConfigParser()
+    config.read(config_file or "config.ini")
+    storage = config.get('Paths', 'mods_storage', fallback='') or default_storage_path()
+    if not config_file:
+        config.read(Path(storage) / "config.ini")
+    return {
+        'paks': config.get('Paths', 'brickadia_paks', fallback=''),
+        'storage': config.get('Paths', 'mods_storage', fallback='') or storage,
+        'strategy': config.get('Deployment', 'strategy', fallback=DEPLOY_AUTO),
+        'backend': config.get('Database', 'backend', fallback=BACKEND_JSON),
+    }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog=PROG, description="Manage Brickadia mods without the GUI")
+    parser.add_argument('--config', help="config.ini to read paths from")
+    parser.add_argument('--paks', help="Brickadia Content/Paks folder")
+    parser.add_argument('--storage', help="mods storage folder")
+    parser.add_argument('--strategy', choices=DEPLOY_STRATEGIES, help="how enabled files are placed in the game")
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    commands.required = True
+
+    install = commands.add_parser('install', help="install mods from .zip/.rar archives")
+    install.add_argument('archives', nargs='+')
+    install.add_argument('--enable', action='store_true', help="enable the installed mods right away")
+
+    for name, text in (('enable', "enable mods"), ('disable', "disable mods")):
+        command = commands.add_parser(name, help=text)
+        command.add_argument('ids', nargs='*', help="mod ids (see list)")
+        command.add_argument('--all', action='store_true', help=f"{name} every installed mod")
+    commands.choices['enable'].add_argument('--allow-missing-ue4ss', action='store_true',
+                                            help="enable UE4SS mods even if UE4SS isn't installed")
+
+    profile = commands.add_parser('profile', help="list, save or apply profiles")
+    profile_commands = profile.add_subparsers(dest='profile_command', metavar='action')
+    profile_commands.required = True
+    profile_commands.add_parser('list', help="list saved profiles")
+    for name, text in (('apply', "switch to a profile"), ('save', "save the enabled mods as a profile")):
+        command = profile_commands.add_parser(name, help=text)
+        command.add_argument('name')
+    profile_commands.choices['apply'].add_argument('--allow-missing-ue4ss', action='store_true')
+
+    listing = commands.add_parser('list', help="list installed mods")
+    listing.add_argument('--json', action='store_true', help="print machine-readable JSON")
+    listing.add_argument('--enabled', action='store_true', help="only enabled mods, in load order")
+
+    conflicts = commands.add_parser('conflicts', help="list game assets that several enabled mods override")
+    conflicts.add_argument('--all', action='store_true', help="check every installed mod, not only enabled ones")
+    conflicts.add_argument('--json', action='store_true', help="print machine-readable JSON")
+
+    sort = commands.add_parser('sort', help="order enabled mods by modinfo.json rules and asset conflicts")
+    sort.add_argument('--dry-run', action='store_true', help="only print the order")
+
+    verify = commands.add_parser('verify', help="check mod folders and deployed files")
+    verify.add_argument('--repair', action='store_true', help="redeploy enabled mods with missing files")
+    return parser
+
+
+def open_manager(args):
+    settings = read_settings(args.config)
+    paks = args.paks or settings['paks']
+    if not paks:
+        raise ModLoaderError("Brickadia Paks folder isn't configured; pass --paks or set it up in the GUI")
+    strategy = args.strategy or settings['strategy']
+    if strategy not in DEPLOY_STRATEGIES:
+        strategy = DEPLOY_AUTO
+    backend = settings['backend'] if settings['backend'] in DATABASE_BACKENDS else BACKEND_JSON
+    manager = ModManager(paks, args.storage or settings['storage'], strategy=strategy, backend=backend)
+    recovered = manager.recover()
+    if recovered:
+        print(f"Recovered interrupted deployment of {len(recovered)} mod(s)", file=sys.stderr)
+    return manager
+
+
+def report_plan(result):
+    for mod_id in result.added:
+        print(f"enabled  {mod_id}")
+    for mod_id in result.removed:
+        print(f"disabled {mod_id}")
+    added = set(result.added)
+    for mod_id in result.reordered:
+        if mod_id not in added:
+            print(f"moved    {mod_id}")
+    for mod_id, error in result.failed:
+        print(f"failed   {mod_id}: {error}", file=sys.stderr)
+    return EXIT_FAILED if result.failed else EXIT_OK
+
+
+def report_dependencies(resolution):
+    for mod_id in resolution.added:
+        print(f"required {mod_id}")
+    return resolution.order
+
+
+def cmd_install(manager, args):
+    results, errors = manager.install(args.archives)
+    for result in results:
+        for mod_id, mod in result.mods.items():
+            print(f"installed {mod_id}  ({mod['name']})")
+    for archive_path, error in errors:
+        print(f"failed    {archive_path}: {error}", file=sys.stderr)
+    if args.enable and results:
+        new_ids = [mod_id for result in results for mod_id in result.mods]
+        resolution = manager.resolve_dependencies(manager.enabled_ids() + new_ids, checked=new_ids)
+        report_plan(manager.apply(report_dependencies(resolution)))
+    return EXIT_FAILED if errors else EXIT_OK
+
+
+def selected_ids(manager, args):
+    if args.all:
+        return list(manager.mods)
+    if not args.ids:
+        raise ModLoaderError("Give mod ids or --all")
+    for mod_id in args.ids:
+        manager.get(mod_id)
+    return args.ids
+
+
+def cmd_enable(manager, args):
+    ids = selected_ids(manager, args)
+    current = manager.enabled_ids()
+    wanted = set(current)
+    skipped = []
+    if args.all:
+        # Every mod that can be enabled is; the others are listed
+        resolution, skipped = manager.resolve_each(current, ids)
+        desired = resolution.order
+        for mod_id, problems in skipped:
+            print(f"skipped  {mod_id}: {'; '.join(problems)}", file=sys.stderr)
+    else:
+        desired = current + [mod_id for mod_id in ids if mod_id not in wanted]
+        desired = report_dependencies(manager.resolve_dependencies(desired, checked=ids))
+    missing_ue4ss = [mod_id for mod_id in desired
+                     if is_ue4ss_mod(manager.mods[mod_id]) and not manager.mods[mod_id]['enabled']]
+    if missing_ue4ss and not args.allow_missing_ue4ss and not manager.ue4ss_installed():
+        raise UE4SSMissingError("UE4SS isn't installed, needed by: " + ", ".join(missing_ue4ss)
+                                + " (use --allow-missing-ue4ss to enable anyway)")
+    status = report_plan(manager.apply(desired))
+    return EXIT_FAILED if skipped else status
+
+
+def cmd_disable(manager, args):
+    ids = set(selected_ids(manager, args))
+    return report_plan(manager.apply([mod_id for mod_id in manager.enabled_ids() if mod_id not in ids]))
+
+
+def cmd_profile(manager, args):
+    if args.profile_command == 'list':
+        for name in manager.profiles.names():
+            print(f"{name}\t{len(manager.profiles.get(name))} mod(s)")
+        return EXIT_OK
+    if args.profile_command == 'save':
+        enabled = manager.save_profile(args.name)
+        print(f"saved profile {args.name!r} with {len(enabled)} mod(s)")
+        return EXIT_OK
+
+    wanted = report_dependencies(manager.resolve_dependencies(manager.profiles.get(args.name)))
+    plan = manager.plan(wanted)
+    for mod_id in plan.unknown:
+        print(f"skipped  {mod_id}: not installed", file=sys.stderr)
+    include_ue4ss = args.allow_missing_ue4ss or manager.ue4ss_installed()
+    skipped = []
+    if not include_ue4ss:
+        skipped = [mod_id for mod_id in plan.to_add if is_ue4ss_mod(manager.mods[mod_id])]
+    for mod_id in skipped:
+        print(f"skipped  {mod_id}: UE4SS isn't installed", file=sys.stderr)
+    status = report_plan(manager.apply(wanted, include_ue4ss, plan=plan))
+    return EXIT_FAILED if skipped else status
+
+
+def cmd_list(manager, args):
+    ids = manager.enabled_ids() if args.enabled else list(manager.mods)
+    if args.json:
+        json.dump({mod_id: manager.mods[mod_id] for mod_id in ids}, sys.stdout, indent=2, default=encode_record)
+        print()
+        return EXIT_OK
+    for mod_id in ids:
+        mod = manager.mods[mod_id]
+        state = "enabled " if mod['enabled'] else "disabled"
+        kind = mod.get('mod_type', 'PAK')
+        version = f" v{mod['version']}" if mod.get('version') else ""
+        print(f"{state}  {kind:5}  {mod_id}  ({mod['name']}{version})")
+    return EXIT_OK
+
+
+def cmd_conflicts(manager, args):
+    conflicts = manager.asset_conflicts(enabled_only=not args.all)
+    if args.json:
+        json.dump(conflicts, sys.stdout, indent=2)
+        print()
+        return EXIT_OK
+    for asset, mod_ids in sorted(conflicts.items()):
+        print(f"{asset}: {', '.join(mod_ids)}")
+    print(f"{len(conflicts)} asset(s) overridden by more than one mod")
+    return EXIT_OK
+
+
+def cmd_sort(manager, args):
+    solution = manager.solve_load_order()
+    for cycle in solution.cycles:
+        print("rules loop: " + " -> ".join(cycle + cycle[:1]), file=sys.stderr)
+    for mod_id, name in solution.missing:
+        print(f"{mod_id}: no enabled mod named {name!r}", file=sys.stderr)
+    if args.dry_run:
+        for index, mod_id in enumerate(solution.order, 1):
+            print(f"{index:4}  {mod_id}")
+        return EXIT_OK
+    if solution.order == manager.enabled_ids():
+        print("load order already follows every rule")
+        return EXIT_OK
+    return report_plan(manager.reorder(solution.order))
+
+
+def cmd_verify(manager, args):
+    problems = manager.verify()
+    for mod_id, problem in problems:
+        print(f"{mod_id}: {problem}")
+    if args.repair and problems:
+        result = manager.apply(manager.enabled_ids())
+        report_plan(result)
+        problems = manager.verify()
+    if not problems:
+        print(f"OK: {len(manager.mods)} mod(s), {len(manager.enabled_ids())} enabled")
+    return EXIT_FAILED if problems else EXIT_OK
+
+
+COMMANDS = {
+    'install': cmd_install,
+    'enable': cmd_enable,
+    'disable': cmd_disable,
+    'profile': cmd_profile,
+    'list': cmd_list,
+    'conflicts': cmd_conflicts,
+    'sort': cmd_sort,
+    'verify': cmd_verify,
+}
+
+
+def wants_cli(argv):
+    """True if the arguments are meant for this CLI: a command or an option
+
+    Anything else (like archives opened with or dropped on the exe) is left
+    to the GUI.
+    """
+    return bool(argv) and (argv[0] in COMMANDS or argv[0].startswith('-'))
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    setup_winrar()
+    try:
+        manager = open_manager(args)
+        try:
+            return COMMANDS[args.command](manager, args)
+        finally:
+            manager.close()
+    except (ModLoaderError, OSError) as e:
+        print(f"{PROG}: {e}", file=sys.stderr)
+        return EXIT_FAILED
@@ -0,0 +1,117 @@
+"""Which mods override the same game assets
+
+Asset lists come from .pak indexes and IoStore .utoc tables of contents
+and are cached per file, so after the first scan checking a whole library
+only stats the container files.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import defaultdict
+from pathlib import Path
+
+from .fingerprint import stat_fingerprint
+from .iostore import read_utoc
+from .pak import PakError, asset_path, read_pak_index
+
+logger = logging.getLogger(__name__)
+
+ASSET_INDEX_FILE_NAME = "asset_index.json"
+
+# Files that list assets
+CONTAINER_EXTENSIONS = ('.pak', '.utoc')
+
+
+def read_assets(path):
+    """Game-relative asset paths in a .pak or .utoc (chunks without a name as "chunk:<id>")"""
+    if str(path).lower().endswith('.utoc'):
+        toc = read_utoc(path)
+        return [asset_path(toc.mount_point, file_path) if file_path else f"chunk:{chunk_id}"
+                for chunk_id, file_path in toc.chunks]
+    mount_point, paths = read_pak_index(path)
+    return [asset_path(mount_point, file_path) for file_path in paths]
+
+
+class AssetIndexCache:
+    """Asset paths in .pak and .utoc files, cached per (size, mtime_ns) in asset_index.json"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._entries = self._load()
+
+    @classmethod
+    def for_storage(cls, mods_storage_path):
+        return cls(Path(mods_storage_path) / ASSET_INDEX_FILE_NAME)
+
+    def assets(self, path):
+        """Asset paths in a .pak or .utoc, or [] if it can't be read; parsed only when the file changed
+
+        IoStore chunks the .utoc doesn't name are listed as "chunk:<id>".
+        """
+        key = os.path.abspath(path)
+        fingerprint = stat_fingerprint(path)
+        if fingerprint is None:
+            return []
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and (entry[0], entry[1]) == fingerprint:
+            return entry[2]
+
+        try:
+            assets = read_assets(path)
+        except (PakError, OSError) as e:
+            logger.warning("Could not read asset index of %s: %s", path, e)
+            assets = []
+        with self._lock:
+            self._entries[key] = [fingerprint[0], fingerprint[1], assets]
+            self._dirty = True
+        return assets
+
+    def save(self):
+        """Write the cache if it changed, dropping entries for files that are gone"""
+        with self._lock:
+            if not self._dirty:
+                return
+            for key in [key for key in self._entries if not os.path.exists(key)]:
+                del self._entries[key]
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".json")
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self._entries, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+    def _load(self):
+        if self.path.exists():
+            try:
+                with open(self.path, 'r') as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                pass
+        return {}
+
+
+def find_asset_conflicts(mods, cache):
+    """{asset path: [mod ids]} for assets that more than one of the given mods' containers hold
+
+    Looks at .pak files and IoStore .utoc files. Mod ids are listed in the
+    order of mods (pass them in load order; the last one wins in game).
+    Asset paths are compared case-insensitively.
+    """
+    owners = defaultdict(list)
+    shown = {}
+    for mod_id, mod in mods.items():
+        folder = Path(mod.folder)
+        for file_name in mod.files:
+            if not file_name.lower().endswith(CONTAINER_EXTENSIONS):
+                continue
+            for asset in cache.assets(folder / file_name):
+                key = asset.lower()
+                shown.setdefault(key, asset)
+                if not owners[key] or owners[key][-1] != mod_id:
+                    owners[key].append(mod_id)
+    return {shown[key]: ids for key, ids in owners.items() if len(ids) > 1}
@@ -0,0 +1,93 @@
+"""mods.json persistence with coalesced, atomic writes, and picking a database backend"""
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from .loadorder import enabled_in_order
+from .profiles import ProfileStore
+from .record import encode_record
+from .sqlitedb import SQLITE_FILE_NAME, SQLiteModDatabase
+
+# Where mod records are kept ([Database] backend in config.ini)
+BACKEND_JSON = 'json'
+BACKEND_SQLITE = 'sqlite'
+DATABASE_BACKENDS = (BACKEND_JSON, BACKEND_SQLITE)
+
+
+def open_database(mods_data_file, backend=BACKEND_JSON):
+    """Database for a backend; mods.db sits next to mods.json and imports it on first use"""
+    if backend == BACKEND_SQLITE:
+        return SQLiteModDatabase(Path(mods_data_file).with_name(SQLITE_FILE_NAME), legacy_path=mods_data_file)
+    return ModDatabase(mods_data_file)
+
+
+class ModDatabase:
+    """Owns mods.json on disk
+
+    Changes only mark the database dirty; flush() writes it at most once
+    for any number of changes. The file is written compactly to a temporary
+    file in the same folder, fsynced and moved over mods.json with
+    os.replace, so a crash leaves either the old or the new database and
+    never a half-written one.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.dirty = False
+        self.writes = 0
+
+    def load(self):
+        """Read the mods dict, or an empty one if there's no database yet"""
+        if self.path.exists():
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        return {}
+
+    def mark_dirty(self, *mod_ids):
+        """Note a change; mods.json is rewritten whole, so which mods doesn't matter"""
+        self.dirty = True
+
+    def flush(self, mods, force=False):
+        """Write mods if anything changed since the last flush, returns True if written"""
+        if not (self.dirty or force):
+            return False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(mods, f, separators=(',', ':'), default=encode_record)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        self.dirty = False
+        self.writes += 1
+        return True
+
+    # ----- queries (plain scans; SQLiteModDatabase answers them from indexes) -----
+
+    def enabled_ids(self, mods):
+        """Ids of enabled mods in their load order"""
+        return enabled_in_order(mods)
+
+    def ids_with_file(self, mods, file_name):
+        """Ids of mods that ship a file with this name (case-insensitive)"""
+        file_name = file_name.lower()
+        return [mod_id for mod_id, mod in mods.items()
+                if any(name.lower() == file_name for name in mod.files)]
+
+    def ids_with_hash(self, mods, sha):
+        """Ids of mods that ship a file with this SHA-256"""
+        return [mod_id for mod_id, mod in mods.items() if mod.hashes and sha in mod.hashes.values()]
+
+    def profile_store(self, path):
+        return ProfileStore(path)
+
+    def close(self):
+        pass
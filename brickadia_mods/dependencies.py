@@ -0,0 +1,452 @@
+"""Mod dependencies and incompatibilities from modinfo.json
+
+A mod can give itself an id and name other mods it requires or conflicts
+with, each optionally limited to a version range:
+
+    "id": "better-lights",
+    "requires": ["core-lib >=1.2,<2", "shaders"],
+    "conflicts": {"old-lights": "*"}
+
+DependencyGraph keeps these parsed for the whole library and is updated one
+mod at a time, so resolving a set of mods only walks the mods involved.
+"""
+import logging
+import re
+
+from .errors import ModLoaderError
+
+logger = logging.getLogger(__name__)
+
+# Record keys the installer copies from modinfo.json ('id' is kept as modinfo_id)
+DEPENDENCY_FIELDS = ('modinfo_id', 'requires', 'conflicts')
+
+_VERSION = re.compile(r"v?(\d+(?:\.\d+)*)")
+_REQUIREMENT = re.compile(r"^\s*([^\s<>=!^~*]+)\s*(.*?)\s*$")
+_CONSTRAINT = re.compile(r"(>=|<=|==|!=|>|<|=|\^|~)?\s*v?(\d+(?:\.\d+)*(?:\.[xX*])?|[xX*])")
+
+
+def parse_version(text):
+    """'1.2.3' (or 'v1.2-beta') as (1, 2, 3), None if it has no version number"""
+    match = _VERSION.match(str(text or '').strip())
+    if match is None:
+        return None
+    return tuple(int(part) for part in match.group(1).split('.'))
+
+
+def _compare(a, b):
+    """-1, 0 or 1, missing trailing parts counting as 0"""
+    length = max(len(a), len(b))
+    a = a + (0,) * (length - len(a))
+    b = b + (0,) * (length - len(b))
+    return (a > b) - (a < b)
+
+
+def _bump(version, index):
+    """Smallest version above every version starting with version[:index + 1]"""
+    return version[:index] + (version[index] + 1,)
+
+
+class VersionRange:
+    """Comma or space separated constraints that must all hold
+
+    Understands >=, <=, >, <, ==/=, !=, ^1.2 (same major version), ~1.2
+    (same minor version), 1.x wildcards and * for any version. A bare
+    version means exactly that version.
+    """
+    __slots__ = ('text', 'constraints')
+
+    def __init__(self, text=''):
+        self.text = str(text or '').strip()
+        self.constraints = []  # [(operator, version tuple)]
+        rest = self.text.replace(',', ' ')
+        position = 0
+        while position < len(rest):
+            if rest[position].isspace():
+                position += 1
+                continue
+            match = _CONSTRAINT.match(rest, position)
+            if match is None:
+                raise ValueError(f"can't read version range {self.text!r}")
+            self._add(match.group(1) or '', match.group(2))
+            position = match.end()
+
+    def _add(self, operator, version):
+        parts = version.split('.')
+        if parts[-1] in ('x', 'X', '*'):
+            # 1.x / 1.2.* / *: anything with that prefix
+            prefix = tuple(int(part) for part in parts[:-1])
+            if prefix:
+                self.constraints += [('>=', prefix), ('<', _bump(prefix, len(prefix) - 1))]
+            return
+        version = tuple(int(part) for part in parts)
+        if operator == '^':
+            first = next((i for i, part in enumerate(version) if part), len(version) - 1)
+            self.constraints += [('>=', version), ('<', _bump(version, first))]
+        elif operator == '~':
+            self.constraints += [('>=', version), ('<', _bump(version, min(1, len(version) - 1)))]
+        else:
+            self.constraints.append(('==' if operator in ('', '=') else operator, version))
+
+    def __bool__(self):
+        return bool(self.constraints)
+
+    def matches(self, version):
+        """True if version (a tuple, or None for an unknown version) is in the range"""
+        if not self.constraints:
+            return True
+        if version is None:
+            return False
+        for operator, bound in self.constraints:
+            order = _compare(version, bound)
+            if not ((operator == '>=' and order >= 0) or (operator == '<=' and order <= 0)
+                    or (operator == '>' and order > 0) or (operator == '<' and order < 0)
+                    or (operator == '==' and order == 0) or (operator == '!=' and order != 0)):
+                return False
+        return True
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return f"VersionRange({self.text!r})"
+
+
+class Requirement:
+    """A mod id and the versions of it that are meant"""
+    __slots__ = ('id', 'key', 'range')
+
+    def __init__(self, mod_id, version_range=''):
+        self.id = mod_id
+        self.key = mod_id.casefold()
+        self.range = VersionRange(version_range)
+
+    @classmethod
+    def parse(cls, text):
+        """Requirement from 'mod-id', 'mod-id >=1.2,<2' or 'mod-id ^1.2'"""
+        match = _REQUIREMENT.match(text)
+        if match is None or not match.group(1):
+            raise ValueError(f"can't read requirement {text!r}")
+        return cls(match.group(1), match.group(2))
+
+    def matches(self, version):
+        return self.range.matches(version)
+
+    def __str__(self):
+        return f"{self.id} {self.range}" if self.range.text else self.id
+
+    def __repr__(self):
+        return f"Requirement({str(self)!r})"
+
+
+def parse_requirements(value):
+    """[Requirement] from a modinfo requires/conflicts field
+
+    Accepts one requirement string, a list of strings or {"id", "version"}
+    dicts, or an {id: version range} dict. Entries that can't be read are
+    skipped.
+    """
+    if isinstance(value, dict):
+        items = [(mod_id, version_range) for mod_id, version_range in value.items()]
+    elif isinstance(value, str):
+        items = [value]
+    elif isinstance(value, (list, tuple)):
+        items = []
+        for item in value:
+            if isinstance(item, dict):
+                items.append((item.get('id'), item.get('version')))
+            else:
+                items.append(item)
+    else:
+        return []
+
+    requirements = []
+    for item in items:
+        try:
+            if isinstance(item, tuple):
+                mod_id, version_range = item
+                if not isinstance(mod_id, str) or not mod_id.strip():
+                    continue
+                requirements.append(Requirement(mod_id.strip(), version_range if isinstance(version_range, str) else ''))
+            elif isinstance(item, str) and item.strip():
+                requirements.append(Requirement.parse(item))
+        except ValueError as e:
+            logger.warning("Ignoring modinfo.json requirement: %s", e)
+    return requirements
+
+
+def dependency_fields(mod_info):
+    """Record fields for a mod's id, requires and conflicts (only the ones it has)"""
+    fields = {}
+    if not mod_info:
+        return fields
+    if isinstance(mod_info.get('id'), str) and mod_info['id'].strip():
+        fields['modinfo_id'] = mod_info['id'].strip()
+    for key in ('requires', 'conflicts'):
+        requirements = parse_requirements(mod_info.get(key))
+        if requirements:
+            fields[key] = [str(requirement) for requirement in requirements]
+    return fields
+
+
+class DependencyError(ModLoaderError):
+    """Raised for a set of mods whose requirements can't be met or that conflict"""
+
+    def __init__(self, message, resolution=None):
+        super().__init__(message)
+        self.resolution = resolution
+
+
+class Resolution:
+    """Result of DependencyGraph.resolve"""
+    __slots__ = ('order', 'added', 'missing', 'incompatible')
+
+    def __init__(self, order, added, missing, incompatible):
+        self.order = order                # mod ids; added ones go right before the first mod needing them
+        self.added = added                # dependencies that weren't asked for, in load order
+        self.missing = missing            # [(mod id, Requirement, mod id of the wrong version in the set or None)]
+        self.incompatible = incompatible  # [(mod id, other mod id, Requirement)]
+
+    @property
+    def ok(self):
+        return not self.missing and not self.incompatible
+
+    def problems(self, mods):
+        """Readable lines for what's missing or incompatible"""
+        def name(mod_id):
+            mod = mods.get(mod_id)
+            return mod['name'] if mod is not None else mod_id
+
+        lines = []
+        for mod_id, requirement, found in self.missing:
+            if found is None:
+                lines.append(f"{name(mod_id)} requires {requirement}, which isn't installed")
+            else:
+                lines.append(f"{name(mod_id)} requires {requirement}, but the selected {name(found)} "
+                             f"is version {mods[found].get('version') or 'unknown'}")
+        for mod_id, other, requirement in self.incompatible:
+            versions = f" {requirement.range}" if requirement.range.text else ""
+            lines.append(f"{name(mod_id)} conflicts with {name(other)}{versions}")
+        return lines
+
+    def __repr__(self):
+        return (f"Resolution(mods={len(self.order)}, added={len(self.added)}, "
+                f"missing={len(self.missing)}, incompatible={len(self.incompatible)})")
+
+
+class _Node:
+    __slots__ = ('keys', 'version', 'requires', 'conflicts', 'position')
+
+    def __init__(self, keys, version, requires, conflicts, position):
+        self.keys = keys
+        self.version = version
+        self.requires = requires
+        self.conflicts = conflicts
+        self.position = position
+
+
+class DependencyGraph:
+    """requires / conflicts of every installed mod, indexed by the ids they name
+
+    A mod answers to its modinfo id and to its mod id (both case-insensitive).
+    """
+
+    def __init__(self):
+        self._nodes = {}
+        self._providers = {}      # case-folded id -> mod ids answering to it
+        self._conflicted_by = {}  # case-folded id -> mod ids whose conflicts name it
+        self._next_position = 0
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __contains__(self, mod_id):
+        return mod_id in self._nodes
+
+    def add(self, mod_id, mod, fields=None):
+        """Index a mod (again) by its version and dependency fields
+
+        fields holds modinfo_id / requires / conflicts as dependency_fields
+        returns them; by default they're taken from the record itself.
+        """
+        if fields is None:
+            fields = mod
+        old = self._nodes.get(mod_id)
+        if old is not None:
+            self._unindex(mod_id, old)
+            position = old.position
+        else:
+            position = self._next_position
+            self._next_position += 1
+        keys = {mod_id.casefold()}
+        if fields.get('modinfo_id'):
+            keys.add(fields['modinfo_id'].casefold())
+        node = _Node(frozenset(keys), parse_version(mod.get('version')),
+                     parse_requirements(fields.get('requires')), parse_requirements(fields.get('conflicts')),
+                     position)
+        self._nodes[mod_id] = node
+        for key in node.keys:
+            self._providers.setdefault(key, []).append(mod_id)
+        for requirement in node.conflicts:
+            self._conflicted_by.setdefault(requirement.key, set()).add(mod_id)
+
+    def remove(self, mod_id):
+        node = self._nodes.pop(mod_id, None)
+        if node is not None:
+            self._unindex(mod_id, node)
+
+    def _unindex(self, mod_id, node):
+        for key in node.keys:
+            providers = self._providers[key]
+            providers.remove(mod_id)
+            if not providers:
+                del self._providers[key]
+        for requirement in node.conflicts:
+            conflicted = self._conflicted_by.get(requirement.key)
+            if conflicted is not None:
+                conflicted.discard(mod_id)
+                if not conflicted:
+                    del self._conflicted_by[requirement.key]
+
+    def providers(self, name):
+        """Mod ids answering to an id"""
+        return list(self._providers.get(name.casefold(), ()))
+
+    def requirements(self, mod_id):
+        node = self._nodes.get(mod_id)
+        return list(node.requires) if node is not None else []
+
+    def resolve(self, desired_ids, checked=None):
+        """Resolution for enabling exactly desired_ids (in load order) plus what they require
+
+        A requirement is met by a mod already in the set when one matches;
+        otherwise the installed mod with the highest matching version is
+        added. Ids the graph doesn't know are passed through untouched.
+        With checked, only problems of those mods (and of the added ones)
+        are reported, so one mod can be enabled next to an older bad set.
+        """
+        chosen = set(desired_ids)
+        order = []
+        placed = set()
+        added = []
+        missing = []
+        for mod_id in desired_ids:
+            self._place(mod_id, chosen, placed, order, added, missing)
+        added_set = set(added)
+        added = [mod_id for mod_id in order if mod_id in added_set]
+        incompatible = self._conflicts(order, chosen)
+
+        if checked is not None:
+            checked = set(checked).union(added)
+            missing = [problem for problem in missing if problem[0] in checked]
+            incompatible = [problem for problem in incompatible if problem[0] in checked or problem[1] in checked]
+        return Resolution(order, added, missing, incompatible)
+
+    def resolve_each(self, desired_ids, candidates):
+        """Add candidates to desired_ids one at a time, skipping those that can't join
+
+        Each candidate is resolved against the set built so far (the mods it
+        requires come along); one whose requirements can't be met or that
+        conflicts with the set is left out. Problems among desired_ids
+        themselves are ignored. Returns (Resolution of the combined set,
+        [(skipped candidate, Resolution saying why)]).
+        """
+        chosen = set(desired_ids)
+        order = []
+        placed = set()
+        added = []
+        missing = []
+        for mod_id in desired_ids:
+            self._place(mod_id, chosen, placed, order, added, missing)
+        del missing[:]
+
+        skipped = []
+        for mod_id in candidates:
+            if mod_id in chosen:
+                continue
+            before = len(order), len(added)
+            chosen.add(mod_id)
+            self._place(mod_id, chosen, placed, order, added, missing)
+            new_ids = order[before[0]:]
+            incompatible = self._conflicts(new_ids, chosen)
+            if missing or incompatible:
+                # Take the candidate and what it brought along back out
+                skipped.append((mod_id, Resolution(new_ids, added[before[1]:], list(missing), incompatible)))
+                chosen.difference_update(new_ids)
+                placed.difference_update(new_ids)
+                del order[before[0]:]
+                del added[before[1]:]
+                del missing[:]
+            else:
+                added.append(mod_id)
+
+        added_set = set(added)
+        return Resolution(order, [mod_id for mod_id in order if mod_id in added_set], [], []), skipped
+
+    def _place(self, mod_id, chosen, placed, order, added, missing):
+        """Append mod_id to order after the mods it requires, adding those to chosen"""
+        if mod_id in placed:
+            return
+        # Walk requirements depth first (without recursion, chains can be long);
+        # a mod is placed once everything it requires is, including mods that
+        # were asked for but come later. A requirement cycle is cut where it closes.
+        nodes = self._nodes
+        stack = [(mod_id, 0)]
+        visiting = {mod_id}
+        while stack:
+            current, index = stack.pop()
+            node = nodes.get(current)
+            requires = node.requires if node is not None else ()
+            if index < len(requires):
+                stack.append((current, index + 1))
+                dependency = self._provider_for(current, requires[index], chosen, missing)
+                if dependency is None or dependency in placed or dependency in visiting:
+                    continue
+                if dependency not in chosen:
+                    chosen.add(dependency)
+                    added.append(dependency)
+                visiting.add(dependency)
+                stack.append((dependency, 0))
+            else:
+                visiting.discard(current)
+                placed.add(current)
+                order.append(current)
+
+    def _conflicts(self, mod_ids, chosen):
+        """(mod id, other mod id, Requirement) for conflicts between mod_ids and chosen"""
+        nodes = self._nodes
+        new = set(mod_ids)
+        incompatible = []
+        for mod_id in mod_ids:
+            node = nodes.get(mod_id)
+            if node is None:
+                continue
+            for requirement in node.conflicts:
+                for other in self._providers.get(requirement.key, ()):
+                    if other != mod_id and other in chosen and requirement.matches(nodes[other].version):
+                        incompatible.append((mod_id, other, requirement))
+            # Conflicts that mods already in the set declare against this one
+            for key in node.keys:
+                for other in self._conflicted_by.get(key, ()):
+                    if other in new or other not in chosen:
+                        continue
+                    for requirement in nodes[other].conflicts:
+                        if requirement.key == key and requirement.matches(node.version):
+                            incompatible.append((other, mod_id, requirement))
+        return incompatible
+
+    def _provider_for(self, mod_id, requirement, chosen, missing):
+        """Mod meeting a requirement, preferring mods in the set; records it in missing if there's none"""
+        providers = [other for other in self._providers.get(requirement.key, ()) if other != mod_id]
+        in_set = [other for other in providers if other in chosen]
+        for other in in_set:
+            if requirement.matches(self._nodes[other].version):
+                return other
+        if in_set:
+            # Another version is already enabled; adding a second copy would clash with it
+            missing.append((mod_id, requirement, in_set[0]))
+            return None
+        matching = [other for other in providers if requirement.matches(self._nodes[other].version)]
+        if not matching:
+            missing.append((mod_id, requirement, None))
+            return None
+        return max(matching, key=lambda other: (self._nodes[other].version or (), -self._nodes[other].position))
@@ -0,0 +1,310 @@
+"""Placing mod files into the game folder and taking them out again"""
+import os
+import shutil
+import sys
+from pathlib import Path
+
+from .archive import STAGING_SUFFIX, move_into_place
+from .blobstore import hash_file
+from .errors import ModLoaderError
+
+DEPLOY_AUTO = 'auto'
+DEPLOY_HARDLINK = 'hardlink'
+DEPLOY_REFLINK = 'reflink'
+DEPLOY_SYMLINK = 'symlink'
+DEPLOY_COPY = 'copy'
+
+DEPLOY_STRATEGIES = (DEPLOY_AUTO, DEPLOY_HARDLINK, DEPLOY_REFLINK, DEPLOY_SYMLINK, DEPLOY_COPY)
+
+# What each strategy tries, in order; copy always works as the last resort
+_FALLBACKS = {
+    DEPLOY_AUTO: (DEPLOY_HARDLINK, DEPLOY_REFLINK, DEPLOY_COPY),
+    DEPLOY_HARDLINK: (DEPLOY_HARDLINK, DEPLOY_REFLINK, DEPLOY_COPY),
+    DEPLOY_REFLINK: (DEPLOY_REFLINK, DEPLOY_COPY),
+    DEPLOY_SYMLINK: (DEPLOY_SYMLINK, DEPLOY_COPY),
+    DEPLOY_COPY: (DEPLOY_COPY,),
+}
+
+# Subfolder of Paks that enabled PAK mods are deployed into, one folder per mod
+MODS_DIR_NAME = "~mods"
+LOAD_ORDER_WIDTH = 8
+
+# ioctl number for FICLONE on Linux (btrfs, xfs, bcachefs...)
+_FICLONE = 0x40049409
+
+
+def _same_volume(source, destination):
+    try:
+        return os.stat(source).st_dev == os.stat(destination.parent).st_dev
+    except OSError:
+        return False
+
+
+def _reflink(source, target):
+    """Copy-on-write clone of source, raises OSError where unsupported"""
+    if sys.platform.startswith('linux'):
+        import fcntl
+        with open(source, 'rb') as src, open(target, 'wb') as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+            except OSError:
+                dst.close()
+                os.remove(target)
+                raise
+        shutil.copystat(source, target)
+        return
+    if sys.platform == 'darwin':
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        if libc.clonefile(os.fsencode(source), os.fsencode(target), 0) != 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        return
+    raise OSError("Reflinks are not supported on this platform")
+
+
+def _place(method, source, target):
+    if method == DEPLOY_HARDLINK:
+        if not _same_volume(source, target):
+            raise OSError("Source and destination are on different volumes")
+        os.link(source, target)
+    elif method == DEPLOY_REFLINK:
+        _reflink(source, target)
+    elif method == DEPLOY_SYMLINK:
+        os.symlink(os.path.abspath(source), target)
+    else:
+        shutil.copy2(source, target)
+
+
+def _existing_method(source, destination):
+    """How an existing destination relates to source: symlink, hardlink or copy"""
+    if os.path.islink(destination):
+        return DEPLOY_SYMLINK
+    try:
+        if os.path.samefile(source, destination):
+            return DEPLOY_HARDLINK
+    except OSError:
+        pass
+    return DEPLOY_COPY
+
+
+def _already_deployed(source, destination, strategy, cache):
+    """True if destination already has source's bytes, so nothing needs writing"""
+    if not os.path.lexists(destination):
+        return False
+    if os.path.islink(destination):
+        # Only a link to this very file counts when symlinks were asked for
+        return (strategy == DEPLOY_SYMLINK
+                and os.path.abspath(os.readlink(destination)) == os.path.abspath(source))
+    return cache.same_content(source, destination)
+
+
+def deploy_file(source, destination, strategy=DEPLOY_AUTO, cache=None):
+    """Put source at destination using the first method that works
+
+    Returns the game_paths entry for the file: {'path': ..., 'method': ...}.
+    The file is placed under a staging name first and moved into place with
+    os.replace, replacing anything already at destination. With a
+    FingerprintCache a destination that already holds the same bytes is
+    kept as it is.
+    """
+    destination = Path(destination)
+    if cache is not None and _already_deployed(source, destination, strategy, cache):
+        return {'path': str(destination), 'method': _existing_method(source, destination)}
+
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    staging = destination.with_name(destination.name + STAGING_SUFFIX)
+
+    last_error = None
+    for method in _FALLBACKS.get(strategy, _FALLBACKS[DEPLOY_AUTO]):
+        if os.path.lexists(staging):
+            os.remove(staging)
+        try:
+            _place(method, source, staging)
+        except OSError as e:
+            last_error = e
+            continue
+        move_into_place(staging, destination)
+        if cache is not None and method != DEPLOY_SYMLINK:
+            source_sha = cache.known_hash(source)
+            if source_sha:
+                cache.remember(destination, source_sha)
+        return {'path': str(destination), 'method': method}
+    raise last_error
+
+
+def normalize_game_paths(game_paths):
+    """Read game_paths in either format (old entries are plain path strings from copying)"""
+    entries = []
+    for entry in game_paths or []:
+        if isinstance(entry, str):
+            entries.append({'path': entry, 'method': DEPLOY_COPY})
+        else:
+            entries.append(entry)
+    return entries
+
+
+def remove_deployed(entry, source=None):
+    """Undo one deployed file according to how it was placed
+
+    Links are only unlinked - never opened or truncated - so the mod's own
+    copy is never touched. If source is given, a hardlink or symlink that no
+    longer points at it is left alone because something else replaced it.
+    """
+    path = entry['path']
+    method = entry.get('method', DEPLOY_COPY)
+    if not os.path.lexists(path):
+        return False
+
+    if source is not None and method == DEPLOY_SYMLINK:
+        if not os.path.islink(path) or os.path.abspath(os.readlink(path)) != os.path.abspath(source):
+            return False
+    elif source is not None and method == DEPLOY_HARDLINK:
+        try:
+            if not os.path.samefile(path, source):
+                return False
+        except OSError:
+            pass
+
+    os.remove(path)
+    return True
+
+
+class DeploymentError(ModLoaderError):
+    """Raised when a mod can't be placed into or removed from the game"""
+
+
+def game_base_path(paks_path):
+    """Brickadia/ folder that contains Content/Paks and Binaries/Win64"""
+    return Path(paks_path).parent.parent
+
+
+def ue4ss_dll_path(paks_path):
+    return game_base_path(paks_path) / 'Binaries' / 'Win64' / 'UE4SS.dll'
+
+
+def mods_folder(paks_path):
+    return Path(paks_path) / MODS_DIR_NAME
+
+
+def order_folder(paks_path, mod_id, key):
+    """Folder a PAK mod with the given load order key is deployed to"""
+    return mods_folder(paks_path) / f"{key:0{LOAD_ORDER_WIDTH}d}_{mod_id}"
+
+
+def deploy_target(mod, paks_path):
+    """Folder a mod's files go to
+
+    UE4SS mods go to Binaries/Win64/Mods/<name>, PAK mods with a load order
+    to their own Paks/~mods/<key>_<mod id> folder and older records
+    without one straight into Paks.
+    """
+    if mod.get('mod_type', 'PAK') == 'UE4SS':
+        return game_base_path(paks_path) / 'Binaries' / 'Win64' / 'Mods' / mod['name'].replace(' ', '_')
+    if mod.get('load_order') is not None:
+        return order_folder(paks_path, Path(mod['folder']).name, mod['load_order'])
+    return Path(paks_path)
+
+
+def remove_empty_folders(folders, paks_path):
+    """Remove folders deploying created that are empty now, and their empty parents
+
+    Stops at Paks, Paks/~mods and the UE4SS Mods folder, which stay.
+    """
+    stops = {Path(paks_path), mods_folder(paks_path), game_base_path(paks_path) / 'Binaries' / 'Win64' / 'Mods'}
+    for folder in sorted({Path(folder) for folder in folders}, key=lambda folder: len(folder.parts), reverse=True):
+        while folder not in stops and any(stop in folder.parents for stop in stops):
+            try:
+                folder.rmdir()
+            except FileNotFoundError:
+                pass
+            except OSError:
+                break  # Not empty
+            folder = folder.parent
+
+
+def deploy_mod(mod, paks_path, strategy=DEPLOY_AUTO, txn=None, cache=None):
+    """Place all of a mod's files in the game and mark it enabled
+
+    If a file fails, the files already placed are taken out again so the
+    mod is never left half-deployed; files that were already there before
+    the deploy stay. With a journal transaction every file is recorded
+    before it is written, and with a FingerprintCache files already in
+    place with the same content are not copied again. Files with a hash
+    recorded at install are checked first: they are links to a store blob
+    shared with other mods, so one edited in place is refused.
+    """
+    mod_folder = Path(mod['folder'])
+    if not mod_folder.exists():
+        raise DeploymentError(f"Mod folder not found:\n{mod_folder}")
+
+    target = deploy_target(mod, paks_path)
+    os.makedirs(target, exist_ok=True)
+
+    hashes = mod.get('hashes') or {}
+    game_paths = []
+    placed = []  # (game_paths entry, source) of files that weren't there before
+    try:
+        for file_name in mod['files']:
+            source = mod_folder / file_name
+            if source.exists():
+                expected = hashes.get(file_name)
+                if expected is not None:
+                    sha = cache.hash(source) if cache is not None else hash_file(source)
+                    if sha != expected:
+                        raise DeploymentError(f"{source} changed since it was installed, "
+                                              f"reinstall {mod['name']} to repair it")
+                destination = target / file_name
+                existed = os.path.lexists(destination)
+                if txn is not None:
+                    txn.placing(source, destination, existed)
+                entry = deploy_file(source, destination, strategy, cache)
+                game_paths.append(entry)
+                if not existed:
+                    placed.append((entry, source))
+    except BaseException:
+        for entry, source in placed:
+            try:
+                remove_deployed(entry, source)
+            except OSError:
+                pass
+        remove_empty_folders([target] + [Path(entry['path']).parent for entry in game_paths], paks_path)
+        raise
+
+    mod['enabled'] = True
+    mod['game_paths'] = game_paths
+    return game_paths
+
+
+def undeploy_mod(mod, paks_path):
+    """Take a mod's files out of the game and mark it disabled"""
+    if mod.get('mod_type', 'PAK') == 'UE4SS':
+        # For UE4SS mods, remove the entire mod folder
+        ue4ss_mod_folder = deploy_target(mod, paks_path)
+        if ue4ss_mod_folder.exists():
+            shutil.rmtree(ue4ss_mod_folder)
+    else:
+        # For PAK mods, undo each file the way it was deployed
+        mod_folder = Path(mod['folder'])
+        folders = set()
+        for entry in normalize_game_paths(mod.get('game_paths', [])):
+            remove_deployed(entry, mod_folder / Path(entry['path']).name)
+            folders.add(Path(entry['path']).parent)
+        # Drop the mod's ~mods subfolder once it is empty
+        for folder in folders:
+            if folder.parent == mods_folder(paks_path):
+                try:
+                    folder.rmdir()
+                except OSError:
+                    pass
+
+    mod['enabled'] = False
+    if 'game_paths' in mod:
+        del mod['game_paths']
+
+
+def is_deployed(mod):
+    """True if an enabled mod's files are all still in the game folder"""
+    if not mod.get('enabled'):
+        return False
+    return all(os.path.lexists(entry['path']) for entry in normalize_game_paths(mod.get('game_paths', [])))
@@ -0,0 +1,202 @@
+"""Finding mods that were installed more than once or ship the same files"""
+import os
+from collections import defaultdict
+from pathlib import Path
+
+from .fingerprint import PARTIAL_HASH_BYTES, stat_fingerprint
+
+# Readmes, licenses and screenshots: unrelated mods often ship files with
+# these names, so sharing one doesn't make two mods duplicates
+IGNORED_FILE_SUFFIXES = ('.txt', '.md', '.rtf', '.pdf', '.url', '.png', '.jpg', '.jpeg', '.gif', '.webp')
+IGNORED_FILE_NAMES = frozenset({'modinfo.json', 'readme', 'license', 'licence', 'changelog'})
+
+
+def is_ignored_file(file_name):
+    """True for documentation-type files left out of duplicate checks"""
+    base = os.path.basename(file_name).lower()
+    return base in IGNORED_FILE_NAMES or base.endswith(IGNORED_FILE_SUFFIXES)
+
+
+def find_duplicates(mods):
+    """Find duplicate mods (ModRecords) by name or file
+
+    Returns dicts like {'type': 'name', 'mod1': id, 'mod2': id, 'name': ...}
+    or {'type': 'file', 'mod1': id, 'mod2': id, 'file': ...}.
+    """
+    duplicates = []
+    seen_names = {}
+    seen_files = {}
+
+    for mod_id, mod in mods.items():
+        mod_name = mod.name.lower()
+
+        # Check for duplicate names
+        if mod_name in seen_names:
+            duplicates.append({
+                'type': 'name',
+                'mod1': seen_names[mod_name],
+                'mod2': mod_id,
+                'name': mod.name
+            })
+        else:
+            seen_names[mod_name] = mod_id
+
+        # Check for duplicate PAK files
+        for file_name in mod.files:
+            if is_ignored_file(file_name):
+                continue
+            file_lower = file_name.lower()
+            if file_lower in seen_files:
+                duplicates.append({
+                    'type': 'file',
+                    'mod1': seen_files[file_lower],
+                    'mod2': mod_id,
+                    'file': file_name
+                })
+            else:
+                seen_files[file_lower] = mod_id
+
+    return duplicates
+
+
+# Kinds of key two mods can share, with the dict key find_duplicates-style entries use for it
+DUPLICATE_NAME = 'name'
+DUPLICATE_FILE = 'file'
+DUPLICATE_HASH = 'hash'
+
+
+class DuplicateIndex:
+    """Mods grouped by case-folded name, file name and file content hash
+
+    Updated one mod at a time on install, delete and reindex, so the number
+    of mods that clash with another one is always at hand and listing the
+    duplicates only looks at groups with more than one mod.
+    """
+
+    def __init__(self, mods=None):
+        self._groups = {DUPLICATE_NAME: {}, DUPLICATE_FILE: {}, DUPLICATE_HASH: {}}  # kind -> key -> [(id, shown)]
+        self._keys = {}     # mod id -> [(kind, key)]
+        self._shared = {kind: {} for kind in self._groups}  # kind -> keys of groups with 2+ mods (ordered)
+        self._clashes = {}  # mod id -> number of its groups that hold another mod
+        for mod_id, mod in (mods or {}).items():
+            self.add(mod_id, mod)
+
+    def __contains__(self, mod_id):
+        return mod_id in self._keys
+
+    @property
+    def conflict_count(self):
+        """How many mods share a name, file name or file content with another mod"""
+        return len(self._clashes)
+
+    def is_duplicate(self, mod_id):
+        return mod_id in self._clashes
+
+    def add(self, mod_id, mod):
+        """Index a mod (again, if its name or files changed)"""
+        self.remove(mod_id)
+        keys = {(DUPLICATE_NAME, mod.name.lower()): mod.name}
+        for file_name in mod.files:
+            if not is_ignored_file(file_name):
+                keys.setdefault((DUPLICATE_FILE, file_name.lower()), file_name)
+        for file_name, sha in (mod.hashes or {}).items():
+            if not is_ignored_file(file_name):
+                keys.setdefault((DUPLICATE_HASH, sha), file_name)
+
+        self._keys[mod_id] = list(keys)
+        for (kind, key), shown in keys.items():
+            group = self._groups[kind].setdefault(key, [])
+            if len(group) == 1:
+                self._clash(group[0][0], 1)
+                self._shared[kind][key] = None
+            if group:
+                self._clash(mod_id, 1)
+            group.append((mod_id, shown))
+
+    def remove(self, mod_id):
+        for kind, key in self._keys.pop(mod_id, ()):
+            groups = self._groups[kind]
+            group = groups[key]
+            group[:] = [entry for entry in group if entry[0] != mod_id]
+            if group:
+                self._clash(mod_id, -1)
+                if len(group) == 1:
+                    self._clash(group[0][0], -1)
+                    del self._shared[kind][key]
+            else:
+                del groups[key]
+
+    def _clash(self, mod_id, change):
+        count = self._clashes.get(mod_id, 0) + change
+        if count:
+            self._clashes[mod_id] = count
+        else:
+            del self._clashes[mod_id]
+
+    def duplicates(self):
+        """Same entries as find_duplicates, plus {'type': 'hash', ..., 'file': ...} for identical files"""
+        duplicates = []
+        for kind, shared in self._shared.items():
+            field = 'name' if kind == DUPLICATE_NAME else 'file'
+            for key in shared:
+                group = self._groups[kind][key]
+                first = group[0][0]
+                for mod_id, shown in group[1:]:
+                    duplicates.append({'type': kind, 'mod1': first, 'mod2': mod_id, field: shown})
+        return duplicates
+
+
+def find_identical_files(mods, fingerprints):
+    """Files with the same content in different mods, as {'type': 'hash', 'mod1', 'mod2', 'file'} entries
+
+    Catches copies of one pak under different names, including mods
+    installed before hashes were recorded. Files are bucketed by size; only
+    sizes several mods share get their first and last 64 KiB hashed, and
+    only files that still collide are hashed in full (unless the SHA-256
+    recorded at install is known). Both hashes are cached per file
+    fingerprint, so a repeated scan mostly just stats files.
+    """
+    by_size = defaultdict(list)
+    for mod_id, mod in mods.items():
+        folder = Path(mod.folder)
+        hashes = mod.hashes or {}
+        for file_name in mod.files:
+            if is_ignored_file(file_name):
+                continue
+            path = folder / file_name
+            fingerprint = stat_fingerprint(path)
+            if fingerprint is None or not fingerprint[0]:
+                continue
+            by_size[fingerprint[0]].append((mod_id, file_name, path, fingerprint, hashes.get(file_name)))
+
+    duplicates = []
+    for size, files in by_size.items():
+        if len({entry[0] for entry in files}) < 2:
+            continue
+        if all(entry[4] for entry in files):
+            # Every file's SHA-256 was recorded at install, nothing to read
+            groups = [files]
+        else:
+            groups = defaultdict(list)
+            for entry in files:
+                groups[fingerprints.partial_hash(entry[2], entry[3])].append(entry)
+            groups = groups.values()
+
+        for group in groups:
+            if len({entry[0] for entry in group}) < 2:
+                continue
+            if size <= 2 * PARTIAL_HASH_BYTES and not all(entry[4] for entry in group):
+                # The partial hash covered the whole file
+                same = [group]
+            else:
+                same = defaultdict(list)
+                for entry in group:
+                    same[entry[4] or fingerprints.hash(entry[2], entry[3])].append(entry)
+                same = same.values()
+            for entries in same:
+                first_mod = entries[0][0]
+                for mod_id, file_name, _path, _fingerprint, _sha in entries[1:]:
+                    if mod_id != first_mod:
+                        duplicates.append({'type': DUPLICATE_HASH, 'mod1': first_mod, 'mod2': mod_id,
+                                           'file': file_name})
+    return duplicates
@@ -0,0 +1,27 @@
+"""Exception types raised by the mod loader core"""
+
+
+class ModLoaderError(Exception):
+    """Base class for errors the core reports to its callers"""
+
+
+class ModNotFoundError(ModLoaderError, KeyError):
+    """Raised when a mod id isn't in the database"""
+
+    def __str__(self):
+        return f"No installed mod with id: {self.args[0]}" if self.args else "Mod not found"
+
+
+class ModStateError(ModLoaderError):
+    """Raised when enabling an enabled mod or disabling a disabled one"""
+
+
+class UE4SSMissingError(ModLoaderError):
+    """Raised when enabling a UE4SS mod while UE4SS isn't installed in the game"""
+
+
+class ProfileNotFoundError(ModLoaderError, KeyError):
+    """Raised when a profile name isn't saved"""
+
+    def __str__(self):
+        return f"No profile named: {self.args[0]}" if self.args else "Profile not found"
@@ -0,0 +1,166 @@
+"""Remember file hashes so unchanged files don't have to be read or copied again"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+from .blobstore import hash_file
+
+FINGERPRINT_FILE_NAME = "fingerprints.json"
+
+# Bytes read from each end of a file for its partial hash
+PARTIAL_HASH_BYTES = 64 * 1024
+
+
+def stat_fingerprint(path):
+    """(size, mtime_ns) of a file, or None if it doesn't exist"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def partial_hash_file(path, size):
+    """Hash of a file's size and its first and last 64 KiB
+
+    Equal for identical files and cheap for huge ones. Files of up to
+    2 * PARTIAL_HASH_BYTES are read whole, so for them it's a full hash.
+    """
+    digest = hashlib.sha1(str(size).encode('ascii'))
+    with open(path, 'rb') as f:
+        digest.update(f.read(PARTIAL_HASH_BYTES))
+        if size > PARTIAL_HASH_BYTES:
+            f.seek(max(PARTIAL_HASH_BYTES, size - PARTIAL_HASH_BYTES))
+            digest.update(f.read(PARTIAL_HASH_BYTES))
+    return digest.hexdigest()
+
+
+class FingerprintCache:
+    """Per-file (size, mtime_ns, SHA-256[, partial hash]) cache for store, deployed and mod files
+
+    The hash is only computed the first time two files of equal size have
+    to be compared, and is reused for as long as the file's size and mtime
+    stay the same.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._entries = self._load()
+
+    @classmethod
+    def for_storage(cls, mods_storage_path):
+        return cls(Path(mods_storage_path) / FINGERPRINT_FILE_NAME)
+
+    def hash(self, path, fingerprint=None):
+        """SHA-256 of a file, read from disk only when it changed since last time"""
+        key = os.path.abspath(path)
+        fingerprint = fingerprint or stat_fingerprint(path)
+        if fingerprint is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and (entry[0], entry[1]) == fingerprint and entry[2]:
+            return entry[2]
+
+        sha = hash_file(path)
+        self.remember(path, sha, fingerprint)
+        return sha
+
+    def known_hash(self, path, fingerprint=None):
+        """Cached SHA-256 of a file if it hasn't changed since it was hashed, else None"""
+        fingerprint = fingerprint or stat_fingerprint(path)
+        if fingerprint is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(os.path.abspath(path))
+        if entry and (entry[0], entry[1]) == fingerprint:
+            return entry[2]
+        return None
+
+    def partial_hash(self, path, fingerprint=None):
+        """partial_hash_file of a file, read from disk only when it changed since last time"""
+        key = os.path.abspath(path)
+        fingerprint = fingerprint or stat_fingerprint(path)
+        if fingerprint is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and (entry[0], entry[1]) == fingerprint and len(entry) > 3:
+            return entry[3]
+
+        partial = partial_hash_file(path, fingerprint[0])
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry or (entry[0], entry[1]) != fingerprint:
+                entry = self._entries[key] = [fingerprint[0], fingerprint[1], None]
+            entry[3:] = [partial]
+            self._dirty = True
+        return partial
+
+    def remember(self, path, sha, fingerprint=None):
+        """Record a hash that is already known, e.g. from the blob store"""
+        fingerprint = fingerprint or stat_fingerprint(path)
+        if fingerprint is None:
+            return
+        key = os.path.abspath(path)
+        with self._lock:
+            entry = [fingerprint[0], fingerprint[1], sha]
+            old = self._entries.get(key)
+            if old and (old[0], old[1]) == fingerprint:
+                entry[3:] = old[3:]  # Keep the partial hash of the same file
+            self._entries[key] = entry
+            self._dirty = True
+
+    def forget(self, path):
+        with self._lock:
+            if self._entries.pop(os.path.abspath(path), None) is not None:
+                self._dirty = True
+
+    def same_content(self, source, destination):
+        """True if destination already holds exactly the bytes of source
+
+        Hashes are only taken from the cache while a file's size and mtime
+        are what they were when it was hashed, so a mod file changed after
+        install is read again.
+        """
+        dest_fp = stat_fingerprint(destination)
+        if dest_fp is None or os.path.islink(destination):
+            return False
+        try:
+            if os.path.samefile(source, destination):
+                return True
+        except OSError:
+            return False
+
+        source_fp = stat_fingerprint(source)
+        if source_fp is None or source_fp[0] != dest_fp[0]:
+            return False
+        return self.hash(source, source_fp) == self.hash(destination, dest_fp)
+
+    def save(self):
+        """Write the cache if it changed, dropping entries for files that are gone"""
+        with self._lock:
+            if not self._dirty:
+                return
+            for key in [key for key in self._entries if not os.path.exists(key)]:
+                del self._entries[key]
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".json")
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self._entries, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+    def _load(self):
+        if self.path.exists():
+            try:
+                with open(self.path, 'r') as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                pass
+        return {}
@@ -0,0 +1,100 @@
+"""Background install queue backed by a worker pool"""
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .installer import install_archive
+
+# Event kinds posted by the workers
+EVENT_STARTED = 'started'
+EVENT_PROGRESS = 'progress'
+EVENT_FINISHED = 'finished'
+EVENT_FAILED = 'failed'
+
+
+class InstallEvent:
+    """Something that happened to one archive in the queue"""
+    __slots__ = ('kind', 'archive_path', 'result', 'error', 'done', 'total')
+
+    def __init__(self, kind, archive_path, result=None, error=None, done=0, total=0):
+        self.kind = kind
+        self.archive_path = archive_path
+        self.result = result
+        self.error = error
+        self.done = done
+        self.total = total
+
+    def __repr__(self):
+        return f"InstallEvent({self.kind!r}, {self.archive_path!r})"
+
+
+class InstallQueue:
+    """Extract archives concurrently and hand results back through poll()
+
+    Workers never touch the GUI or the mods database. They only post
+    InstallEvents, which the Tk thread drains with poll() from a root.after
+    loop and applies itself.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self._executor = None
+        self._events = queue.Queue()
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @property
+    def busy(self):
+        """True while any submitted archive hasn't finished or failed yet"""
+        with self._lock:
+            return self._pending > 0
+
+    def submit(self, archive_paths, storage_path, store=None, thumbnails=None):
+        """Queue archives for installation into storage_path (through store if given)
+
+        With a ThumbnailCache the new mods' icon thumbnails are made by the
+        worker too, so the GUI never has to resize them.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix="mod-install")
+        for archive_path in archive_paths:
+            with self._lock:
+                self._pending += 1
+            self._executor.submit(self._run, archive_path, storage_path, store, thumbnails)
+
+    def poll(self):
+        """Return every event posted since the last call without blocking"""
+        events = []
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def shutdown(self, cancel_pending=True):
+        """Stop the workers, waiting for archives that are already extracting"""
+        if self._executor is None:
+            return
+        self._executor.shutdown(wait=True, cancel_futures=cancel_pending)
+        self._executor = None
+        with self._lock:
+            self._pending = 0
+
+    def _run(self, archive_path, storage_path, store, thumbnails):
+        self._events.put(InstallEvent(EVENT_STARTED, archive_path))
+
+        def on_progress(done, total, member):
+            self._events.put(InstallEvent(EVENT_PROGRESS, archive_path, done=done, total=total))
+
+        try:
+            result = install_archive(archive_path, storage_path, progress=on_progress, store=store)
+            if thumbnails is not None:
+                thumbnails.generate_for(result.mods.values())
+            self._events.put(InstallEvent(EVENT_FINISHED, archive_path, result=result))
+        except Exception as e:
+            self._events.put(InstallEvent(EVENT_FAILED, archive_path, error=e))
+        finally:
+            with self._lock:
+                self._pending -= 1
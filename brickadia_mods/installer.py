@@ -0,0 +1,187 @@
+"""Install mods from archives into the mods storage folder"""
+import os
+import shutil
+from pathlib import Path
+
+from .archive import ModArchive, safe_relative_path
+from .dependencies import dependency_fields
+from .manifest import MOD_TYPE_PAK, MOD_TYPE_UE4SS, ArchiveManifest
+
+
+class InstallResult:
+    """Mods created from a single archive"""
+    __slots__ = ('archive_path', 'archive_name', 'mod_type', 'subtype', 'mods')
+
+    def __init__(self, archive_path, mod_type, subtype=None):
+        self.archive_path = str(archive_path)
+        self.archive_name = Path(archive_path).stem
+        self.mod_type = mod_type
+        self.subtype = subtype
+        self.mods = {}
+
+    @property
+    def display_names(self):
+        return [mod['name'] for mod in self.mods.values()]
+
+
+def allocate_mod_folder(storage_path, mod_name):
+    """Create and return a fresh mod folder, adding _1, _2... when the name is taken
+
+    os.mkdir fails if the folder exists, so concurrent installs never end up
+    sharing a folder.
+    """
+    counter = 0
+    while True:
+        folder_name = mod_name if counter == 0 else f"{mod_name}_{counter}"
+        mod_folder = Path(storage_path) / folder_name
+        try:
+            os.mkdir(mod_folder)
+            return mod_folder
+        except FileExistsError:
+            counter += 1
+
+
+def install_archive(archive_path, storage_path, progress=None, store=None):
+    """Stream the mod files out of an archive and build their database records
+
+    With a BlobStore the files are placed as hardlinks into the store and
+    their SHA-256 is recorded in the mod's 'hashes'. Raises ArchiveError for
+    archives with nothing to install; rarfile and OS errors are passed
+    through. Nothing is left behind in storage_path when an install fails.
+    """
+    os.makedirs(storage_path, exist_ok=True)
+    created_folders = []
+    stored = []
+    try:
+        with ModArchive(archive_path) as archive:
+            # Classify the archive from its listing - nothing is decompressed yet
+            manifest = ArchiveManifest.from_archive(archive).validate()
+            if manifest.mod_type == MOD_TYPE_UE4SS:
+                return _install_ue4ss(archive, manifest, storage_path, created_folders, progress, store, stored)
+            return _install_paks(archive, manifest, storage_path, created_folders, progress, store, stored)
+    except BaseException:
+        for folder in created_folders:
+            shutil.rmtree(folder, ignore_errors=True)
+        if store is not None:
+            store.release(stored)
+        raise
+    finally:
+        if store is not None:
+            store.save_index()
+
+
+def _extract(archive, plan, mod_folder, progress, store, stored):
+    """Write planned members, returns {relative path: sha256} when a store is used"""
+    if store is None:
+        archive.extract_members(plan, progress=progress)
+        return {}
+
+    hashes = {}
+    ordered = archive.ordered(plan)
+    for done, (member, destination) in enumerate(ordered, 1):
+        sha = store.materialize_member(archive, member, destination)
+        hashes[str(destination.relative_to(mod_folder))] = sha
+        stored.append(sha)
+        if progress:
+            progress(done, len(ordered), member)
+    return hashes
+
+
+def _install_paks(archive, manifest, storage_path, created_folders, progress, store, stored):
+    """Install every pak group of the archive as its own mod"""
+    result = InstallResult(archive.path, MOD_TYPE_PAK)
+
+    # Look for modinfo.json and icon
+    mod_info = manifest.read_mod_info(archive)
+    icon_member = manifest.find_icon(mod_info)
+
+    for group in manifest.pak_groups:
+        # Use custom name from modinfo if available
+        if mod_info and 'name' in mod_info:
+            display_name = mod_info['name']
+        else:
+            display_name = group.stem
+
+        mod_folder = allocate_mod_folder(storage_path, group.stem)
+        created_folders.append(mod_folder)
+
+        plan = [(member, mod_folder / member.basename) for member in group.members]
+
+        # Keep modinfo.json next to the mod files
+        if manifest.modinfo:
+            plan.append((manifest.modinfo, mod_folder / "modinfo.json"))
+
+        icon_dest = None
+        if icon_member:
+            icon_dest = mod_folder / f"icon{icon_member.path.suffix}"
+            plan.append((icon_member, icon_dest))
+
+        # Stream straight into the mod folder (or the store) in one pass
+        hashes = _extract(archive, plan, mod_folder, progress, store, stored)
+
+        result.mods[mod_folder.name] = {
+            'name': display_name,
+            'folder': str(mod_folder),
+            'files': group.file_names,
+            'enabled': False,
+            'description': mod_info.get('description', '') if mod_info else '',
+            'author': mod_info.get('author', '') if mod_info else '',
+            'version': mod_info.get('version', '') if mod_info else '',
+            'icon': str(icon_dest) if icon_dest else ''
+        }
+        result.mods[mod_folder.name].update(dependency_fields(mod_info))
+        if hashes:
+            result.mods[mod_folder.name]['hashes'] = hashes
+    return result
+
+
+def _install_ue4ss(archive, manifest, storage_path, created_folders, progress, store, stored):
+    """Install a UE4SS mod (Lua, Blueprint, or C++) keeping its folder structure"""
+    result = InstallResult(archive.path, MOD_TYPE_UE4SS, manifest.ue4ss_subtype)
+    mod_info = manifest.read_mod_info(archive)
+
+    # Determine mod name
+    if mod_info and 'name' in mod_info:
+        display_name = mod_info['name']
+        mod_name = display_name.replace(' ', '_')
+    else:
+        display_name = result.archive_name
+        mod_name = result.archive_name
+
+    mod_folder = allocate_mod_folder(storage_path, mod_name)
+    created_folders.append(mod_folder)
+
+    # Stream all files into the mod folder, preserving structure
+    plan = []
+    file_list = []
+    for member in manifest.members:
+        relative_path = safe_relative_path(member.name)
+        plan.append((member, mod_folder / relative_path))
+        file_list.append(str(relative_path))
+
+    icon_dest = None
+    icon_member = manifest.find_icon(mod_info)
+    if icon_member:
+        icon_dest = mod_folder / f"icon{icon_member.path.suffix}"
+        # A root level icon.png is already planned as one of the mod's files
+        if all(destination != icon_dest for _member, destination in plan):
+            plan.append((icon_member, icon_dest))
+
+    hashes = _extract(archive, plan, mod_folder, progress, store, stored)
+
+    default_desc = f"UE4SS Mod ({result.subtype})"
+    result.mods[mod_folder.name] = {
+        'name': display_name,
+        'folder': str(mod_folder),
+        'files': file_list,
+        'enabled': False,
+        'mod_type': MOD_TYPE_UE4SS,  # Mark as UE4SS mod
+        'description': mod_info.get('description', default_desc) if mod_info else default_desc,
+        'author': mod_info.get('author', '') if mod_info else '',
+        'version': mod_info.get('version', '') if mod_info else '',
+        'icon': str(icon_dest) if icon_dest else ''
+    }
+    result.mods[mod_folder.name].update(dependency_fields(mod_info))
+    if hashes:
+        result.mods[mod_folder.name]['hashes'] = hashes
+    return result
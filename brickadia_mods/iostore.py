@@ -0,0 +1,135 @@
+"""Reading the table of contents of IoStore containers (.utoc)
+
+Most current mods ship a stub .pak next to a .ucas/.utoc pair; the real
+packages live in the .ucas and the .utoc lists them. Only the .utoc is
+read: its header, the chunk ids and the directory index that names the
+files. The .ucas payload is never opened.
+"""
+import logging
+import os
+import struct
+
+from .pak import BinaryReader, PakError
+
+logger = logging.getLogger(__name__)
+
+UTOC_MAGIC = b"-==--==--==--==-"
+
+# FIoStoreTocVersion values that changed the layout
+UTOC_VERSION_DIRECTORY_INDEX = 2
+UTOC_VERSION_PERFECT_HASH = 4
+UTOC_VERSION_PERFECT_HASH_WITH_OVERFLOW = 5
+UTOC_VERSION_LATEST = 8
+
+# EIoContainerFlags
+UTOC_FLAG_ENCRYPTED = 0x02
+UTOC_FLAG_SIGNED = 0x04
+UTOC_FLAG_INDEXED = 0x08
+
+# Chunk types that aren't game assets (every container has its own header)
+_CHUNK_SCRIPT_OBJECTS = 5
+_CHUNK_CONTAINER_HEADER = 6
+
+_INVALID = 0xFFFFFFFF
+
+# magic, version, header size, entry count, compressed block count, block entry size,
+# compression method count and name length, block size, directory index size,
+# partition count, container id, encryption key GUID, flags, perfect hash seed count,
+# partition size, chunks without perfect hash
+_HEADER = struct.Struct('<16sB3xIIIIIIIIIQ16sB3xIQI44x')
+
+_CHUNK_ID_SIZE = 12
+_OFFSET_LENGTH_SIZE = 10
+_SHA1_SIZE = 20
+
+
+class IoStoreToc:
+    """What a .utoc says about its container"""
+
+    def __init__(self, version, container_id, mount_point, chunks):
+        self.version = version
+        self.container_id = container_id
+        self.mount_point = mount_point
+        self.chunks = chunks  # [(chunk id as hex, file path in the container or '')]
+
+    def __repr__(self):
+        return f"IoStoreToc(version={self.version}, chunks={len(self.chunks)}, mount_point={self.mount_point!r})"
+
+
+def _file_paths(index, entry_count):
+    """{toc entry index: path} from a FIoDirectoryIndexResource"""
+    reader = BinaryReader(index)
+    mount_point = reader.string()
+    directories = [reader.unpack('<IIII') for _ in range(reader.int32())]  # name, first child, next sibling, first file
+    files = [reader.unpack('<III') for _ in range(reader.int32())]         # name, next file, toc entry index
+    strings = [reader.string() for _ in range(reader.int32())]
+
+    paths = {}
+    pending = [(0, '')] if directories else []
+    while pending:
+        directory, prefix = pending.pop()
+        name, first_child, _sibling, first_file = directories[directory]
+        if name != _INVALID:
+            prefix = prefix + strings[name] + '/'
+        file_index = first_file
+        while file_index != _INVALID:
+            file_name, file_index, entry = files[file_index]
+            if entry < entry_count:
+                paths[entry] = prefix + strings[file_name]
+        child = first_child
+        while child != _INVALID:
+            pending.append((child, prefix))
+            child = directories[child][2]
+    return mount_point, paths
+
+
+def read_utoc(path):
+    """IoStoreToc of a .utoc file, reading only the .utoc
+
+    Raises PakError for files that aren't .utoc files. An encrypted
+    directory index leaves the chunk paths empty; the chunk ids are still there.
+    """
+    file_size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        data = f.read(_HEADER.size)
+        if len(data) < _HEADER.size or not data.startswith(UTOC_MAGIC):
+            raise PakError("not a .utoc file (bad magic)")
+        (_magic, version, header_size, entry_count, block_count, block_entry_size, method_count, method_length,
+         _block_size, directory_size, _partitions, container_id, _key, flags, seed_count, _partition_size,
+         without_hash_count) = _HEADER.unpack(data)
+        if version > UTOC_VERSION_LATEST:
+            logger.warning("Reading %s: .utoc version %s is newer than %s", path, version, UTOC_VERSION_LATEST)
+
+        # Everything up to the directory index has a size known from the header
+        f.seek(header_size)
+        chunk_ids = f.read(entry_count * _CHUNK_ID_SIZE)
+        if len(chunk_ids) != entry_count * _CHUNK_ID_SIZE:
+            raise PakError(".utoc is truncated")
+        skip = entry_count * _OFFSET_LENGTH_SIZE
+        if version >= UTOC_VERSION_PERFECT_HASH:
+            skip += seed_count * 4
+        if version >= UTOC_VERSION_PERFECT_HASH_WITH_OVERFLOW:
+            skip += without_hash_count * 4
+        skip += block_count * block_entry_size + method_count * method_length
+        f.seek(skip, os.SEEK_CUR)
+        if flags & UTOC_FLAG_SIGNED:
+            hash_size = struct.unpack('<i', f.read(4))[0]
+            f.seek(hash_size * 2 + block_count * _SHA1_SIZE, os.SEEK_CUR)
+
+        mount_point, paths = '', {}
+        if (version >= UTOC_VERSION_DIRECTORY_INDEX and flags & UTOC_FLAG_INDEXED and directory_size
+                and not flags & UTOC_FLAG_ENCRYPTED):
+            if f.tell() + directory_size > file_size:
+                raise PakError(".utoc directory index points outside the file")
+            try:
+                mount_point, paths = _file_paths(f.read(directory_size), entry_count)
+            except (struct.error, IndexError) as e:
+                raise PakError(f".utoc directory index is damaged: {e}") from None
+
+    chunks = []
+    for entry in range(entry_count):
+        chunk_id = chunk_ids[entry * _CHUNK_ID_SIZE:(entry + 1) * _CHUNK_ID_SIZE]
+        if chunk_id[11] in (_CHUNK_SCRIPT_OBJECTS, _CHUNK_CONTAINER_HEADER):
+            continue
+        chunks.append((chunk_id.hex(), paths.get(entry, '')))
+    return IoStoreToc(version, container_id, mount_point, chunks)
@@ -0,0 +1,244 @@
+"""Write-ahead journal that makes enabling/disabling mods crash safe"""
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+from .archive import STAGING_SUFFIX
+from .deploy import (
+    DEPLOY_COPY, DEPLOY_HARDLINK, DEPLOY_SYMLINK, normalize_game_paths, remove_deployed, remove_empty_folders, undeploy_mod,
+)
+
+JOURNAL_FILE_NAME = "deploy_journal.jsonl"
+
+ACTION_DEPLOY = 'deploy'
+ACTION_UNDEPLOY = 'undeploy'
+ACTION_REORDER = 'reorder'
+
+
+class JournalTransaction:
+    """Journal entries for one mod being deployed or undeployed"""
+    __slots__ = ('journal', 'txn_id', 'mod_id', 'action')
+
+    def __init__(self, journal, txn_id, mod_id, action):
+        self.journal = journal
+        self.txn_id = txn_id
+        self.mod_id = mod_id
+        self.action = action
+
+    def placing(self, source, destination, existed=False):
+        """Record a file before it is written, so a crash can take it out again
+
+        A destination that existed before is marked so a roll back leaves it.
+        """
+        record = {'txn': self.txn_id, 'op': 'place', 'source': str(source), 'path': str(destination)}
+        if existed:
+            record['existed'] = True
+        self.journal._append(record)
+
+    def moving(self, source, destination):
+        """Record a rename of a deployed file or folder before it happens"""
+        self.journal._append({'txn': self.txn_id, 'op': 'move',
+                              'source': str(source), 'path': str(destination)})
+
+
+class DeploymentJournal:
+    """Append-only log of deployment operations stored next to mods.json
+
+    Every transaction is written as begin, the files it is about to place,
+    then end (or abort). Entries are flushed to disk before the game folder
+    is touched. Once mods.json has been saved the journal is checkpointed,
+    i.e. emptied. Anything still in it at startup belongs to a run that
+    crashed and is finished or undone by recover().
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._next_id = max((r.get('txn') or 0 for r in self._read()), default=0) + 1
+        self._open = 0
+
+    @classmethod
+    def for_database(cls, mods_data_file):
+        return cls(Path(mods_data_file).parent / JOURNAL_FILE_NAME)
+
+    @contextmanager
+    def transaction(self, mod_id, action):
+        """Wrap one deploy_mod/undeploy_mod call, ending or aborting it in the journal"""
+        txn = JournalTransaction(self, self._next_id, mod_id, action)
+        self._next_id += 1
+        self._open += 1
+        self._append({'txn': txn.txn_id, 'op': 'begin', 'mod': mod_id, 'action': action})
+        try:
+            yield txn
+        except BaseException:
+            self._append({'txn': txn.txn_id, 'op': 'abort'})
+            raise
+        else:
+            self._append({'txn': txn.txn_id, 'op': 'end'})
+        finally:
+            self._open -= 1
+
+    def checkpoint(self):
+        """Forget finished transactions once mods.json holds their outcome"""
+        if self._open == 0 and self.path.exists():
+            os.remove(self.path)
+
+    # ----- recovery -----
+
+    def pending(self):
+        """Transactions left in the journal, in the order they were started"""
+        transactions = {}
+        for record in self._read():
+            txn_id = record.get('txn')
+            op = record.get('op')
+            if op == 'begin':
+                transactions[txn_id] = {'mod': record.get('mod'), 'action': record.get('action'),
+                                        'files': [], 'existed': [], 'moves': [], 'state': None}
+            elif txn_id in transactions:
+                txn = transactions[txn_id]
+                if op == 'place':
+                    txn['files'].append((record['source'], record['path']))
+                    if record.get('existed'):
+                        txn['existed'].append(record['path'])
+                elif op == 'move':
+                    txn['moves'].append((record['source'], record['path']))
+                elif op in ('end', 'abort'):
+                    txn['state'] = op
+        return list(transactions.values())
+
+    def recover(self, mods, paks_path):
+        """Roll every mod touched by a crashed run forward or back
+
+        Transactions are grouped by mod and the last deploy or undeploy of
+        each mod decides: a finished deploy is rolled forward (the mod is
+        marked enabled with the files it placed) as long as all those files
+        are still there, otherwise it is rolled back; unfinished or aborted
+        deploys are rolled back. An unfinished undeploy is completed, a
+        finished one only updates the record. Load order moves after that
+        point the record at wherever each file ended up. Returns the ids of
+        mods whose records changed; the caller saves mods.json and then
+        checkpoints.
+        """
+        by_mod = {}
+        for txn in self.pending():
+            by_mod.setdefault(txn['mod'], []).append(txn)
+
+        changed = []
+        for mod_id, transactions in by_mod.items():
+            mod = mods.get(mod_id)
+            last = None
+            for index, txn in enumerate(transactions):
+                if txn['action'] in (ACTION_DEPLOY, ACTION_UNDEPLOY):
+                    last = index
+            moves = transactions if last is None else transactions[last + 1:]
+
+            if last is not None:
+                txn = transactions[last]
+                if txn['action'] == ACTION_DEPLOY:
+                    # A finished undeploy before it means the record no longer owns its files
+                    undeployed = any(earlier['action'] == ACTION_UNDEPLOY and earlier['state'] == 'end'
+                                     for earlier in transactions[:last])
+                    self._settle_deploy(txn, mod, paks_path, undeployed)
+                elif mod is not None:
+                    if txn['state'] == 'end':
+                        mod['enabled'] = False
+                        mod.pop('game_paths', None)
+                    else:
+                        undeploy_mod(mod, paks_path)
+            if mod is not None:
+                for txn in moves:
+                    if txn['action'] == ACTION_REORDER:
+                        self._settle_moves(mod, txn['moves'])
+                changed.append(mod_id)
+        return changed
+
+    def _settle_deploy(self, txn, mod, paks_path, undeployed):
+        if txn['state'] == 'end' and mod and self._all_present(txn['files']):
+            self._roll_forward(mod, txn['files'])
+            return
+        if mod is not None and undeployed:
+            mod['enabled'] = False
+            mod.pop('game_paths', None)
+        self._roll_back(txn['files'], mod, paks_path, txn['existed'])
+        if mod is not None and mod.get('enabled') and not self._recorded_present(mod):
+            mod['enabled'] = False
+            mod.pop('game_paths', None)
+
+    def _roll_forward(self, mod, files):
+        known = {entry['path']: entry for entry in normalize_game_paths(mod.get('game_paths', []))}
+        game_paths = []
+        for source, path in files:
+            entry = known.get(path) or {'path': path, 'method': self._guess_method(source, path)}
+            game_paths.append(entry)
+        mod['enabled'] = True
+        mod['game_paths'] = game_paths
+
+    def _settle_moves(self, mod, moves):
+        entries = normalize_game_paths(mod.get('game_paths', []))
+        for source, destination in moves:
+            if os.path.lexists(source) or not os.path.lexists(destination):
+                continue  # This rename never happened
+            for entry in entries:
+                path = entry['path']
+                if path == source:
+                    entry['path'] = destination
+                elif path.startswith(source + os.sep):
+                    entry['path'] = destination + path[len(source):]
+        mod['game_paths'] = entries
+
+    def _roll_back(self, files, mod, paks_path, existed=()):
+        # Files that were there before, or the record already owned (e.g. a redeploy), are left alone
+        owned = set(existed)
+        if mod is not None and mod.get('enabled'):
+            owned.update(entry['path'] for entry in normalize_game_paths(mod.get('game_paths', [])))
+        for source, path in reversed(files):
+            for leftover in (path + STAGING_SUFFIX, path):
+                if leftover == path and path in owned:
+                    continue
+                try:
+                    remove_deployed({'path': leftover, 'method': DEPLOY_COPY})
+                except OSError:
+                    pass
+        remove_empty_folders([os.path.dirname(path) for _, path in files], paks_path)
+
+    @staticmethod
+    def _all_present(files):
+        return all(os.path.lexists(path) for _, path in files)
+
+    @staticmethod
+    def _recorded_present(mod):
+        entries = normalize_game_paths(mod.get('game_paths', []))
+        return bool(entries) and all(os.path.lexists(entry['path']) for entry in entries)
+
+    @staticmethod
+    def _guess_method(source, path):
+        if os.path.islink(path):
+            return DEPLOY_SYMLINK
+        try:
+            if os.path.samefile(source, path):
+                return DEPLOY_HARDLINK
+        except OSError:
+            pass
+        return DEPLOY_COPY
+
+    # ----- file access -----
+
+    def _append(self, record):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record, separators=(',', ':')) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _read(self):
+        if not self.path.exists():
+            return []
+        records = []
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # A torn last line from the crash - everything before it counts
+                    break
+        return records
@@ -0,0 +1,177 @@
+"""Persisted load order and how it is laid out in the Paks folder
+
+Unreal mounts paks found under Paks/~mods after the game's own paks and,
+within the same priority, in path order - a pak mounted later overrides the
+assets of earlier ones. Every enabled PAK mod is therefore deployed to its
+own subfolder Paks/~mods/<key>_<mod id>/ where key is the mod's sparse,
+zero-padded load_order. Moving a mod only changes its own key, which is one
+folder rename on disk.
+"""
+import bisect
+import os
+
+from .deploy import LOAD_ORDER_WIDTH, deploy_target, mods_folder, normalize_game_paths
+
+# Gap between keys handed out at the end of the order, leaves room to insert
+LOAD_ORDER_STEP = 1024
+LOAD_ORDER_MAX = 10 ** LOAD_ORDER_WIDTH - 1
+
+
+def order_sort_key(mod):
+    """Sort key for mod records, mods without a load order go last"""
+    key = mod.get('load_order')
+    return (key is None, key or 0)
+
+
+def enabled_in_order(mods):
+    """Ids of enabled mods in their load order"""
+    enabled = [mod_id for mod_id, mod in mods.items() if mod.get('enabled')]
+    enabled.sort(key=lambda mod_id: order_sort_key(mods[mod_id]))
+    return enabled
+
+
+def next_order_key(mods):
+    """Key that puts a newly enabled mod at the end of the load order"""
+    keys = [mod['load_order'] for mod in mods.values()
+            if mod.get('enabled') and mod.get('load_order') is not None]
+    return (max(keys) if keys else 0) + LOAD_ORDER_STEP
+
+
+def assign_order_keys(ordered_ids, current_keys):
+    """New keys for the mods whose key doesn't fit the wanted order
+
+    The longest run of mods whose current keys are already increasing keeps
+    its keys; only the others get new ones, spread between their kept
+    neighbours. Returns {mod id: new key} for the changed mods only. When
+    there's no room left between two keys everything is renumbered.
+    """
+    ordered_ids = list(ordered_ids)
+    keys = [current_keys.get(mod_id) for mod_id in ordered_ids]
+    kept = _longest_increasing(keys)
+
+    changes = {}
+    previous = 0
+    index = 0
+    while index < len(ordered_ids):
+        if index in kept:
+            previous = keys[index]
+            index += 1
+            continue
+        # Gather the run of mods that need a key up to the next kept one
+        run_end = index
+        while run_end < len(ordered_ids) and run_end not in kept:
+            run_end += 1
+        following = keys[run_end] if run_end < len(ordered_ids) else None
+        count = run_end - index
+        if following is None:
+            gap = LOAD_ORDER_STEP
+        else:
+            gap = (following - previous) // (count + 1)
+        if gap < 1 or previous + gap * count > LOAD_ORDER_MAX:
+            return _renumber(ordered_ids, current_keys)
+        for offset in range(count):
+            changes[ordered_ids[index + offset]] = previous + gap * (offset + 1)
+        previous = previous + gap * count
+        index = run_end
+    return changes
+
+
+def _renumber(ordered_ids, current_keys):
+    changes = {}
+    for position, mod_id in enumerate(ordered_ids, 1):
+        key = position * LOAD_ORDER_STEP
+        if current_keys.get(mod_id) != key:
+            changes[mod_id] = key
+    return changes
+
+
+def _longest_increasing(keys):
+    """Indexes of a longest strictly increasing subsequence, ignoring None"""
+    tails = []      # smallest tail key of an increasing run of each length
+    tail_index = []
+    parents = [None] * len(keys)
+    for i, key in enumerate(keys):
+        if key is None:
+            continue
+        pos = bisect.bisect_left(tails, key)
+        parents[i] = tail_index[pos - 1] if pos else None
+        if pos == len(tails):
+            tails.append(key)
+            tail_index.append(i)
+        else:
+            tails[pos] = key
+            tail_index[pos] = i
+    kept = set()
+    i = tail_index[-1] if tail_index else None
+    while i is not None:
+        kept.add(i)
+        i = parents[i]
+    return kept
+
+
+def _common_folder(paths):
+    folders = {os.path.dirname(path) for path in paths}
+    return folders.pop() if len(folders) == 1 else None
+
+
+def order_in_place(mod, paks_path):
+    """True if a mod's deployed files already sit where its load_order says"""
+    if not mod.get('enabled') or mod.get('mod_type', 'PAK') == 'UE4SS' or mod.get('load_order') is None:
+        return True
+    entries = normalize_game_paths(mod.get('game_paths', []))
+    if not entries:
+        return True
+    current = _common_folder(entry['path'] for entry in entries)
+    return current is not None and os.path.normcase(current) == os.path.normcase(str(deploy_target(mod, paks_path)))
+
+
+def materialize_order(mod, paks_path, txn=None):
+    """Move an enabled PAK mod's deployed files to the folder for its load_order
+
+    Files that already sit together in their own ~mods subfolder are moved
+    with a single folder rename. Returns the number of renames done.
+    """
+    if order_in_place(mod, paks_path):
+        return 0
+    entries = normalize_game_paths(mod.get('game_paths', []))
+    target = deploy_target(mod, paks_path)
+    current = _common_folder(entry['path'] for entry in entries)
+
+    own_folder = (current is not None
+                  and os.path.isdir(current)
+                  and os.path.normcase(os.path.dirname(current)) == os.path.normcase(str(mods_folder(paks_path)))
+                  and len(os.listdir(current)) == len(entries)
+                  and not target.exists())
+    if own_folder:
+        # The mod has the folder to itself - one rename moves everything
+        if txn is not None:
+            txn.moving(current, target)
+        os.rename(current, target)
+        renames = 1
+    else:
+        target.mkdir(parents=True, exist_ok=True)
+        renames = 0
+        for entry in entries:
+            destination = target / os.path.basename(entry['path'])
+            if not os.path.lexists(entry['path']):
+                continue
+            if txn is not None:
+                txn.moving(entry['path'], destination)
+            os.replace(entry['path'], destination)
+            renames += 1
+        _remove_if_empty(current, paks_path)
+
+    for entry in entries:
+        entry['path'] = str(target / os.path.basename(entry['path']))
+    mod['game_paths'] = entries
+    return renames
+
+
+def _remove_if_empty(folder, paks_path):
+    """Delete a ~mods subfolder once nothing is left in it"""
+    if not folder or os.path.normcase(os.path.dirname(folder)) != os.path.normcase(str(mods_folder(paks_path))):
+        return
+    try:
+        os.rmdir(folder)
+    except OSError:
+        pass
@@ -0,0 +1,489 @@
+"""Headless mod manager: everything the GUI does, without Tk"""
+import shutil
+from pathlib import Path
+
+from .blobstore import BlobStore
+from .conflicts import AssetIndexCache, find_asset_conflicts
+from .database import BACKEND_JSON, open_database
+from .dependencies import DEPENDENCY_FIELDS, DependencyError, DependencyGraph, dependency_fields
+from .deploy import (
+    DEPLOY_AUTO, DEPLOY_COPY, DeploymentError, deploy_mod, deploy_target, normalize_game_paths, ue4ss_dll_path, undeploy_mod,
+)
+from .duplicates import DUPLICATE_HASH, DuplicateIndex, find_identical_files
+from .errors import ModNotFoundError, ModStateError, UE4SSMissingError
+from .fingerprint import FingerprintCache
+from .installer import install_archive
+from .journal import ACTION_DEPLOY, ACTION_UNDEPLOY, DeploymentJournal
+from .loadorder import next_order_key
+from .modinfo import LoadRules, ModInfoCache
+from .planner import apply_plan, plan_deployment
+from .profiles import PROFILES_FILE_NAME
+from .record import ModRecord, ModType, records_from_dicts
+from .search import SearchIndex
+from .solver import solve_load_order
+from .thumbnails import ThumbnailCache
+
+# Event kinds passed to listeners
+EVENT_MOD_INSTALLED = 'mod_installed'
+EVENT_MOD_ENABLED = 'mod_enabled'
+EVENT_MOD_DISABLED = 'mod_disabled'
+EVENT_MOD_DELETED = 'mod_deleted'
+EVENT_INSTALL_PROGRESS = 'install_progress'
+EVENT_DEPLOY_PROGRESS = 'deploy_progress'
+
+
+class ManagerEvent:
+    """Something the manager did, passed to every subscribed listener"""
+    __slots__ = ('kind', 'mod_id', 'done', 'total', 'detail')
+
+    def __init__(self, kind, mod_id=None, done=0, total=0, detail=None):
+        self.kind = kind
+        self.mod_id = mod_id
+        self.done = done
+        self.total = total
+        self.detail = detail
+
+    def __repr__(self):
+        return f"ManagerEvent({self.kind!r}, {self.mod_id!r})"
+
+
+def is_ue4ss_mod(mod):
+    return mod.get('mod_type', ModType.PAK) == ModType.UE4SS
+
+
+class ModManager:
+    """Mod database, installer, deployer and profiles for one game install
+
+    Nothing here shows dialogs: problems are raised as ModLoaderError
+    subclasses and progress is reported through subscribe(). With autosave
+    every change is written to mods.json right away; the GUI turns it off
+    and calls flush() from its own save timer instead. With the sqlite
+    backend records live in mods.db instead and lookups use its indexes;
+    only records passed to mark_changed() are written there, so code that
+    edits self.mods directly has to call it.
+    """
+
+    def __init__(self, paks_path, storage_path, strategy=DEPLOY_AUTO, autosave=True,
+                 mods_data_file=None, profiles_file=None, backend=BACKEND_JSON):
+        self.paks_path = str(paks_path)
+        self.strategy = strategy
+        self.autosave = autosave
+        self._listeners = []
+
+        self._search_index = None
+        self._duplicate_index = None
+        self._dependency_graph = None
+        self.mod_infos = ModInfoCache()
+        self.db = open_database(mods_data_file or Path(storage_path) / "mods.json", backend)
+        self.mods = records_from_dicts(self.db.load(), storage_path)
+        self.journal = DeploymentJournal.for_database(self.db.path)
+        self.profiles = self.db.profile_store(profiles_file or Path(storage_path) / PROFILES_FILE_NAME)
+        self.set_storage(storage_path)
+
+    def set_storage(self, storage_path):
+        """Point installs (and the file store) at a mods storage folder"""
+        self.storage_path = str(storage_path)
+        Path(storage_path).mkdir(parents=True, exist_ok=True)
+        self.blob_store = BlobStore.for_storage(storage_path)
+        self.fingerprints = FingerprintCache.for_storage(storage_path)
+        self.thumbnails = ThumbnailCache.for_storage(storage_path)
+        self.asset_indexes = AssetIndexCache.for_storage(storage_path)
+
+    # ----- events and persistence -----
+
+    def subscribe(self, listener):
+        """Call listener(event) for every ManagerEvent"""
+        self._listeners.append(listener)
+
+    def _emit(self, kind, mod_id=None, done=0, total=0, detail=None):
+        if self._listeners:
+            event = ManagerEvent(kind, mod_id, done, total, detail)
+            for listener in list(self._listeners):
+                listener(event)
+
+    def mark_changed(self, *mod_ids):
+        """Note that these mods' records changed (all of them if none are given)"""
+        self.db.mark_dirty(*mod_ids)
+        if self.autosave:
+            self.flush()
+
+    def flush(self):
+        """Write mods.json if it changed and forget journal entries it now covers"""
+        self.db.flush(self.mods)
+        self.journal.checkpoint()
+        self.fingerprints.save()
+
+    def close(self):
+        """Flush and release the database"""
+        self.flush()
+        self.db.close()
+
+    def recover(self):
+        """Finish or undo deployments a crash left half done, returns the affected mod ids"""
+        recovered = self.journal.recover(self.mods, self.paks_path)
+        if recovered:
+            self.db.mark_dirty(*recovered)
+            self.flush()
+        else:
+            self.journal.checkpoint()
+        return recovered
+
+    # ----- queries -----
+
+    def get(self, mod_id):
+        try:
+            return self.mods[mod_id]
+        except KeyError:
+            raise ModNotFoundError(mod_id) from None
+
+    def enabled_ids(self):
+        """Ids of enabled mods in their load order"""
+        return self.db.enabled_ids(self.mods)
+
+    def search(self, text='', enabled=None):
+        """Ids of mods whose name, description or author contain text, best match first
+
+        Answered from a SearchIndex built on first use and kept up to date
+        as mods are installed, deleted or reindexed; misspelled words still
+        find close matches. enabled=True/False limits the result to enabled
+        or disabled mods.
+        """
+        if self._search_index is None:
+            self._search_index = SearchIndex(self.mods)
+        ids = self._search_index.search(text)
+        if enabled is not None:
+            ids = [mod_id for mod_id in ids if bool(self.mods[mod_id].enabled) == enabled]
+        return ids
+
+    def reindex(self, mod_id):
+        """Update the search, duplicate and dependency indexes after a mod's record or files changed"""
+        if self._search_index is not None:
+            self._search_index.add(mod_id, self.get(mod_id))
+        if self._duplicate_index is not None:
+            self._duplicate_index.add(mod_id, self.get(mod_id))
+        if self._dependency_graph is not None:
+            mod = self.get(mod_id)
+            self._dependency_graph.add(mod_id, mod, self._dependency_fields(mod))
+
+    def mods_with_file(self, file_name):
+        return self.db.ids_with_file(self.mods, file_name)
+
+    def mods_with_hash(self, sha):
+        return self.db.ids_with_hash(self.mods, sha)
+
+    def ue4ss_installed(self):
+        return ue4ss_dll_path(self.paks_path).exists()
+
+    @property
+    def duplicates(self):
+        """DuplicateIndex of the library, built on first use and kept up to date"""
+        if self._duplicate_index is None:
+            self._duplicate_index = DuplicateIndex(self.mods)
+        return self._duplicate_index
+
+    def find_duplicates(self, content=False):
+        """Duplicate pairs from the duplicate index
+
+        With content=True identical files are found by reading the mod
+        folders (see find_identical_files) instead of relying only on the
+        hashes recorded at install.
+        """
+        duplicates = self.duplicates.duplicates()
+        if content:
+            duplicates = [dup for dup in duplicates if dup['type'] != DUPLICATE_HASH]
+            duplicates += find_identical_files(self.mods, self.fingerprints)
+            self.fingerprints.save()
+        return duplicates
+
+    def asset_conflicts(self, enabled_only=True):
+        """{asset path: [mod ids]} for assets several mods' .pak/.utoc files override, in load order
+
+        Indexes are read once per file version and cached in
+        asset_index.json; the last mod listed is the one the game uses.
+        """
+        if enabled_only:
+            mods = {mod_id: self.mods[mod_id] for mod_id in self.enabled_ids()}
+        else:
+            mods = self.mods
+        conflicts = find_asset_conflicts(mods, self.asset_indexes)
+        self.asset_indexes.save()
+        return conflicts
+
+    def _dependency_fields(self, mod):
+        """id / requires / conflicts of a mod, from modinfo.json for mods installed before they were recorded"""
+        if any(key in mod for key in DEPENDENCY_FIELDS):
+            return mod
+        return dependency_fields(self.mod_infos.get(mod))
+
+    @property
+    def dependencies(self):
+        """DependencyGraph of the library, built on first use and kept up to date"""
+        if self._dependency_graph is None:
+            graph = DependencyGraph()
+            for mod_id, mod in self.mods.items():
+                graph.add(mod_id, mod, self._dependency_fields(mod))
+            self._dependency_graph = graph
+        return self._dependency_graph
+
+    def resolve_dependencies(self, desired_ids, checked=None):
+        """Resolution for enabling desired_ids, with the mods they require added
+
+        Raises DependencyError (carrying the Resolution) when a requirement
+        can't be met by any installed mod or two of the mods conflict; with
+        checked only problems involving those mods count.
+        """
+        resolution = self.dependencies.resolve(desired_ids, checked)
+        if not resolution.ok:
+            raise DependencyError("\n".join(resolution.problems(self.mods)), resolution)
+        return resolution
+
+    def resolve_each(self, desired_ids, candidates):
+        """(Resolution, [(mod id, [problems])]) for adding candidates to desired_ids one by one
+
+        Candidates whose requirements can't be met or that conflict with the
+        mods before them are skipped instead of failing the whole set.
+        """
+        resolution, skipped = self.dependencies.resolve_each(desired_ids, candidates)
+        return resolution, [(mod_id, why.problems(self.mods)) for mod_id, why in skipped]
+
+    def duplicate_count(self):
+        """How many mods clash with another one, without rescanning the library"""
+        return self.duplicates.conflict_count
+
+    def verify(self):
+        """Check mod folders and deployed files, returns a list of (mod_id, problem)
+
+        Deployed copies are compared with the mod's own files by content,
+        through the fingerprint cache so unchanged files aren't read again.
+        """
+        problems = []
+        for mod_id, mod in self.mods.items():
+            mod_folder = Path(mod['folder'])
+            if not mod_folder.exists():
+                problems.append((mod_id, f"mod folder missing: {mod_folder}"))
+                continue
+            for file_name in mod['files']:
+                if not (mod_folder / file_name).exists():
+                    problems.append((mod_id, f"mod file missing: {file_name}"))
+            if not mod['enabled']:
+                continue
+            target = deploy_target(mod, self.paks_path)
+            for entry in normalize_game_paths(mod.get('game_paths', [])):
+                path = Path(entry['path'])
+                if not path.exists():
+                    problems.append((mod_id, f"deployed file missing: {path}"))
+                    continue
+                if entry.get('method') != DEPLOY_COPY:
+                    continue
+                try:
+                    file_name = str(path.relative_to(target))
+                except ValueError:
+                    file_name = path.name  # Deployed before the load order folders
+                source = mod_folder / file_name
+                if source.exists() and not self.fingerprints.same_content(source, path):
+                    problems.append((mod_id, f"deployed file differs from the mod: {path}"))
+        return problems
+
+    # ----- installing -----
+
+    def install(self, archive_paths, thumbnails=False):
+        """Install archives one after another, returns (results, [(archive, error)])
+
+        Failed archives don't stop the others. Icon thumbnails (which need
+        PIL) are only made with thumbnails=True. The GUI uses InstallQueue for
+        the same work in the background and hands results to add_install_result.
+        """
+        results = []
+        errors = []
+        for archive_path in archive_paths:
+            def on_progress(done, total, member, archive_path=archive_path):
+                self._emit(EVENT_INSTALL_PROGRESS, done=done, total=total, detail=archive_path)
+            try:
+                result = install_archive(archive_path, self.storage_path, progress=on_progress,
+                                         store=self.blob_store)
+            except Exception as e:
+                errors.append((archive_path, e))
+                continue
+            if thumbnails:
+                self.thumbnails.generate_for(result.mods.values())
+            self.add_install_result(result)
+            results.append(result)
+        return results, errors
+
+    def add_install_result(self, result):
+        """Add the mods from a finished install to the database"""
+        for mod_id, mod in result.mods.items():
+            self.mods[mod_id] = ModRecord.from_dict(mod, self.storage_path)
+            self.reindex(mod_id)
+            # The files are exactly what was hashed, so deploying them needn't read them again
+            for file_name, sha in mod.get('hashes', {}).items():
+                self.fingerprints.remember(Path(mod['folder']) / file_name, sha)
+        for mod_id in result.mods:
+            self._emit(EVENT_MOD_INSTALLED, mod_id, detail=result)
+        if result.mods:
+            self.mark_changed(*result.mods)
+
+    # ----- deploying -----
+
+    def enable(self, mod_id, require_ue4ss=True, resolve=True):
+        """Deploy one mod (and the mods it requires) to the end of the load order
+
+        Raises ModStateError if it's already enabled, DependencyError if its
+        requirements can't be met or it conflicts with an enabled mod,
+        DeploymentError if a folder is gone and UE4SSMissingError for a
+        UE4SS mod while UE4SS isn't installed (unless require_ue4ss is
+        False). Returns the ids of the dependencies enabled along with it.
+        """
+        mod = self.get(mod_id)
+        if mod['enabled']:
+            raise ModStateError(f"{mod['name']} is already enabled")
+        dependencies = []
+        if resolve:
+            dependencies = self.resolve_dependencies(self.enabled_ids() + [mod_id], checked=[mod_id]).added
+        # Check everything before deploying anything
+        for other_id in dependencies + [mod_id]:
+            other = self.mods[other_id]
+            if not Path(other['folder']).exists():
+                raise DeploymentError(f"Mod folder not found:\n{other['folder']}")
+            if require_ue4ss and is_ue4ss_mod(other) and not self.ue4ss_installed():
+                raise UE4SSMissingError(f"{other['name']} needs UE4SS, which isn't installed")
+
+        for other_id in dependencies + [mod_id]:
+            self._deploy(other_id)
+        return dependencies
+
+    def _deploy(self, mod_id):
+        mod = self.mods[mod_id]
+        # New mods go to the end of the load order (PAK mods into Paks/~mods/<key>_<id>)
+        mod['load_order'] = next_order_key(self.mods)
+        try:
+            with self.journal.transaction(mod_id, ACTION_DEPLOY) as txn:
+                deploy_mod(mod, self.paks_path, self.strategy, txn, self.fingerprints)
+        except BaseException:
+            mod.pop('load_order', None)
+            raise
+        self.mark_changed(mod_id)
+        self._emit(EVENT_MOD_ENABLED, mod_id)
+
+    def disable(self, mod_id):
+        """Take one mod's files out of the game"""
+        mod = self.get(mod_id)
+        if not mod['enabled']:
+            raise ModStateError(f"{mod['name']} is already disabled")
+        with self.journal.transaction(mod_id, ACTION_UNDEPLOY):
+            undeploy_mod(mod, self.paks_path)
+        mod.pop('load_order', None)
+        self.mark_changed(mod_id)
+        self._emit(EVENT_MOD_DISABLED, mod_id)
+
+    def delete(self, mod_id):
+        """Disable (if needed) and remove a mod and its stored files"""
+        mod = self.get(mod_id)
+        if mod['enabled']:
+            self.disable(mod_id)
+
+        # Delete mod folder and all its contents
+        mod_folder = Path(mod['folder'])
+        if mod_folder.exists():
+            shutil.rmtree(mod_folder)
+
+        # Free stored files no other mod links to
+        self.blob_store.release(mod.get('hashes', {}).values())
+
+        # And its icon thumbnails
+        self.thumbnails.forget(mod.get('icon', ''))
+
+        del self.mods[mod_id]
+        if self._search_index is not None:
+            self._search_index.remove(mod_id)
+        if self._duplicate_index is not None:
+            self._duplicate_index.remove(mod_id)
+        if self._dependency_graph is not None:
+            self._dependency_graph.remove(mod_id)
+        self.mark_changed(mod_id)
+        self._emit(EVENT_MOD_DELETED, mod_id, detail=mod)
+
+    def plan(self, desired_ids):
+        """Plan for deploying exactly desired_ids (in load order)"""
+        return plan_deployment(self.mods, desired_ids)
+
+    def apply(self, desired_ids, include_ue4ss=True, plan=None, resolve=False):
+        """Deploy exactly the given mods in the given order, touching only what differs
+
+        With include_ue4ss False, UE4SS mods that would be newly deployed are
+        left out. With resolve the mods they require are added first (see
+        resolve_dependencies, a plan passed in is then ignored). Returns the
+        PlanResult; mods that failed are listed in it.
+        """
+        if resolve:
+            desired_ids = self.resolve_dependencies(desired_ids).order
+            plan = None
+        plan = plan or self.plan(desired_ids)
+        if not include_ue4ss:
+            plan.to_add = [mod_id for mod_id in plan.to_add if not is_ue4ss_mod(self.mods[mod_id])]
+
+        def on_progress(done, total, mod_id):
+            self._emit(EVENT_DEPLOY_PROGRESS, mod_id, done, total)
+
+        before = {mod_id: mod['enabled'] for mod_id, mod in self.mods.items()}
+        result = apply_plan(plan, self.mods, self.paks_path, self.strategy, progress=on_progress,
+                            journal=self.journal, cache=self.fingerprints)
+        # Only mods the plan touched can have changed (load order keys, moved
+        # folders, half-done work of failed ones); unchanged records aren't rewritten
+        if plan.order or plan.to_remove:
+            self.mark_changed(*plan.order, *plan.to_remove)
+        for mod_id, mod in self.mods.items():
+            if mod['enabled'] != before.get(mod_id):
+                self._emit(EVENT_MOD_ENABLED if mod['enabled'] else EVENT_MOD_DISABLED, mod_id)
+        return result
+
+    def enable_all(self, include_ue4ss=True):
+        """Enable every mod that can be, keeping the current load order and appending the rest
+
+        Mods are resolved one at a time, so a missing requirement or a
+        conflict only keeps the mods involved disabled. Returns (PlanResult,
+        [(skipped mod id, [problems])]).
+        """
+        resolution, skipped = self.resolve_each(self.enabled_ids(), list(self.mods))
+        return self.apply(resolution.order, include_ue4ss), skipped
+
+    def disable_all(self):
+        return self.apply([])
+
+    def solve_load_order(self):
+        """LoadOrderSolution for the enabled mods from modinfo.json rules and asset conflicts
+
+        Rules may name mods by modinfo id, mod id or display name. Nothing is
+        applied; pass solution.order to apply() (or reorder()) to deploy it.
+        """
+        current = self.enabled_ids()
+        rules = {}
+        aliases = {}
+        for mod_id in current:
+            mod = self.mods[mod_id]
+            info = self.mod_infos.get(mod)
+            rules[mod_id] = LoadRules.from_info(info)
+            aliases.setdefault(mod['name'].casefold(), mod_id)
+            if isinstance(info.get('id'), str):
+                aliases[info['id'].casefold()] = mod_id
+        return solve_load_order(current, rules, self.asset_conflicts(), aliases)
+
+    def reorder(self, ordered_ids):
+        """Save a new load order for the enabled mods"""
+        return self.apply(ordered_ids)
+
+    # ----- profiles -----
+
+    def save_profile(self, name):
+        """Save the enabled mods (in load order) as a profile, returns their ids"""
+        enabled = self.enabled_ids()
+        self.profiles.set(name, enabled)
+        return enabled
+
+    def apply_profile(self, name, include_ue4ss=True):
+        """Switch to a saved profile, only touching mods that differ
+
+        Mods the profile's mods require are enabled with them; raises
+        DependencyError if the profile's mods can't be enabled together.
+        """
+        return self.apply(self.profiles.get(name), include_ue4ss, resolve=True)
@@ -0,0 +1,155 @@
+"""One-pass classification of a mod archive from its member listing"""
+import json
+
+from .archive import ArchiveError, find_member, safe_relative_path
+
+MOD_TYPE_PAK = 'PAK'
+MOD_TYPE_UE4SS = 'UE4SS'
+
+# Files that travel with a .pak when they share its base name
+PAK_COMPANION_EXTENSIONS = ('.ucas', '.utoc', '.sig', '.ini', '.txt')
+
+# UE4SS mod files: Lua scripts, Blueprint assets, C++ binaries
+UE4SS_SUBTYPE_EXTENSIONS = {
+    '.lua': 'Lua',
+    '.uasset': 'Blueprint',
+    '.umap': 'Blueprint',
+    '.dll': 'C++',
+}
+UE4SS_SUBTYPE_ORDER = ('Lua', 'Blueprint', 'C++')
+
+# Icon names tried when modinfo.json doesn't name one
+DEFAULT_ICON_NAMES = ('icon.png', 'icon.jpg', 'icon.jpeg')
+
+INVALID_ARCHIVE_MESSAGE = (
+    "No valid mod files found in the archive!\n\nSupported formats:\n"
+    "- PAK mods: .pak files\n"
+    "- UE4SS mods: .lua, .uasset, .umap, .dll files"
+)
+
+
+class PakGroup:
+    """A .pak file plus the .ucas/.utoc/.sig/etc. files that share its base name"""
+    __slots__ = ('stem', 'pak', 'members')
+
+    def __init__(self, stem, pak, members):
+        self.stem = stem
+        self.pak = pak
+        self.members = members
+
+    @property
+    def file_names(self):
+        return [member.basename for member in self.members]
+
+    def __repr__(self):
+        return f"PakGroup({self.stem!r}, {self.file_names})"
+
+
+class ArchiveManifest:
+    """What an archive contains, worked out from its listing alone"""
+
+    def __init__(self, members):
+        self.members = list(members)
+        self.pak_groups = []
+        self.ue4ss_files = []
+        self.modinfo = None
+        self._by_basename = {}
+
+        subtypes = set()
+        groups = {}
+        paks = []
+        modinfo_depth = None
+
+        # Single pass over the listing
+        for member in self.members:
+            path = member.path
+            suffix = path.suffix.lower()
+            basename = path.name.lower()
+            self._by_basename.setdefault(basename, []).append(member)
+
+            if suffix == '.pak':
+                paks.append(member)
+            elif suffix in UE4SS_SUBTYPE_EXTENSIONS:
+                self.ue4ss_files.append(member)
+                subtypes.add(UE4SS_SUBTYPE_EXTENSIONS[suffix])
+
+            if suffix in PAK_COMPANION_EXTENSIONS or suffix == '.pak':
+                key = (str(path.parent).lower(), path.stem.lower())
+                groups.setdefault(key, []).append(member)
+
+            if basename == 'modinfo.json':
+                depth = len(path.parts)
+                if modinfo_depth is None or depth < modinfo_depth:
+                    self.modinfo = member
+                    modinfo_depth = depth
+
+        for pak in paks:
+            path = pak.path
+            related = groups.get((str(path.parent).lower(), path.stem.lower()), [])
+            companions = [m for m in related
+                          if m is not pak and m.path.suffix.lower() in PAK_COMPANION_EXTENSIONS]
+            companions.sort(key=lambda m: PAK_COMPANION_EXTENSIONS.index(m.path.suffix.lower()))
+            self.pak_groups.append(PakGroup(path.stem, pak, [pak] + companions))
+
+        self.ue4ss_subtypes = [s for s in UE4SS_SUBTYPE_ORDER if s in subtypes]
+
+    @classmethod
+    def from_archive(cls, archive):
+        return cls(archive.members())
+
+    @property
+    def mod_type(self):
+        """PAK, UE4SS or None when the archive holds nothing installable"""
+        if self.pak_groups:
+            return MOD_TYPE_PAK
+        if self.ue4ss_files:
+            return MOD_TYPE_UE4SS
+        return None
+
+    @property
+    def ue4ss_subtype(self):
+        return "/".join(self.ue4ss_subtypes) if self.ue4ss_subtypes else "UE4SS"
+
+    def validate(self):
+        """Reject archives that can't be installed before anything is extracted"""
+        if self.mod_type is None:
+            raise ArchiveError(INVALID_ARCHIVE_MESSAGE)
+        if self.mod_type == MOD_TYPE_UE4SS:
+            # UE4SS mods are extracted with their folder structure, so check every path now
+            for member in self.members:
+                safe_relative_path(member.name)
+        return self
+
+    def find(self, pattern):
+        """Locate a member by name or rglob-style pattern"""
+        pattern = pattern.replace('\\', '/')
+        if not any(ch in pattern for ch in '*?[/'):
+            matches = self._by_basename.get(pattern.lower())
+            if not matches:
+                return None
+            return min(matches, key=lambda m: len(m.path.parts))
+        return find_member(self.members, pattern)
+
+    def find_icon(self, mod_info):
+        """Locate the icon named in modinfo.json, falling back to an icon next to it"""
+        if mod_info and mod_info.get('icon'):
+            return self.find(mod_info['icon'])
+        if self.modinfo is None:
+            return None
+        folder = self.modinfo.path.parent
+        for name in DEFAULT_ICON_NAMES:
+            for member in self._by_basename.get(name, []):
+                if member.path.parent == folder:
+                    return member
+        return None
+
+    def read_mod_info(self, archive):
+        """Decompress and parse modinfo.json (the only member read during detection)"""
+        if self.modinfo is None:
+            return None
+        try:
+            mod_info = json.loads(archive.read(self.modinfo).decode('utf-8-sig'))
+        except Exception:
+            return None
+        return mod_info if isinstance(mod_info, dict) else None
+
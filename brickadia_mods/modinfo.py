@@ -0,0 +1,86 @@
+"""modinfo.json fields used after install
+
+Every mod keeps the modinfo.json it came with in its folder. Fields the mod
+list doesn't need (load order rules and the like) are read from there on
+demand, so they also work for mods installed by older versions.
+"""
+import json
+import logging
+from pathlib import Path
+
+from .fingerprint import stat_fingerprint
+
+logger = logging.getLogger(__name__)
+
+MODINFO_FILE_NAME = "modinfo.json"
+
+
+def name_list(value):
+    """A modinfo field that may be one name or a list of them, as a list of strings"""
+    if isinstance(value, str):
+        return [value] if value.strip() else []
+    if isinstance(value, (list, tuple)):
+        return [item for item in value if isinstance(item, str) and item.strip()]
+    return []
+
+
+class LoadRules:
+    """load_after / load_before / priority from a modinfo.json
+
+    load_after and load_before name other mods (by modinfo id, mod id or
+    display name). Among mods that override the same assets, the one with
+    the higher priority loads later and wins.
+    """
+    __slots__ = ('load_after', 'load_before', 'priority')
+
+    def __init__(self, load_after=(), load_before=(), priority=0):
+        self.load_after = list(load_after)
+        self.load_before = list(load_before)
+        self.priority = priority
+
+    @classmethod
+    def from_info(cls, info):
+        try:
+            priority = int(info.get('priority', 0))
+        except (TypeError, ValueError):
+            priority = 0
+        return cls(name_list(info.get('load_after')), name_list(info.get('load_before')), priority)
+
+    def __bool__(self):
+        return bool(self.load_after or self.load_before or self.priority)
+
+    def __repr__(self):
+        return (f"LoadRules(load_after={self.load_after!r}, load_before={self.load_before!r}, "
+                f"priority={self.priority!r})")
+
+
+class ModInfoCache:
+    """Parsed modinfo.json of each mod folder, read again only when the file changes"""
+
+    def __init__(self):
+        self._entries = {}  # path -> (fingerprint, info)
+
+    def get(self, mod):
+        """The mod's modinfo.json as a dict ({} if it has none or it can't be read)"""
+        path = str(Path(mod['folder']) / MODINFO_FILE_NAME)
+        fingerprint = stat_fingerprint(path)
+        if fingerprint is None:
+            self._entries.pop(path, None)
+            return {}
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == fingerprint:
+            return entry[1]
+
+        try:
+            with open(path, 'r', encoding='utf-8-sig') as f:
+                info = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Could not read %s: %s", path, e)
+            info = {}
+        if not isinstance(info, dict):
+            info = {}
+        self._entries[path] = (fingerprint, info)
+        return info
+
+    def rules(self, mod):
+        return LoadRules.from_info(self.get(mod))
@@ -0,0 +1,176 @@
+"""Reading the file list of Unreal .pak archives
+
+Only the footer and the index are read (a few seeks at the end of the
+file), never the packed data, so listing a multi-GB pak costs about as
+much as listing a small one. Pak versions 1 to 11 are understood;
+encrypted indexes can't be read without the game's key.
+"""
+import os
+import struct
+
+from .errors import ModLoaderError
+
+PAK_MAGIC = 0x5A6F12E1
+
+# Versions that changed the footer or index layout
+PAK_VERSION_NO_TIMESTAMPS = 2
+PAK_VERSION_COMPRESSION_ENCRYPTION = 3
+PAK_VERSION_INDEX_ENCRYPTION = 4
+PAK_VERSION_ENCRYPTION_KEY_GUID = 7
+PAK_VERSION_FNAME_COMPRESSION = 8
+PAK_VERSION_FROZEN_INDEX = 9
+PAK_VERSION_PATH_HASH_INDEX = 10
+PAK_VERSION_LATEST = 11
+
+# magic, version, index offset, index size, index SHA-1
+_FOOTER = struct.Struct('<Iiqq20s')
+_COMPRESSION_NAME_SIZE = 32
+
+
+class PakError(ModLoaderError):
+    """A .pak file whose index can't be read"""
+
+
+def _footer_layouts():
+    """(version, footer size, offset of the magic in it) for each layout, newest first"""
+    layouts = []
+    for version in range(PAK_VERSION_LATEST, 0, -1):
+        before = 0
+        if version >= PAK_VERSION_ENCRYPTION_KEY_GUID:
+            before += 16  # encryption key GUID
+        if version >= PAK_VERSION_INDEX_ENCRYPTION:
+            before += 1   # index is encrypted
+        size = before + _FOOTER.size
+        if version == PAK_VERSION_FROZEN_INDEX:
+            size += 1     # index is frozen
+        if version >= PAK_VERSION_FNAME_COMPRESSION:
+            # Compression method names; early 4.22 v8 paks had room for 4 of them
+            for names in ((5, 4) if version == PAK_VERSION_FNAME_COMPRESSION else (5,)):
+                layouts.append((version, size + names * _COMPRESSION_NAME_SIZE, before))
+        else:
+            layouts.append((version, size, before))
+    return layouts
+
+
+_LAYOUTS = _footer_layouts()
+
+
+class BinaryReader:
+    """Little-endian reads from an in-memory index"""
+
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.pos = 0
+
+    def unpack(self, fmt):
+        values = struct.unpack_from(fmt, self.data, self.pos)
+        self.pos += struct.calcsize(fmt)
+        return values
+
+    def int32(self):
+        return self.unpack('<i')[0]
+
+    def skip(self, size):
+        self.pos += size
+        if self.pos > len(self.data):
+            raise struct.error("read past the end of the index")
+
+    def string(self):
+        """FString: length with terminator, negative for UTF-16"""
+        length = self.int32()
+        if length == 0:
+            return ''
+        if length > 0:
+            raw = bytes(self.data[self.pos:self.pos + length])
+            self.skip(length)
+            return raw[:-1].decode('utf-8', errors='replace')
+        raw = bytes(self.data[self.pos:self.pos - length * 2])
+        self.skip(-length * 2)
+        return raw[:-2].decode('utf-16-le', errors='replace')
+
+
+def _skip_entry(reader, version):
+    """Skip one FPakEntry as written in the (legacy) index"""
+    reader.skip(24)  # offset, size, uncompressed size
+    if version >= PAK_VERSION_FNAME_COMPRESSION:
+        compression = reader.unpack('<I')[0]
+    else:
+        compression = reader.int32()
+    if version < PAK_VERSION_NO_TIMESTAMPS:
+        reader.skip(8)
+    reader.skip(20)  # SHA-1
+    if version >= PAK_VERSION_COMPRESSION_ENCRYPTION:
+        if compression:
+            reader.skip(reader.int32() * 16)  # compression blocks
+        reader.skip(5)  # encrypted flag, compression block size
+
+
+def _read_footer(f, file_size):
+    for version, size, magic_at in _LAYOUTS:
+        if size > file_size:
+            continue
+        f.seek(file_size - size)
+        footer = f.read(size)
+        magic, found_version, index_offset, index_size, _sha = _FOOTER.unpack_from(footer, magic_at)
+        if magic == PAK_MAGIC and found_version == version:
+            encrypted = version >= PAK_VERSION_INDEX_ENCRYPTION and footer[magic_at - 1] != 0
+            frozen = version == PAK_VERSION_FROZEN_INDEX and footer[magic_at + _FOOTER.size] != 0
+            return version, index_offset, index_size, encrypted, frozen
+    raise PakError("not a .pak file (no pak footer found)")
+
+
+def _read_at(f, file_size, offset, size):
+    if offset < 0 or size < 0 or offset + size > file_size:
+        raise PakError("pak index points outside the file")
+    f.seek(offset)
+    return f.read(size)
+
+
+def read_pak_index(path):
+    """(mount point, [file paths inside the pak]) of a .pak, reading only its index
+
+    Raises PakError for files that aren't paks or whose index is encrypted.
+    """
+    file_size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        version, index_offset, index_size, encrypted, frozen = _read_footer(f, file_size)
+        if encrypted:
+            raise PakError("pak index is encrypted")
+        if frozen:
+            raise PakError("frozen pak indexes aren't supported")
+        reader = BinaryReader(_read_at(f, file_size, index_offset, index_size))
+        try:
+            mount_point = reader.string()
+            count = reader.int32()
+            if version < PAK_VERSION_PATH_HASH_INDEX:
+                paths = []
+                for _ in range(count):
+                    paths.append(reader.string())
+                    _skip_entry(reader, version)
+                return mount_point, paths
+
+            # v10+: names live in the full directory index, stored separately
+            reader.skip(8)  # path hash seed
+            if reader.int32():
+                reader.skip(36)  # path hash index offset, size, SHA-1
+            if not reader.int32():
+                raise PakError("pak has no full directory index")
+            directory_offset, directory_size = reader.unpack('<qq')
+            directories = BinaryReader(_read_at(f, file_size, directory_offset, directory_size))
+            paths = []
+            for _ in range(directories.int32()):
+                directory = directories.string()
+                for _ in range(directories.int32()):
+                    paths.append(directory + directories.string())
+                    directories.skip(4)  # entry location
+            return mount_point, [path.lstrip('/') for path in paths]
+        except struct.error as e:
+            raise PakError(f"pak index is damaged: {e}") from None
+
+
+def asset_path(mount_point, file_path):
+    """Game-relative asset path of a file in a pak, e.g. Brickadia/Content/Props/Lamp.uasset"""
+    mount = mount_point.replace('\\', '/')
+    while mount.startswith('../'):
+        mount = mount[3:]
+    return (mount.strip('/') + '/' + file_path.replace('\\', '/').lstrip('/')).lstrip('/')
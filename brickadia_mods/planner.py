@@ -0,0 +1,149 @@
+"""Work out the smallest set of changes that gets the game to a wanted mod set"""
+from contextlib import nullcontext
+
+from .deploy import deploy_mod, is_deployed, undeploy_mod
+from .journal import ACTION_DEPLOY, ACTION_REORDER, ACTION_UNDEPLOY
+from .loadorder import assign_order_keys, materialize_order, order_in_place
+
+
+class DeploymentPlan:
+    """What has to happen to go from the deployed mods to the desired ones
+
+    to_remove and to_add hold mod ids. to_add also contains enabled mods
+    whose files went missing from the game folder, so they get redeployed.
+    order is the full wanted load order and load_order maps mod ids to a new
+    load order key for the mods that have to move.
+    """
+    __slots__ = ('to_remove', 'to_add', 'order', 'load_order', 'unknown')
+
+    def __init__(self):
+        self.to_remove = []
+        self.to_add = []
+        self.order = []
+        self.load_order = {}
+        self.unknown = []
+
+    @property
+    def empty(self):
+        return not (self.to_remove or self.to_add or self.load_order)
+
+    def __repr__(self):
+        return (f"DeploymentPlan(remove={len(self.to_remove)}, add={len(self.to_add)}, "
+                f"reorder={len(self.load_order)})")
+
+
+class PlanResult:
+    """What apply_plan actually did"""
+    __slots__ = ('added', 'removed', 'reordered', 'renames', 'failed')
+
+    def __init__(self):
+        self.added = []
+        self.removed = []
+        self.reordered = []
+        self.renames = 0
+        self.failed = []  # (mod_id, exception)
+
+    @property
+    def changed(self):
+        return bool(self.added or self.removed or self.reordered)
+
+
+def plan_deployment(mods, desired_ids):
+    """Compare the mods database with the wanted enabled mods (in load order)
+
+    Mods that are enabled, wanted and still present in the game are left
+    alone, so switching between similar profiles only touches the mods that
+    differ. Only mods that actually move in the load order get a new key.
+    """
+    desired = []
+    seen = set()
+    plan = DeploymentPlan()
+    for mod_id in desired_ids:
+        if mod_id in seen:
+            continue
+        seen.add(mod_id)
+        if mod_id in mods:
+            desired.append(mod_id)
+        else:
+            plan.unknown.append(mod_id)
+
+    wanted = set(desired)
+    for mod_id, mod in mods.items():
+        if mod['enabled'] and mod_id not in wanted:
+            plan.to_remove.append(mod_id)
+
+    current_keys = {}
+    for mod_id in desired:
+        mod = mods[mod_id]
+        if not is_deployed(mod):
+            plan.to_add.append(mod_id)
+        if mod['enabled']:
+            current_keys[mod_id] = mod.get('load_order')
+    plan.order = desired
+    plan.load_order = assign_order_keys(desired, current_keys)
+    return plan
+
+
+def apply_plan(plan, mods, paks_path, strategy, progress=None, journal=None, cache=None):
+    """Carry out a plan against the game folder, updating the mod records in place
+
+    Removals run first so files shared by an outgoing and an incoming mod
+    end up belonging to the incoming one. A mod that fails is recorded in
+    the result and the rest of the plan still runs. progress, if given, is
+    called as progress(done, total, mod_id). With a DeploymentJournal each
+    mod runs as its own journal transaction, and a FingerprintCache lets
+    files that are already in place be skipped.
+    """
+    def transaction(mod_id, action):
+        if journal is None:
+            return nullcontext()
+        return journal.transaction(mod_id, action)
+
+    result = PlanResult()
+    total = len(plan.to_remove) + len(plan.to_add)
+    done = 0
+
+    for mod_id in plan.to_remove:
+        try:
+            with transaction(mod_id, ACTION_UNDEPLOY):
+                undeploy_mod(mods[mod_id], paks_path)
+            mods[mod_id].pop('load_order', None)
+            result.removed.append(mod_id)
+        except Exception as e:
+            result.failed.append((mod_id, e))
+        done += 1
+        if progress:
+            progress(done, total, mod_id)
+
+    # New keys first, then move deployed mods whose folder no longer matches
+    # their key (that includes mods deployed before load orders were kept)
+    adding = set(plan.to_add)
+    for mod_id in plan.order:
+        mod = mods[mod_id]
+        if mod_id in plan.load_order:
+            mod['load_order'] = plan.load_order[mod_id]
+            result.reordered.append(mod_id)
+        if mod_id in adding or order_in_place(mod, paks_path):
+            continue
+        try:
+            with transaction(mod_id, ACTION_REORDER) as txn:
+                result.renames += materialize_order(mod, paks_path, txn)
+        except Exception as e:
+            result.failed.append((mod_id, e))
+
+    for mod_id in plan.to_add:
+        mod = mods[mod_id]
+        try:
+            if mod['enabled']:
+                # Enabled but files missing - clear what is left before redeploying
+                with transaction(mod_id, ACTION_UNDEPLOY):
+                    undeploy_mod(mod, paks_path)
+            with transaction(mod_id, ACTION_DEPLOY) as txn:
+                deploy_mod(mod, paks_path, strategy, txn, cache)
+            result.added.append(mod_id)
+        except Exception as e:
+            result.failed.append((mod_id, e))
+        done += 1
+        if progress:
+            progress(done, total, mod_id)
+    return result
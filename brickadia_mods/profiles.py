@@ -0,0 +1,53 @@
+"""Saved sets of enabled mods"""
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from .errors import ProfileNotFoundError
+
+PROFILES_FILE_NAME = "profiles.json"
+
+
+class ProfileStore:
+    """profiles.json: profile name -> list of mod ids in load order"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.profiles = self._load()
+
+    def names(self):
+        return list(self.profiles.keys())
+
+    def get(self, name):
+        try:
+            return list(self.profiles[name])
+        except KeyError:
+            raise ProfileNotFoundError(name) from None
+
+    def set(self, name, mod_ids):
+        self.profiles[name] = list(mod_ids)
+        self.save()
+
+    def delete(self, name):
+        if name not in self.profiles:
+            raise ProfileNotFoundError(name)
+        del self.profiles[name]
+        self.save()
+
+    def save(self):
+        """Write profiles.json through a temp file so it's never left half written"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.profiles, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def _load(self):
+        if self.path.exists():
+            try:
+                with open(self.path, 'r') as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                pass
+        return {}
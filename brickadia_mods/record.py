@@ -0,0 +1,215 @@
+"""Compact in-memory mod records
+
+A library of thousands of mods used to be a dict per mod, each carrying its
+own copy of every key and two absolute paths. ModRecord keeps the same
+fields in __slots__, stores folder and icon relative to the mods storage
+folder and the file list as a tuple. It still behaves like the old dict
+(mod['name'], mod.get('icon', ''), mod.pop('load_order', None) ...) and
+to_dict() gives back exactly the mods.json entry it was made from.
+"""
+import os
+from collections.abc import MutableMapping
+from enum import Enum
+
+from .manifest import MOD_TYPE_PAK, MOD_TYPE_UE4SS
+
+
+class ModType(str, Enum):
+    """Kind of mod, compares equal to the plain strings in mods.json"""
+    PAK = MOD_TYPE_PAK
+    UE4SS = MOD_TYPE_UE4SS
+
+    __str__ = str.__str__
+    __format__ = str.__format__
+
+
+# mods.json keys in the order they're written, with the value an absent key reads as
+FIELD_DEFAULTS = {
+    'name': '',
+    'folder': '',
+    'files': (),
+    'enabled': False,
+    'mod_type': ModType.PAK,
+    'description': '',
+    'author': '',
+    'version': '',
+    'modinfo_id': '',
+    'requires': None,
+    'conflicts': None,
+    'icon': '',
+    'hashes': None,
+    'load_order': None,
+    'game_paths': None,
+}
+_FIELDS = frozenset(FIELD_DEFAULTS)
+
+# Every record points at one shared set of the keys it lacks (most lack the same few)
+_absent_sets = {}
+
+
+def _shared(absent):
+    return _absent_sets.setdefault(absent, absent)
+
+
+def _mod_type(value):
+    try:
+        return ModType(value)
+    except ValueError:
+        return value  # A kind this version doesn't know, kept as written
+
+
+class ModRecord(MutableMapping):
+    """One installed mod, slot-based but read and written like the mods.json dict"""
+    __slots__ = ('name', '_folder', 'files', 'enabled', 'mod_type', 'description', 'author', 'version',
+                 'modinfo_id', 'requires', 'conflicts', '_icon', 'hashes', 'load_order', 'game_paths',
+                 'extra', '_absent', '_base', '_relative_paths')
+
+    def __init__(self, base=''):
+        self._base = str(base)
+        self._relative_paths = 0
+        self._absent = _shared(_FIELDS)
+        self.extra = None
+        for key, value in FIELD_DEFAULTS.items():
+            setattr(self, key, value)
+
+    @classmethod
+    def from_dict(cls, data, base=''):
+        """Record for a mods.json entry; paths under base are kept relative to it"""
+        record = cls.__new__(cls)
+        record._base = str(base)
+        record._relative_paths = 0
+        record._absent = _shared(_FIELDS.difference(data))
+        record.extra = None
+        for key, value in FIELD_DEFAULTS.items():
+            setattr(record, key, value)
+        for key, value in data.items():
+            if key in _FIELDS:
+                record._set(key, value)
+            else:
+                if record.extra is None:
+                    record.extra = {}
+                record.extra[key] = value
+        return record
+
+    def to_dict(self):
+        """The mods.json entry for this record"""
+        data = {key: getattr(self, key) for key in FIELD_DEFAULTS if key not in self._absent}
+        if 'files' in data:
+            data['files'] = list(self.files)
+        if 'mod_type' in data and isinstance(self.mod_type, ModType):
+            data['mod_type'] = self.mod_type.value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    # ----- folder and icon are stored relative to the storage folder -----
+
+    def _relative(self, path, bit):
+        """Strip the storage folder from path, remembering that it was stripped"""
+        path = str(path)
+        base = self._base
+        if base and path.startswith(base) and path[len(base):len(base) + 1] == os.sep:
+            self._relative_paths |= bit
+            return path[len(base) + 1:]
+        self._relative_paths &= ~bit
+        return path
+
+    def _absolute(self, path, bit):
+        if self._relative_paths & bit:
+            return self._base + os.sep + path
+        return path
+
+    @property
+    def folder(self):
+        return self._absolute(self._folder, 1)
+
+    @folder.setter
+    def folder(self, path):
+        self._folder = self._relative(path, 1)
+
+    @property
+    def icon(self):
+        return self._absolute(self._icon, 2)
+
+    @icon.setter
+    def icon(self, path):
+        self._icon = self._relative(path, 2)
+
+    # ----- dict interface -----
+
+    def _set(self, key, value):
+        if key == 'files':
+            value = tuple(value)
+        elif key == 'mod_type':
+            value = _mod_type(value)
+        setattr(self, key, value)
+
+    def __getitem__(self, key):
+        if key in _FIELDS:
+            if key in self._absent:
+                raise KeyError(key)
+            return getattr(self, key)
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in _FIELDS:
+            self._set(key, value)
+            if key in self._absent:
+                self._absent = _shared(self._absent - {key})
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key):
+        if key in _FIELDS:
+            if key in self._absent:
+                raise KeyError(key)
+            setattr(self, key, FIELD_DEFAULTS[key])
+            self._absent = _shared(self._absent | {key})
+        elif self.extra is not None and key in self.extra:
+            del self.extra[key]
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        for key in FIELD_DEFAULTS:
+            if key not in self._absent:
+                yield key
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self):
+        return len(_FIELDS) - len(self._absent) + len(self.extra or ())
+
+    def __contains__(self, key):
+        if key in _FIELDS:
+            return key not in self._absent
+        return self.extra is not None and key in self.extra
+
+    def __eq__(self, other):
+        if isinstance(other, ModRecord):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"ModRecord({self.to_dict()!r})"
+
+
+def records_from_dicts(mods, base=''):
+    """{mod id: ModRecord} for a mods dict as read from mods.json"""
+    base = str(base)
+    return {mod_id: ModRecord.from_dict(mod, base) for mod_id, mod in mods.items()}
+
+
+def encode_record(value):
+    """json.dump default= hook that writes ModRecords as their mods.json dicts"""
+    if isinstance(value, ModRecord):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,208 @@
+"""In-memory search index over mod names, authors and descriptions
+
+Each mod's text is normalized once (accents stripped, case-folded) and
+split into words. Words are indexed by their trigrams, so a substring query
+only looks at mods using a word that contains each piece of it. When
+nothing contains the query, its words are matched against indexed words by
+trigram similarity to forgive typos.
+"""
+import re
+import unicodedata
+from collections import defaultdict
+
+_WORD = re.compile(r"\w+")
+
+# Ranks of a substring match, best first
+RANK_EXACT_NAME = 100
+RANK_NAME_PREFIX = 80
+RANK_WORD_PREFIX = 60
+RANK_IN_NAME = 50
+RANK_IN_AUTHOR = 30
+RANK_IN_DESCRIPTION = 20
+RANK_FUZZY = 10
+
+# Least trigram similarity for a misspelled word to count as a match
+FUZZY_THRESHOLD = 0.25
+
+
+def normalize(text):
+    """Case-folded text with accents removed"""
+    text = unicodedata.normalize('NFKD', text)
+    if not text.isascii():
+        text = ''.join(c for c in text if not unicodedata.combining(c))
+    return text.casefold()
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _word_trigrams(word):
+    """Trigrams of a word padded with spaces, so its start and end count too"""
+    padded = f" {word} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+class _Entry:
+    __slots__ = ('order', 'name', 'name_words', 'author', 'text', 'words')
+
+    def __init__(self, order, name, author, text, words):
+        self.order = order
+        self.name = name
+        self.name_words = ' ' + ' '.join(_WORD.findall(name))  # " word word" for word-prefix checks
+        self.author = author
+        self.text = text
+        self.words = words
+
+
+class SearchIndex:
+    """Ranked substring and fuzzy search, updated one mod at a time"""
+
+    def __init__(self, mods=None):
+        self._entries = {}
+        self._words = {}                      # word -> mod ids that use it
+        self._word_grams = defaultdict(set)   # trigram of " word " -> words
+        self._next_order = 0
+        for mod_id, mod in (mods or {}).items():
+            self.add(mod_id, mod)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, mod_id):
+        return mod_id in self._entries
+
+    def add(self, mod_id, mod):
+        """Index a mod (again, if its name, author or description changed)"""
+        old = self._entries.get(mod_id)
+        if old is not None:
+            self._unindex(mod_id, old)
+            order = old.order
+        else:
+            order = self._next_order
+            self._next_order += 1
+        name = normalize(mod.get('name', ''))
+        author = normalize(mod.get('author', ''))
+        # Same text the mod list filter has always matched against
+        text = f"{name} {normalize(mod.get('description', ''))} {author}"
+        words = frozenset(_WORD.findall(text))
+        self._entries[mod_id] = _Entry(order, name, author, text, words)
+
+        for word in words:
+            ids = self._words.get(word)
+            if ids is None:
+                ids = self._words[word] = set()
+                for gram in _word_trigrams(word):
+                    self._word_grams[gram].add(word)
+            ids.add(mod_id)
+
+    def remove(self, mod_id):
+        entry = self._entries.pop(mod_id, None)
+        if entry is not None:
+            self._unindex(mod_id, entry)
+
+    def _unindex(self, mod_id, entry):
+        for word in entry.words:
+            ids = self._words[word]
+            ids.discard(mod_id)
+            if not ids:
+                del self._words[word]
+                for gram in _word_trigrams(word):
+                    words = self._word_grams[gram]
+                    words.discard(word)
+                    if not words:
+                        del self._word_grams[gram]
+
+    def search(self, query):
+        """Mod ids matching query, best match first (then in the order they were added)
+
+        Mods whose name, description or author contain the query come first;
+        only when there are none are misspelled words tried.
+        """
+        query = normalize(query).strip()
+        if not query:
+            return list(self._entries)
+
+        matches = self._substring_matches(query)
+        if not matches:
+            fuzzy = self._fuzzy_matches(query)
+            return sorted(fuzzy, key=lambda mod_id: (-fuzzy[mod_id], self._entries[mod_id].order))
+
+        # Bucket by rank; matches are already in the order the mods were added
+        buckets = defaultdict(list)
+        word_start = ' ' + query
+        entries = self._entries
+        for mod_id in matches:
+            entry = entries[mod_id]
+            name = entry.name
+            if query in name:
+                if name == query:
+                    rank = RANK_EXACT_NAME
+                elif name.startswith(query):
+                    rank = RANK_NAME_PREFIX
+                elif word_start in entry.name_words:
+                    rank = RANK_WORD_PREFIX
+                else:
+                    rank = RANK_IN_NAME
+            elif query in entry.author:
+                rank = RANK_IN_AUTHOR
+            else:
+                rank = RANK_IN_DESCRIPTION
+            buckets[rank].append(mod_id)
+        return [mod_id for rank in sorted(buckets, reverse=True) for mod_id in buckets[rank]]
+
+    def _words_containing(self, part):
+        """Indexed words that contain part (at least 3 characters long)"""
+        grams = sorted((self._word_grams.get(gram, ()) for gram in _word_trigrams(part)[1:-1]), key=len)
+        if not grams or not grams[0]:
+            return []
+        return [word for word in grams[0] if part in word]
+
+    def _substring_matches(self, query):
+        parts = [part for part in _WORD.findall(query) if len(part) >= 3]
+        if not parts:
+            # Too short to narrow down by trigrams, check every mod's text
+            return [mod_id for mod_id, entry in self._entries.items() if query in entry.text]
+
+        # Every word piece of the query must be inside some word of the mod
+        candidates = None
+        for part in sorted(parts, key=len, reverse=True):
+            ids = set()
+            for word in self._words_containing(part):
+                ids.update(self._words[word])
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return []
+        entries = self._entries
+        found = [mod_id for mod_id in candidates if query in entries[mod_id].text]
+        found.sort(key=lambda mod_id: entries[mod_id].order)
+        return found
+
+    def _fuzzy_matches(self, query):
+        """{mod id: score} of mods that have a close word for every query word"""
+        scores = None
+        for query_word in _WORD.findall(query):
+            if len(query_word) < 3:
+                continue
+            query_grams = _word_trigrams(query_word)
+            shared = defaultdict(int)
+            for gram in query_grams:
+                for word in self._word_grams.get(gram, ()):
+                    shared[word] += 1
+
+            best = {}
+            for word, count in shared.items():
+                similarity = count / (len(query_grams) + len(word) - count)  # a word has len(word) trigrams
+                if similarity < FUZZY_THRESHOLD:
+                    continue
+                for mod_id in self._words[word]:
+                    if similarity > best.get(mod_id, 0):
+                        best[mod_id] = similarity
+            if scores is None:
+                scores = best
+            else:
+                scores = {mod_id: scores[mod_id] + similarity
+                          for mod_id, similarity in best.items() if mod_id in scores}
+            if not scores:
+                return {}
+        return {mod_id: RANK_FUZZY * score for mod_id, score in (scores or {}).items()}
@@ -0,0 +1,139 @@
+"""Working out a load order from modinfo.json rules and asset conflicts
+
+Rules (load_after / load_before) are hard constraints. Between two mods
+that override the same assets, the one with the higher priority has to load
+later. A mod only moves when it has to load before a mod that is above it
+now: it is pulled up right in front of that mod. Everything else keeps its
+relative order, so sorting an already sorted list moves nothing (each
+moved mod is a folder rename on disk).
+"""
+from itertools import combinations
+
+_VISITING = 1
+_PLACED = 2
+
+
+class LoadOrderSolution:
+    """Result of solve_load_order"""
+    __slots__ = ('order', 'cycles', 'missing')
+
+    def __init__(self, order, cycles, missing):
+        self.order = order      # mod ids, first loaded first
+        self.cycles = cycles    # [[mod id, ...]] rules that contradict each other (each broken once)
+        self.missing = missing  # [(mod id, name)] rules naming a mod that isn't enabled
+
+    def __repr__(self):
+        return f"LoadOrderSolution(mods={len(self.order)}, cycles={len(self.cycles)}, missing={len(self.missing)})"
+
+
+def _reaches(successors, start, goal):
+    """True if goal can be reached from start"""
+    stack = [start]
+    seen = {start}
+    while stack:
+        node = stack.pop()
+        if node == goal:
+            return True
+        for following in successors[node]:
+            if following not in seen:
+                seen.add(following)
+                stack.append(following)
+    return False
+
+
+def solve_load_order(current_order, rules, conflicts=None, aliases=None):
+    """Load order meeting the constraints that moves as few mods as it can
+
+    current_order: enabled mod ids in their present load order.
+    rules: {mod id: LoadRules}; conflicts: {asset: [mod ids]} as from
+    find_asset_conflicts; aliases: {case-folded name: mod id} for the
+    names rules may use besides mod ids. Contradicting rules don't fail the
+    sort: the cycle is broken at one of its rules and reported, starting
+    from its earliest mod.
+    """
+    aliases = aliases or {}
+    position = {mod_id: index for index, mod_id in enumerate(current_order)}
+    successors = {mod_id: set() for mod_id in current_order}
+    missing = []
+
+    def resolve(name):
+        if name in position:
+            return name
+        return aliases.get(name.casefold())
+
+    def add_edge(first, then):
+        if first != then:
+            successors[first].add(then)
+
+    # Hard constraints from modinfo.json
+    for mod_id in current_order:
+        mod_rules = rules.get(mod_id)
+        if not mod_rules:
+            continue
+        for name in mod_rules.load_after:
+            other = resolve(name)
+            if other is None:
+                missing.append((mod_id, name))
+            else:
+                add_edge(other, mod_id)
+        for name in mod_rules.load_before:
+            other = resolve(name)
+            if other is None:
+                missing.append((mod_id, name))
+            else:
+                add_edge(mod_id, other)
+
+    # Conflicting mods: lower priority first, unless the rules already say otherwise
+    def priority(mod_id):
+        return rules[mod_id].priority if mod_id in rules else 0
+
+    pairs = set()
+    for mod_ids in (conflicts or {}).values():
+        present = sorted(mod_id for mod_id in set(mod_ids) if mod_id in position)
+        for a, b in combinations(present, 2):
+            if priority(a) != priority(b):
+                pairs.add((a, b) if priority(a) < priority(b) else (b, a))
+    # Biggest priority gaps first; independent of the current order so a sorted list stays put
+    for low, high in sorted(pairs, key=lambda pair: (priority(pair[0]) - priority(pair[1]), pair)):
+        if high not in successors[low] and not _reaches(successors, high, low):
+            successors[low].add(high)
+
+    # Walk the current order; before placing a mod, pull the mods that must
+    # load before it (in their current order) in front of it. Mods only move
+    # when a constraint makes them, everything else keeps its relative order.
+    predecessors = {mod_id: [] for mod_id in current_order}
+    for mod_id in current_order:
+        for following in successors[mod_id]:
+            predecessors[following].append(mod_id)
+    for before in predecessors.values():
+        before.sort(key=position.get)
+
+    order = []
+    cycles = []
+    state = {}  # mod id -> _VISITING or _PLACED
+    for start in current_order:
+        if start in state:
+            continue
+        state[start] = _VISITING
+        stack = [(start, 0)]
+        while stack:
+            mod_id, index = stack[-1]
+            before = predecessors[mod_id]
+            if index == len(before):
+                stack.pop()
+                state[mod_id] = _PLACED
+                order.append(mod_id)
+                continue
+            stack[-1] = (mod_id, index + 1)
+            other = before[index]
+            if other not in state:
+                state[other] = _VISITING
+                stack.append((other, 0))
+            elif state[other] == _VISITING:
+                # other is waiting (through the stack) for mod_id: the rules
+                # contradict each other, this edge is the one left out
+                path = [entry[0] for entry in stack]
+                cycle = [other] + path[path.index(other) + 1:][::-1]
+                first = min(range(len(cycle)), key=lambda i: position[cycle[i]])
+                cycles.append(cycle[first:] + cycle[:first])
+    return LoadOrderSolution(order, cycles, missing)
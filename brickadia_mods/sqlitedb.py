@@ -0,0 +1,283 @@
+"""SQLite mod database for large libraries
+
+The mods table keeps every record as JSON (so nothing is lost compared to
+mods.json) next to indexed columns for the fields the loader looks things
+up by. Files, deployed paths and profiles get their own tables so "which
+mods ship this file / hash" is an index lookup instead of a scan.
+"""
+import json
+import sqlite3
+from pathlib import Path
+
+from .deploy import normalize_game_paths
+from .errors import ProfileNotFoundError
+from .loadorder import enabled_in_order
+from .profiles import ProfileStore
+from .record import encode_record
+
+SQLITE_FILE_NAME = "mods.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS mods (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    name_folded TEXT NOT NULL,
+    author_folded TEXT NOT NULL,
+    search_text TEXT NOT NULL,
+    enabled INTEGER NOT NULL,
+    mod_type TEXT NOT NULL,
+    load_order INTEGER,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_mods_name ON mods (name_folded);
+CREATE INDEX IF NOT EXISTS idx_mods_author ON mods (author_folded);
+CREATE INDEX IF NOT EXISTS idx_mods_enabled ON mods (enabled, load_order);
+CREATE TABLE IF NOT EXISTS files (
+    mod_id TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    file_folded TEXT NOT NULL,
+    sha TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_files_mod ON files (mod_id);
+CREATE INDEX IF NOT EXISTS idx_files_name ON files (file_folded);
+CREATE INDEX IF NOT EXISTS idx_files_sha ON files (sha);
+CREATE TABLE IF NOT EXISTS deployments (
+    mod_id TEXT NOT NULL,
+    path TEXT NOT NULL,
+    method TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_deployments_mod ON deployments (mod_id);
+CREATE TABLE IF NOT EXISTS profiles (
+    name TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS profile_mods (
+    profile TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    mod_id TEXT NOT NULL,
+    PRIMARY KEY (profile, position)
+);
+"""
+
+
+def _connect(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path))
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _mod_row(mod_id, position, mod, data):
+    return (
+        mod_id,
+        position,
+        mod['name'],
+        mod['name'].lower(),
+        mod.get('author', '').lower(),
+        f"{mod['name']} {mod.get('description', '')} {mod.get('author', '')}".lower(),
+        1 if mod['enabled'] else 0,
+        mod.get('mod_type', 'PAK'),
+        mod.get('load_order'),
+        data,
+    )
+
+
+class SQLiteModDatabase:
+    """mods.db: same interface as ModDatabase, plus indexed queries
+
+    flush() only serializes the mods passed to mark_dirty() and rewrites
+    the rows of those whose record really changed, all in one transaction;
+    mark_dirty() without ids makes it compare every record. On first use an existing
+    mods.json (and profiles.json) is imported; the JSON files are left
+    where they are.
+    """
+
+    def __init__(self, path, legacy_path=None):
+        self.path = Path(path)
+        self.legacy_path = Path(legacy_path) if legacy_path else None
+        self.dirty = False
+        self.writes = 0
+        self._changed = {}      # mod ids marked dirty (in the order they were marked), None = any of them
+        self.conn = _connect(self.path)
+        self._saved = {}        # mod id -> JSON last written
+        self._positions = {}    # mod id -> position (keeps mods.json order)
+        self._next_position = 0
+
+    def load(self):
+        """Read the mods dict, importing mods.json the first time"""
+        mods = {}
+        rows = self.conn.execute("SELECT id, position, data FROM mods ORDER BY position")
+        for mod_id, position, data in rows:
+            mods[mod_id] = json.loads(data)
+            self._saved[mod_id] = data
+            self._positions[mod_id] = position
+            self._next_position = position + 1
+
+        if self._meta('imported') is None:
+            if not mods and self.legacy_path and self.legacy_path.exists():
+                with open(self.legacy_path, 'r') as f:
+                    mods = json.load(f)
+                self.flush(mods, force=True)
+            with self.conn:
+                self._set_meta('imported', str(self.legacy_path or ''))
+        return mods
+
+    def mark_dirty(self, *mod_ids):
+        """Note that these mods (added, changed or deleted) need writing; no ids means any mod"""
+        self.dirty = True
+        if not mod_ids:
+            self._changed = None
+        elif self._changed is not None:
+            self._changed.update(dict.fromkeys(mod_ids))
+
+    def flush(self, mods, force=False):
+        """Write the mods that changed since the last flush, returns True if written"""
+        if not (self.dirty or force):
+            return False
+        if force or self._changed is None:
+            candidates = mods
+            removed = [mod_id for mod_id in self._saved if mod_id not in mods]
+        else:
+            candidates = {mod_id: mods[mod_id] for mod_id in self._changed if mod_id in mods}
+            removed = [mod_id for mod_id in self._changed if mod_id not in mods and mod_id in self._saved]
+        changed = []
+        for mod_id, mod in candidates.items():
+            data = json.dumps(mod, separators=(',', ':'), default=encode_record)
+            if self._saved.get(mod_id) != data:
+                changed.append((mod_id, mod, data))
+
+        with self.conn:
+            for mod_id in removed:
+                self._delete_rows(mod_id)
+            for mod_id, mod, data in changed:
+                self._write_rows(mod_id, mod, data)
+
+        for mod_id in removed:
+            del self._saved[mod_id]
+            del self._positions[mod_id]
+        for mod_id, mod, data in changed:
+            self._saved[mod_id] = data
+        self.dirty = False
+        self._changed = {}
+        if changed or removed:
+            self.writes += 1
+        return True
+
+    def _write_rows(self, mod_id, mod, data):
+        position = self._positions.get(mod_id)
+        if position is None:
+            position = self._positions[mod_id] = self._next_position
+            self._next_position += 1
+        row = _mod_row(mod_id, position, mod, data)
+        updated = self.conn.execute(
+            "UPDATE mods SET position=?, name=?, name_folded=?, author_folded=?, search_text=?,"
+            " enabled=?, mod_type=?, load_order=?, data=? WHERE id = ?", row[1:] + row[:1])
+        if not updated.rowcount:
+            self.conn.execute(
+                "INSERT INTO mods (id, position, name, name_folded, author_folded, search_text,"
+                " enabled, mod_type, load_order, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+        self.conn.execute("DELETE FROM files WHERE mod_id = ?", (mod_id,))
+        self.conn.execute("DELETE FROM deployments WHERE mod_id = ?", (mod_id,))
+        hashes = mod.get('hashes', {})
+        self.conn.executemany(
+            "INSERT INTO files (mod_id, file_name, file_folded, sha) VALUES (?, ?, ?, ?)",
+            [(mod_id, file_name, file_name.lower(), hashes.get(file_name)) for file_name in mod['files']])
+        self.conn.executemany(
+            "INSERT INTO deployments (mod_id, path, method) VALUES (?, ?, ?)",
+            [(mod_id, entry['path'], entry.get('method'))
+             for entry in normalize_game_paths(mod.get('game_paths', []))])
+
+    def _delete_rows(self, mod_id):
+        for table, column in (('mods', 'id'), ('files', 'mod_id'), ('deployments', 'mod_id')):
+            self.conn.execute(f"DELETE FROM {table} WHERE {column} = ?", (mod_id,))
+
+    def _meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def _ids(self, sql, params=()):
+        return [row[0] for row in self.conn.execute(sql, params)]
+
+    # ----- queries (from the indexes as of the last flush, scans while changes are pending) -----
+
+    def enabled_ids(self, mods):
+        """Ids of enabled mods in their load order"""
+        if self.dirty:
+            return enabled_in_order(mods)
+        return self._ids("SELECT id FROM mods WHERE enabled = 1"
+                         " ORDER BY load_order IS NULL, load_order, position")
+
+    def ids_with_file(self, mods, file_name):
+        """Ids of mods that ship a file with this name (case-insensitive)"""
+        if self.dirty:
+            file_name = file_name.lower()
+            return [mod_id for mod_id, mod in mods.items()
+                    if any(name.lower() == file_name for name in mod['files'])]
+        return self._ids("SELECT DISTINCT mod_id FROM files WHERE file_folded = ?", (file_name.lower(),))
+
+    def ids_with_hash(self, mods, sha):
+        """Ids of mods that ship a file with this SHA-256"""
+        if self.dirty:
+            return [mod_id for mod_id, mod in mods.items() if sha in (mod.get('hashes') or {}).values()]
+        return self._ids("SELECT DISTINCT mod_id FROM files WHERE sha = ?", (sha,))
+
+    def profile_store(self, legacy_path=None):
+        return SQLiteProfileStore(self.conn, legacy_path)
+
+    def close(self):
+        self.conn.close()
+
+
+class SQLiteProfileStore:
+    """Profiles kept in mods.db, same interface as ProfileStore"""
+
+    def __init__(self, conn, legacy_path=None):
+        self.conn = conn
+        row = conn.execute("SELECT value FROM meta WHERE key = 'profiles_imported'").fetchone()
+        if row is None:
+            with conn:
+                if legacy_path and Path(legacy_path).exists():
+                    for name, mod_ids in ProfileStore(legacy_path).profiles.items():
+                        self._write(name, mod_ids)
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('profiles_imported', ?)",
+                             (str(legacy_path or ''),))
+
+    def names(self):
+        return [row[0] for row in self.conn.execute("SELECT name FROM profiles ORDER BY rowid")]
+
+    def get(self, name):
+        if not self._exists(name):
+            raise ProfileNotFoundError(name)
+        return [row[0] for row in self.conn.execute(
+            "SELECT mod_id FROM profile_mods WHERE profile = ? ORDER BY position", (name,))]
+
+    def set(self, name, mod_ids):
+        with self.conn:
+            self._write(name, mod_ids)
+
+    def delete(self, name):
+        if not self._exists(name):
+            raise ProfileNotFoundError(name)
+        with self.conn:
+            self.conn.execute("DELETE FROM profile_mods WHERE profile = ?", (name,))
+            self.conn.execute("DELETE FROM profiles WHERE name = ?", (name,))
+
+    def save(self):
+        """Nothing to do, every change is committed right away"""
+
+    def _exists(self, name):
+        return self.conn.execute("SELECT 1 FROM profiles WHERE name = ?", (name,)).fetchone() is not None
+
+    def _write(self, name, mod_ids):
+        self.conn.execute("INSERT OR IGNORE INTO profiles (name) VALUES (?)", (name,))
+        self.conn.execute("DELETE FROM profile_mods WHERE profile = ?", (name,))
+        self.conn.executemany("INSERT INTO profile_mods (profile, position, mod_id) VALUES (?, ?, ?)",
+                              [(name, position, mod_id) for position, mod_id in enumerate(mod_ids)])
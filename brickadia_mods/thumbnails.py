@@ -0,0 +1,121 @@
+"""Pre-resized mod icons, so the mod list never decodes full-size images
+
+Thumbnails are PNGs under <mods storage>/.thumbnails named after the icon's
+path, size and mtime; a changed icon simply gets a new name. Tk loads them
+directly with tk.PhotoImage, only creating them needs PIL.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+from .fingerprint import stat_fingerprint
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_DIR_NAME = ".thumbnails"
+
+# Mod list rows and load order entries
+TREE_ICON_SIZE = 48
+ORDER_ICON_SIZE = 40
+THUMBNAIL_SIZES = (TREE_ICON_SIZE, ORDER_ICON_SIZE)
+
+
+def _path_key(icon_path):
+    return hashlib.sha1(os.path.abspath(icon_path).encode('utf-8')).hexdigest()[:16]
+
+
+class ThumbnailCache:
+    """<mods storage>/.thumbnails/<path hash>_<size>_<mtime:size hash>.png"""
+
+    def __init__(self, folder):
+        self.folder = Path(folder)
+
+    @classmethod
+    def for_storage(cls, mods_storage_path):
+        return cls(Path(mods_storage_path) / THUMBNAIL_DIR_NAME)
+
+    def path_for(self, icon_path, size):
+        """Where the thumbnail of the icon as it is now belongs, None if it's gone"""
+        fingerprint = stat_fingerprint(icon_path)
+        if fingerprint is None:
+            return None
+        stamp = hashlib.sha1(f"{fingerprint[0]}:{fingerprint[1]}".encode('ascii')).hexdigest()[:8]
+        return self.folder / f"{_path_key(icon_path)}_{size}_{stamp}.png"
+
+    def get(self, icon_path, size):
+        """Path of an up-to-date thumbnail, or None if it hasn't been made yet"""
+        if not icon_path:
+            return None
+        path = self.path_for(icon_path, size)
+        return path if path is not None and path.exists() else None
+
+    def generate(self, icon_path, sizes=THUMBNAIL_SIZES):
+        """Make the missing thumbnails of one icon, returns {size: path} of those available
+
+        Decodes the icon at most once. Unreadable icons (or no PIL) just
+        give no thumbnails; the caller falls back to the default icon.
+        """
+        thumbnails = {}
+        missing = []
+        for size in sizes:
+            path = self.get(icon_path, size)
+            if path is not None:
+                thumbnails[size] = path
+            elif icon_path and os.path.exists(icon_path):
+                missing.append(size)
+        if not missing:
+            return thumbnails
+
+        try:
+            from PIL import Image
+            with Image.open(icon_path) as img:
+                img = img.convert('RGBA')
+                for size in missing:
+                    path = self.path_for(icon_path, size)
+                    self._forget_stale(icon_path, size)
+                    self._save(img.resize((size, size), Image.Resampling.LANCZOS), path)
+                    thumbnails[size] = path
+        except Exception as e:
+            logger.warning("Failed to make thumbnail for %s: %s", icon_path, e)
+        return thumbnails
+
+    def generate_for(self, mods):
+        """Make missing thumbnails for every mod record (or dict) with an icon"""
+        for mod in mods:
+            icon_path = mod.get('icon', '')
+            if icon_path:
+                self.generate(icon_path)
+
+    def forget(self, icon_path):
+        """Delete every thumbnail of an icon, e.g. when its mod is deleted"""
+        if not icon_path or not self.folder.exists():
+            return
+        for path in self.folder.glob(f"{_path_key(icon_path)}_*.png"):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def _forget_stale(self, icon_path, size):
+        if self.folder.exists():
+            for path in self.folder.glob(f"{_path_key(icon_path)}_{size}_*.png"):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def _save(self, img, path):
+        self.folder.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.folder, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                img.save(f, format='PNG')
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
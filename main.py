@@ -1,18 +1,27 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, simpledialog
+import tkinter.font as tkfont
 import os
 import json
+import logging
 import shutil
-import zipfile
 import rarfile
 from pathlib import Path
-from tkinterdnd2 import DND_FILES, TkinterDnD
 import configparser
 import urllib.request
 import webbrowser
 import subprocess
 import sys
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from brickadia_mods import (
+    ARCHIVE_EXTENSIONS, MOD_TYPE_UE4SS, EVENT_FAILED, EVENT_FINISHED, DEPLOY_AUTO, DEPLOY_STRATEGIES,
+    EVENT_MOD_DELETED, EVENT_MOD_DISABLED, EVENT_MOD_ENABLED, EVENT_MOD_INSTALLED, BACKEND_JSON,
+    DATABASE_BACKENDS, ORDER_ICON_SIZE, PROFILES_FILE_NAME, TREE_ICON_SIZE, DependencyError, DeploymentError,
+    InstallQueue, ModManager, ModStateError, UE4SSMissingError, is_ue4ss_mod, setup_winrar,
+)
+
+logger = logging.getLogger(__name__)
 
 # Tooltip class for hover tooltips
 class ToolTip:
@@ -48,30 +57,6 @@ class ToolTip:
             self.tooltip_window.destroy()
             self.tooltip_window = None
 
-# Set up WinRAR path for rarfile
-def setup_winrar():
-    """Find and set WinRAR executable path"""
-    possible_paths = [
-        r"C:\Program Files\WinRAR\UnRAR.exe",
-        r"C:\Program Files (x86)\WinRAR\UnRAR.exe",
-        r"C:\Program Files\WinRAR\Rar.exe",
-        r"C:\Program Files (x86)\WinRAR\Rar.exe",
-    ]
-    
-    for path in possible_paths:
-        if os.path.exists(path):
-            rarfile.UNRAR_TOOL = path
-            return True
-    
-    # Check if unrar is in PATH
-    try:
-        subprocess.run(['unrar'], capture_output=True)
-        return True
-    except:
-        pass
-    
-    return False
-
 # Try to set up WinRAR on module load
 setup_winrar()
 
@@ -93,6 +78,27 @@ class BrickadiaModLoader:
     THEME_DANGER = "#f44336"        # Danger/delete
     THEME_PURPLE = "#9C27B0"        # Special actions
     
+    # How often the GUI checks the background install queue (ms)
+    INSTALL_POLL_MS = 100
+    
+    # Changes to mods.json within this window are written together (ms)
+    SAVE_DELAY_MS = 500
+    
+    # Keystrokes in the search box within this window run one search (ms)
+    SEARCH_DELAY_MS = 150
+    
+    # Views the refresh pass can redraw, in the order it redraws them
+    VIEW_TREE = 'tree'
+    VIEW_LOAD_ORDER = 'load_order'
+    VIEW_DUPLICATES = 'duplicates'
+    VIEW_COUNTS = 'counts'
+    ALL_VIEWS = (VIEW_TREE, VIEW_LOAD_ORDER, VIEW_DUPLICATES, VIEW_COUNTS)
+    
+    # Load order rows: height of a row and the gap above it (px)
+    ORDER_ROW_HEIGHT = 52
+    ORDER_ROW_GAP = 6
+    ORDER_ROW_PITCH = ORDER_ROW_HEIGHT + ORDER_ROW_GAP
+    
     def __init__(self, root):
         self.root = root
         self.root.title(f"Brickadia Mod Loader v{self.VERSION}")
@@ -117,7 +123,7 @@ class BrickadiaModLoader:
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         
         # Initialize drag and drop data
-        self.drag_data = {"index": None, "item": None}
+        self.drag_data = {"index": None, "mod_id": None, "start_y": None}
         
         # Load and set window icon
         try:
@@ -174,9 +180,22 @@ class BrickadiaModLoader:
         # Check for updates (after setup, on every launch)
         self.check_for_updates()
         
-        # Mod storage
+        # Mod storage - the GUI is a view over the headless manager
         self.mods = self.load_mods()
         
+        # Finish or undo deployments a crash left half done
+        self.recover_deployments()
+        
+        # Background installs (results are applied on the Tk thread)
+        self.install_queue = InstallQueue()
+        self.thumbnail_executor = None
+        self.install_batch = None
+        self.install_polling = False
+        
+        # Views waiting for the next refresh pass
+        self.dirty_views = set()
+        self.refresh_job = None
+        
         # Create GUI
         self.create_widgets()
         self.refresh_mod_list()
@@ -196,6 +215,12 @@ class BrickadiaModLoader:
             self.config['Window'] = {
                 'geometry': '1400x1000'
             }
+            self.config['Deployment'] = {
+                'strategy': DEPLOY_AUTO
+            }
+            self.config['Database'] = {
+                'backend': BACKEND_JSON
+            }
             self.save_config()
         
         # Ensure Window section exists
@@ -204,6 +229,18 @@ class BrickadiaModLoader:
                 'geometry': '1400x1000'
             }
         
+        # Ensure Deployment section exists (how enabled mods are placed in the game folder)
+        if 'Deployment' not in self.config:
+            self.config['Deployment'] = {
+                'strategy': DEPLOY_AUTO
+            }
+        
+        # Ensure Database section exists (mods.json, or mods.db for large libraries)
+        if 'Database' not in self.config:
+            self.config['Database'] = {
+                'backend': BACKEND_JSON
+            }
+        
         # Create mods storage directory if it doesn't exist
         self.mods_storage_path = self.config['Paths']['mods_storage']
         os.makedirs(self.mods_storage_path, exist_ok=True)
@@ -213,6 +250,7 @@ class BrickadiaModLoader:
         # Define new paths in mods storage folder
         new_config_file = Path(self.mods_storage_path) / "config.ini"
         new_mods_file = Path(self.mods_storage_path) / "mods.json"
+        new_profiles_file = Path(self.mods_storage_path) / PROFILES_FILE_NAME
         
         # Migrate old config file if it exists in root
         old_config = Path("config.ini")
@@ -234,9 +272,19 @@ class BrickadiaModLoader:
             except Exception as e:
                 print(f"Could not migrate mods.json: {e}")
         
+        # Migrate old profiles.json if it exists in root
+        old_profiles = Path(PROFILES_FILE_NAME)
+        if old_profiles.exists() and not new_profiles_file.exists():
+            try:
+                shutil.copy(old_profiles, new_profiles_file)
+                logger.info("Migrated profiles.json to %s", new_profiles_file)
+            except Exception as e:
+                logger.warning("Could not migrate profiles.json: %s", e)
+        
         # Update file paths to use new locations
         self.config_file = str(new_config_file)
         self.mods_data_file = str(new_mods_file)
+        self.profiles_file = str(new_profiles_file)
         
         # Reload config from new location
         if new_config_file.exists():
@@ -255,6 +303,19 @@ class BrickadiaModLoader:
         # Save window geometry
         self.config['Window']['geometry'] = self.root.geometry()
         self.save_config()
+        
+        # Let running installs finish so their folders don't end up orphaned
+        if self.install_queue.busy:
+            self.install_queue.shutdown(cancel_pending=True)
+            if self.apply_install_events(self.install_queue.poll()):
+                self.save_mods()
+        
+        # Thumbnails not made yet are made next time
+        if self.thumbnail_executor is not None:
+            self.thumbnail_executor.shutdown(wait=False, cancel_futures=True)
+        
+        # Write anything still waiting for the save timer
+        self.flush_mods()
         self.root.destroy()
     
     def check_for_updates(self):
@@ -575,16 +636,44 @@ class BrickadiaModLoader:
             continue_btn.config(state='normal', bg="#00aa00", fg="#ffffff")
     
     def load_mods(self):
-        """Load mods data from JSON file"""
-        if os.path.exists(self.mods_data_file):
-            with open(self.mods_data_file, 'r') as f:
-                return json.load(f)
-        return {}
+        """Load mods data through the headless manager"""
+        self.manager = ModManager(
+            self.config['Paths']['brickadia_paks'],
+            self.mods_storage_path,
+            strategy=self.get_deploy_strategy(),
+            autosave=False,
+            mods_data_file=self.mods_data_file,
+            profiles_file=self.profiles_file,
+            backend=self.get_database_backend(),
+        )
+        self.manager.subscribe(self.on_manager_event)
+        self.stale_rows = set()
+        self.deleted_rows = set()
+        self.save_timer = None
+        return self.manager.mods
     
     def save_mods(self):
-        """Save mods data to JSON file"""
-        with open(self.mods_data_file, 'w') as f:
-            json.dump(self.mods, f, indent=4)
+        """Write the changes the manager recorded once things go quiet"""
+        if self.save_timer is None:
+            self.save_timer = self.root.after(self.SAVE_DELAY_MS, self.flush_mods)
+    
+    def flush_mods(self):
+        """Write pending mods data to JSON file now"""
+        if self.save_timer is not None:
+            self.root.after_cancel(self.save_timer)
+            self.save_timer = None
+        self.manager.flush()
+    
+    def recover_deployments(self):
+        """Roll back or complete deployments from a run that didn't finish"""
+        try:
+            recovered = self.manager.recover()
+        except Exception as e:
+            logger.warning("Failed to recover deployments: %s", e)
+            return
+        
+        if recovered:
+            logger.warning("Recovered interrupted deployment of %d mod(s)", len(recovered))
     
     def create_widgets(self):
         """Create the GUI widgets with modern layout"""
@@ -738,8 +827,8 @@ class BrickadiaModLoader:
         about_btn.pack(side=tk.RIGHT, padx=5)
         ToolTip(about_btn, "View on GitHub")
         
-        # Check Duplicates button
-        check_dupes_btn = tk.Button(
+        # Check Duplicates button (shows how many mods clash)
+        self.check_dupes_btn = check_dupes_btn = tk.Button(
             actions_frame,
             text="🔍 Check Duplicates",
             command=self.check_for_duplicates,
@@ -815,6 +904,7 @@ class BrickadiaModLoader:
         browse_btn.pack(side=tk.LEFT, padx=(15, 0))
         
         # Enable drag and drop
+        from tkinterdnd2 import DND_FILES
         drop_frame.drop_target_register(DND_FILES)
         drop_frame.dnd_bind('<<Drop>>', self.on_drop)
         
@@ -863,7 +953,7 @@ class BrickadiaModLoader:
             font=("Segoe UI", 9)
         )
         filter_menu.pack(side=tk.RIGHT, padx=(10, 0))
-        filter_menu.bind('<<ComboboxSelected>>', lambda e: self.filter_mods())
+        filter_menu.bind('<<ComboboxSelected>>', lambda e: self.invalidate(self.VIEW_TREE, self.VIEW_COUNTS))
         
         # Search entry
         search_frame = tk.Frame(header_right, bg="#3a3a3a", relief=tk.FLAT)
@@ -878,7 +968,8 @@ class BrickadiaModLoader:
         ).pack(side=tk.LEFT, padx=(8, 5))
         
         self.search_var = tk.StringVar()
-        self.search_var.trace_add('write', lambda *args: self.filter_mods())
+        self.search_timer = None
+        self.search_var.trace_add('write', lambda *args: self.schedule_search())
         
         search_entry = tk.Entry(
             search_frame,
@@ -950,8 +1041,14 @@ class BrickadiaModLoader:
         
         self.mod_tree.bind("<Button-3>", on_right_click)
         
-        # Store for icon images (prevent garbage collection)
+        # Rows in the mod list: every row ever inserted, and the attached ones in order
+        self.tree_rows = set()
+        self.tree_order = []
+        
+        # Store for icon images (prevent garbage collection), kept across filtering
         self.mod_icons = {}
+        self.fallback_icons = {}
+        self.thumbnail_jobs = {}
         
         # Right side - Mod Load Order
         right_panel = tk.Frame(main_content, bg=self.THEME_BG_PANEL, width=280)
@@ -962,6 +1059,23 @@ class BrickadiaModLoader:
         order_header = tk.Frame(right_panel, bg=self.THEME_BG_PANEL)
         order_header.pack(fill=tk.X, padx=15, pady=15)
         
+        # Auto Sort button (orders mods by their modinfo.json rules and conflicts)
+        auto_sort_btn = tk.Button(
+            order_header,
+            text="🪄 Auto Sort",
+            command=self.auto_sort_load_order,
+            bg="#3a3a3a",
+            fg=self.THEME_TEXT,
+            font=("Segoe UI", 9),
+            relief=tk.FLAT,
+            padx=10,
+            pady=4,
+            cursor="hand2",
+            activebackground="#4a4a4a"
+        )
+        auto_sort_btn.pack(side=tk.RIGHT, anchor="n")
+        ToolTip(auto_sort_btn, "Sort by modinfo.json load_after / load_before / priority")
+        
         tk.Label(
             order_header,
             text="🔢 Load Order",
@@ -985,28 +1099,35 @@ class BrickadiaModLoader:
         order_scroll = ttk.Scrollbar(order_frame)
         order_scroll.pack(side=tk.RIGHT, fill=tk.Y)
         
-        # Canvas for custom load order items with icons
+        # Canvas the load order rows are drawn on; only rows in view exist
         self.order_canvas = tk.Canvas(
             order_frame,
             bg=self.THEME_BG_CARD,
             bd=0,
             highlightthickness=0,
-            yscrollcommand=order_scroll.set
+            yscrollcommand=lambda first, last: (order_scroll.set(first, last), self.render_order_rows())
         )
         self.order_canvas.pack(fill=tk.BOTH, expand=True, side=tk.LEFT)
         order_scroll.config(command=self.order_canvas.yview)
         
-        # Frame inside canvas to hold mod items
-        self.order_inner_frame = tk.Frame(self.order_canvas, bg=self.THEME_BG_CARD)
-        self.order_canvas_window = self.order_canvas.create_window(0, 0, anchor='nw', window=self.order_inner_frame)
-        
-        # Bind to update scrollregion and canvas width
-        self.order_inner_frame.bind('<Configure>', lambda e: self.order_canvas.configure(scrollregion=self.order_canvas.bbox("all")))
-        self.order_canvas.bind('<Configure>', lambda e: self.order_canvas.itemconfig(self.order_canvas_window, width=e.width))
-        
-        # Store references for drag and drop
-        self.order_items = []  # List of frame widgets
-        self.drag_data = {"index": None, "item": None, "start_y": None}
+        self.order_name_font = tkfont.Font(family="Segoe UI", size=10, weight="bold")
+        self.order_meta_font = tkfont.Font(family="Segoe UI", size=8)
+        
+        # Enabled mod ids in load order, and the rows currently drawn {mod_id: row}
+        self.order_ids = []
+        self.order_rows = {}
+        self.order_hover = None
+        self.order_row_tags = 0
+        self.drag_data = {"index": None, "mod_id": None, "start_y": None}
+        
+        # One set of bindings for the whole list instead of per row widget
+        self.order_canvas.bind('<Configure>', lambda e: self.render_order_rows(redraw=True))
+        self.order_canvas.bind('<Button-1>', self.on_load_order_click)
+        self.order_canvas.bind('<B1-Motion>', self.on_load_order_drag)
+        self.order_canvas.bind('<ButtonRelease-1>', self.on_load_order_drop)
+        self.order_canvas.bind('<Motion>', self.on_load_order_hover)
+        self.order_canvas.bind('<Leave>', lambda e: self.set_order_hover(None))
+        self.order_canvas.bind('<MouseWheel>', lambda e: self.order_canvas.yview_scroll(int(-e.delta / 120), "units"))
         
         # Store load order icon cache
         self.load_order_icons = {}
@@ -1177,199 +1298,156 @@ class BrickadiaModLoader:
     def on_drop(self, event):
         """Handle file drop event"""
         files = self.root.tk.splitlist(event.data)
+        archives = []
+        invalid = []
         for file_path in files:
             file_path = file_path.strip('{}')  # Remove curly braces if present
-            if file_path.lower().endswith(('.zip', '.rar')):
-                self.install_mod(file_path)
+            if file_path.lower().endswith(ARCHIVE_EXTENSIONS):
+                archives.append(file_path)
             else:
-                messagebox.showwarning("Invalid File", f"File must be .zip or .rar\n{file_path}")
+                invalid.append(file_path)
+        
+        if invalid:
+            messagebox.showwarning("Invalid File", "File must be .zip or .rar\n" + "\n".join(invalid))
+        if archives:
+            self.queue_installs(archives)
     
     def browse_archive(self):
-        """Open file browser to select archive"""
-        file_path = filedialog.askopenfilename(
+        """Open file browser to select archives"""
+        file_paths = filedialog.askopenfilenames(
             title="Select Mod Archive",
             filetypes=[("Archive Files", "*.zip *.rar"), ("All Files", "*.*")]
         )
-        if file_path:
-            self.install_mod(file_path)
+        if file_paths:
+            self.queue_installs(self.root.tk.splitlist(file_paths))
     
     def install_mod(self, archive_path):
         """Extract and install a mod from an archive"""
+        self.queue_installs([archive_path])
+    
+    def queue_installs(self, archive_paths):
+        """Install archives in the background and show one summary when all are done"""
         if not self.config['Paths']['brickadia_paks']:
             messagebox.showerror("Error", "Please configure Brickadia Paks folder in Settings first!")
             self.open_settings()
             return
         
-        try:
-            # Get archive name without extension
-            archive_name = Path(archive_path).stem
-            
-            # Create temporary extraction folder
-            temp_extract = Path(self.mods_storage_path) / f"temp_{archive_name}"
-            os.makedirs(temp_extract, exist_ok=True)
-            
-            # Extract archive
-            if archive_path.lower().endswith('.zip'):
-                with zipfile.ZipFile(archive_path, 'r') as zip_ref:
-                    zip_ref.extractall(temp_extract)
-            elif archive_path.lower().endswith('.rar'):
-                try:
-                    with rarfile.RarFile(archive_path, 'r') as rar_ref:
-                        rar_ref.extractall(temp_extract)
-                except rarfile.RarCannotExec as e:
-                    shutil.rmtree(temp_extract, ignore_errors=True)
-                    
-                    # Check if WinRAR is actually installed
-                    winrar_paths = [
-                        r"C:\Program Files\WinRAR\UnRAR.exe",
-                        r"C:\Program Files (x86)\WinRAR\UnRAR.exe",
-                    ]
-                    installed = any(os.path.exists(p) for p in winrar_paths)
-                    
-                    if installed:
-                        error_msg = (
-                            "Cannot extract .rar file - WinRAR is installed but not accessible.\n\n"
-                            "This might be a permissions issue.\n\n"
-                            "Solutions:\n"
-                            "1. Try converting your mod to a .zip file instead\n"
-                            "2. Run the mod loader as administrator\n"
-                            "3. Reinstall WinRAR\n\n"
-                            f"Error details: {str(e)}"
-                        )
-                    else:
-                        error_msg = (
-                            "Cannot extract .rar files - WinRAR/UnRAR not found.\n\n"
-                            "Solutions:\n"
-                            "1. Install WinRAR from: https://www.win-rar.com/download.html\n"
-                            "2. Or convert your mod to a .zip file instead\n\n"
-                            ".zip files work without any additional software!"
-                        )
-                    
-                    messagebox.showerror("RAR Extraction Failed", error_msg)
-                    return
-                except Exception as e:
-                    shutil.rmtree(temp_extract, ignore_errors=True)
-                    messagebox.showerror(
-                        "RAR Extraction Failed",
-                        f"Error extracting RAR file:\n{str(e)}\n\n"
-                        "Try converting your mod to a .zip file instead."
-                    )
-                    return
-            
-            # Detect mod type: PAK or UE4SS
-            pak_files = list(temp_extract.rglob("*.pak"))
-            
-            # UE4SS mod files: Lua scripts, Blueprint assets, C++ binaries
-            lua_files = list(temp_extract.rglob("*.lua"))
-            blueprint_files = list(temp_extract.rglob("*.uasset")) + list(temp_extract.rglob("*.umap"))
-            cpp_files = list(temp_extract.rglob("*.dll"))  # Compiled C++ mods
-            
-            # Determine mod type
-            ue4ss_files = lua_files + blueprint_files + cpp_files
-            is_ue4ss_mod = False
-            
-            if ue4ss_files and not pak_files:
-                is_ue4ss_mod = True
-            elif not pak_files and not ue4ss_files:
-                messagebox.showerror("Error", "No valid mod files found in the archive!\n\nSupported formats:\n- PAK mods: .pak files\n- UE4SS mods: .lua, .uasset, .umap, .dll files")
-                shutil.rmtree(temp_extract)
-                return
-            
-            # Handle UE4SS mods differently
-            if is_ue4ss_mod:
-                self.install_ue4ss_mod(temp_extract, archive_name)
-                return
-            
-            # Find all additional files (ucas, utoc, sig, etc.) that might come with the pak
-            all_mod_files = []
-            for pak_file in pak_files:
-                # Add the pak file
-                all_mod_files.append(pak_file)
-                
-                # Look for related files with same base name
-                base_name = pak_file.stem
-                parent_dir = pak_file.parent
-                
-                for ext in ['.ucas', '.utoc', '.sig', '.ini', '.txt']:
-                    related_file = parent_dir / f"{base_name}{ext}"
-                    if related_file.exists() and related_file not in all_mod_files:
-                        all_mod_files.append(related_file)
-            
-            # Look for modinfo.json
-            mod_info = None
-            modinfo_files = list(temp_extract.rglob("modinfo.json"))
-            if modinfo_files:
-                try:
-                    with open(modinfo_files[0], 'r', encoding='utf-8') as f:
-                        mod_info = json.load(f)
-                except:
-                    mod_info = None
-            
-            # Look for icon
-            icon_path = None
-            if mod_info and 'icon' in mod_info:
-                icon_files = list(temp_extract.rglob(mod_info['icon']))
-                if icon_files:
-                    icon_path = icon_files[0]
-            
-            # Move pak files and related files to mods storage
-            for pak_file in pak_files:
-                mod_name = pak_file.stem
-                
-                # Use custom name from modinfo if available
-                if mod_info and 'name' in mod_info:
-                    display_name = mod_info['name']
-                else:
-                    display_name = mod_name
-                
-                # Create a folder for this mod
-                mod_folder = Path(self.mods_storage_path) / mod_name
-                counter = 1
-                while mod_folder.exists():
-                    mod_folder = Path(self.mods_storage_path) / f"{mod_name}_{counter}"
-                    counter += 1
-                
-                os.makedirs(mod_folder, exist_ok=True)
-                
-                # Copy all related files for this mod
-                related_files = [f for f in all_mod_files if f.stem == mod_name]
-                file_list = []
-                
-                for file in related_files:
-                    dest_file = mod_folder / file.name
-                    shutil.copy2(file, dest_file)
-                    file_list.append(file.name)
-                
-                # Copy icon if available
-                icon_dest = None
-                if icon_path:
-                    icon_dest = mod_folder / f"icon{icon_path.suffix}"
-                    shutil.copy2(icon_path, icon_dest)
-                
-                # Add to mods database
-                mod_id = mod_folder.name
-                self.mods[mod_id] = {
-                    'name': display_name,
-                    'folder': str(mod_folder),
-                    'files': file_list,
-                    'enabled': False,
-                    'description': mod_info.get('description', '') if mod_info else '',
-                    'author': mod_info.get('author', '') if mod_info else '',
-                    'version': mod_info.get('version', '') if mod_info else '',
-                    'icon': str(icon_dest) if icon_dest else ''
-                }
-            
-            # Clean up temp folder
-            shutil.rmtree(temp_extract)
-            
-            # Save mods database
+        if self.install_batch is None:
+            self.install_batch = {'total': 0, 'done': 0, 'results': [], 'errors': []}
+        self.install_batch['total'] += len(archive_paths)
+        
+        self.install_queue.submit(archive_paths, self.manager.storage_path, self.manager.blob_store,
+                                  self.manager.thumbnails)
+        self.update_install_progress()
+        
+        if not self.install_polling:
+            self.install_polling = True
+            self.root.after(self.INSTALL_POLL_MS, self.poll_install_queue)
+    
+    def poll_install_queue(self):
+        """Apply finished installs from the worker pool (runs on the Tk thread)"""
+        # Check before draining: once the queue is idle every event has been posted
+        still_running = self.install_queue.busy
+        changed = self.apply_install_events(self.install_queue.poll())
+        
+        if changed:
             self.save_mods()
-            self.refresh_mod_list()
-            
-            messagebox.showinfo("Success", f"Installed {len(pak_files)} mod(s) from {archive_name}")
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to install mod:\n{str(e)}")
+        
+        if still_running:
+            self.update_install_progress()
+            self.root.after(self.INSTALL_POLL_MS, self.poll_install_queue)
+            return
+        
+        self.install_polling = False
+        batch = self.install_batch
+        self.install_batch = None
+        self.drop_label.config(text="Drop mod files here to install")
+        self.show_install_summary(batch)
+    
+    def apply_install_events(self, events):
+        """Record worker events in the current batch, returns True if mods were added"""
+        changed = False
+        for event in events:
+            if event.kind == EVENT_FINISHED:
+                self.manager.add_install_result(event.result)
+                self.install_batch['results'].append(event.result)
+                self.install_batch['done'] += 1
+                changed = True
+            elif event.kind == EVENT_FAILED:
+                self.install_batch['errors'].append((event.archive_path, event.error))
+                self.install_batch['done'] += 1
+        return changed
+    
+    def update_install_progress(self):
+        """Show install progress in the drop zone"""
+        batch = self.install_batch
+        if batch:
+            self.drop_label.config(text=f"Installing... {batch['done']} of {batch['total']} archive(s) done")
+    
+    def show_install_summary(self, batch):
+        """Show a single message for a whole batch of installs"""
+        if not batch:
+            return
+        results = batch['results']
+        errors = batch['errors']
+        installed = sum(len(result.mods) for result in results)
+        
+        if len(results) == 1 and not errors:
+            message = f"Installed {installed} mod(s) from {results[0].archive_name}"
+        else:
+            message = f"Installed {installed} mod(s) from {len(results)} of {batch['total']} archive(s)"
+        
+        if errors:
+            message += f"\n\n⚠️ {len(errors)} archive(s) failed:\n"
+            for archive_path, error in errors[:5]:  # Show first 5
+                message += f"  • {Path(archive_path).name}: {self.describe_install_error(error)}\n"
+            if len(errors) > 5:
+                message += f"  ... and {len(errors) - 5} more\n"
+            if results:
+                messagebox.showwarning("Install Finished", message)
+            else:
+                messagebox.showerror("Error", message)
+        else:
+            messagebox.showinfo("Success", message)
+        
+        ue4ss_results = [result for result in results if result.mod_type == MOD_TYPE_UE4SS]
+        if ue4ss_results:
+            self.offer_ue4ss_install(ue4ss_results)
+    
+    def describe_install_error(self, error):
+        """Turn an install failure into a short user-facing message"""
+        if isinstance(error, rarfile.RarCannotExec):
+            return self.get_rar_error_message(error)
+        if isinstance(error, rarfile.Error):
+            return f"Error extracting RAR file: {str(error)}. Try converting your mod to a .zip file instead."
+        return str(error)
+    
+    def get_rar_error_message(self, error):
+        """Build a helpful message for when UnRAR can't be run"""
+        # Check if WinRAR is actually installed
+        winrar_paths = [
+            r"C:\Program Files\WinRAR\UnRAR.exe",
+            r"C:\Program Files (x86)\WinRAR\UnRAR.exe",
+        ]
+        installed = any(os.path.exists(p) for p in winrar_paths)
+        
+        if installed:
+            return (
+                "Cannot extract .rar file - WinRAR is installed but not accessible.\n\n"
+                "This might be a permissions issue.\n\n"
+                "Solutions:\n"
+                "1. Try converting your mod to a .zip file instead\n"
+                "2. Run the mod loader as administrator\n"
+                "3. Reinstall WinRAR\n\n"
+                f"Error details: {str(error)}"
+            )
+        return (
+            "Cannot extract .rar files - WinRAR/UnRAR not found.\n\n"
+            "Solutions:\n"
+            "1. Install WinRAR from: https://www.win-rar.com/download.html\n"
+            "2. Or convert your mod to a .zip file instead\n\n"
+            ".zip files work without any additional software!"
+        )
     
     def configure_ue4ss_settings(self, ue4ss_path):
         """Configure UE4SS settings.ini file with recommended settings"""
@@ -1595,9 +1673,6 @@ FullMemoryDump = 0
                         shutil.rmtree(file_path, ignore_errors=True)
                         removed_count += 1
             
-            # Refresh the mod list to show disabled mods
-            self.refresh_mod_list()
-            
             messagebox.showinfo(
                 "Uninstalled",
                 f"UE4SS has been successfully uninstalled!\n\n"
@@ -1747,129 +1822,41 @@ FullMemoryDump = 0
             )
             return False
     
-    def install_ue4ss_mod(self, temp_extract, archive_name):
-        """Install a UE4SS mod (Lua, Blueprint, or C++)"""
-        try:
-            # Find all UE4SS mod files
-            lua_files = list(temp_extract.rglob("*.lua"))
-            blueprint_files = list(temp_extract.rglob("*.uasset")) + list(temp_extract.rglob("*.umap"))
-            cpp_files = list(temp_extract.rglob("*.dll"))
-            all_files = list(temp_extract.rglob("*"))
-            all_files = [f for f in all_files if f.is_file()]
-            
-            # Detect mod subtype
-            mod_subtype = []
-            if lua_files:
-                mod_subtype.append("Lua")
-            if blueprint_files:
-                mod_subtype.append("Blueprint")
-            if cpp_files:
-                mod_subtype.append("C++")
-            
-            mod_subtype_str = "/".join(mod_subtype) if mod_subtype else "UE4SS"
-            
-            # Look for modinfo.json
-            mod_info = None
-            modinfo_files = list(temp_extract.rglob("modinfo.json"))
-            if modinfo_files:
-                try:
-                    with open(modinfo_files[0], 'r', encoding='utf-8') as f:
-                        mod_info = json.load(f)
-                except:
-                    mod_info = None
-            
-            # Determine mod name
-            if mod_info and 'name' in mod_info:
-                display_name = mod_info['name']
-                mod_name = display_name.replace(' ', '_')
-            else:
-                display_name = archive_name
-                mod_name = archive_name
-            
-            # Create mod folder
-            mod_folder = Path(self.mods_storage_path) / mod_name
-            counter = 1
-            while mod_folder.exists():
-                mod_folder = Path(self.mods_storage_path) / f"{mod_name}_{counter}"
-                counter += 1
-            
-            os.makedirs(mod_folder, exist_ok=True)
-            
-            # Copy all files
-            file_list = []
-            for file in all_files:
-                relative_path = file.relative_to(temp_extract)
-                dest_file = mod_folder / relative_path
-                dest_file.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(file, dest_file)
-                file_list.append(str(relative_path))
-            
-            # Look for icon
-            icon_dest = None
-            if mod_info and 'icon' in mod_info:
-                icon_files = list(temp_extract.rglob(mod_info['icon']))
-                if icon_files:
-                    icon_dest = mod_folder / f"icon{icon_files[0].suffix}"
-                    shutil.copy2(icon_files[0], icon_dest)
-            
-            # Add to mods database
-            mod_id = mod_folder.name
-            default_desc = f"UE4SS Mod ({mod_subtype_str})"
-            self.mods[mod_id] = {
-                'name': display_name,
-                'folder': str(mod_folder),
-                'files': file_list,
-                'enabled': False,
-                'mod_type': 'UE4SS',  # Mark as UE4SS mod
-                'description': mod_info.get('description', default_desc) if mod_info else default_desc,
-                'author': mod_info.get('author', '') if mod_info else '',
-                'version': mod_info.get('version', '') if mod_info else '',
-                'icon': str(icon_dest) if icon_dest else ''
-            }
-            
-            # Clean up
-            shutil.rmtree(temp_extract)
-            
-            # Save and refresh
-            self.save_mods()
-            self.refresh_mod_list()
-            
-            # Check if UE4SS is installed
-            game_base = Path(self.config['Paths']['brickadia_paks']).parent.parent
-            ue4ss_dll = game_base / 'Binaries' / 'Win64' / 'UE4SS.dll'
-            
-            if ue4ss_dll.exists():
-                messagebox.showinfo("Success", f"Installed UE4SS mod: {display_name}\nType: {mod_subtype_str}\n\n✓ UE4SS detected in your Brickadia folder.")
-            else:
-                # Offer to download UE4SS
-                result = messagebox.askyesnocancel(
-                    "UE4SS Not Found",
-                    f"Installed UE4SS mod: {display_name}\nType: {mod_subtype_str}\n\n"
-                    "⚠ WARNING: UE4SS is not installed!\n\n"
-                    "This mod requires UE4SS to work.\n\n"
-                    "Would you like to download and install UE4SS automatically?\n\n"
-                    "Yes = Download and install UE4SS now\n"
-                    "No = I'll install it manually later\n"
-                    "Cancel = View installation instructions"
-                )
-                
-                if result is True:  # Yes - download
-                    self.download_and_install_ue4ss()
-                elif result is None:  # Cancel - show instructions
-                    messagebox.showinfo(
-                        "Manual Installation Instructions",
-                        "To install UE4SS for Brickadia manually:\n\n"
-                        "1. Download br_patcher.exe from:\n"
-                        "   https://github.com/brickadia-community/br-lua-patcher/releases\n"
-                        "2. Run br_patcher.exe in your Brickadia folder\n"
-                        "3. Follow prompts to patch the game\n\n"
-                        "This will install UE4SS specifically compiled for Brickadia.\n\n"
-                        "The mod has been installed but will not work until UE4SS is installed."
-                    )
-            
-        except Exception as e:
-            shutil.rmtree(temp_extract, ignore_errors=True)
-            messagebox.showerror("Error", f"Failed to install UE4SS mod:\n{str(e)}")
+    def offer_ue4ss_install(self, ue4ss_results):
+        """Offer to install UE4SS after UE4SS mods were added"""
+        mod_lines = "\n".join(
+            f"{name} ({result.subtype})" for result in ue4ss_results for name in result.display_names
+        )
+        
+        # Check if UE4SS is installed
+        if self.manager.ue4ss_installed():
+            return
+        
+        # Offer to download UE4SS
+        result = messagebox.askyesnocancel(
+            "UE4SS Not Found",
+            f"Installed UE4SS mod(s):\n{mod_lines}\n\n"
+            "⚠ WARNING: UE4SS is not installed!\n\n"
+            "These mods require UE4SS to work.\n\n"
+            "Would you like to download and install UE4SS automatically?\n\n"
+            "Yes = Download and install UE4SS now\n"
+            "No = I'll install it manually later\n"
+            "Cancel = View installation instructions"
+        )
+        
+        if result is True:  # Yes - download
+            self.download_and_install_ue4ss()
+        elif result is None:  # Cancel - show instructions
+            messagebox.showinfo(
+                "Manual Installation Instructions",
+                "To install UE4SS for Brickadia manually:\n\n"
+                "1. Download br_patcher.exe from:\n"
+                "   https://github.com/brickadia-community/br-lua-patcher/releases\n"
+                "2. Run br_patcher.exe in your Brickadia folder\n"
+                "3. Follow prompts to patch the game\n\n"
+                "This will install UE4SS specifically compiled for Brickadia.\n\n"
+                "The mods have been installed but will not work until UE4SS is installed."
+            )
     
     def enable_selected_mod(self):
         """Enable the selected mod"""
@@ -1883,8 +1870,6 @@ FullMemoryDump = 0
             
             if mod_id in self.mods:
                 self.enable_mod(mod_id)
-        
-        self.refresh_mod_list()
     
     def disable_selected_mod(self):
         """Disable the selected mod"""
@@ -1898,8 +1883,6 @@ FullMemoryDump = 0
             
             if mod_id in self.mods:
                 self.disable_mod(mod_id)
-        
-        self.refresh_mod_list()
     
     def delete_selected_mod(self):
         """Delete the selected mod"""
@@ -1917,144 +1900,117 @@ FullMemoryDump = 0
             
             if mod_id in self.mods:
                 self.delete_mod(mod_id)
+    
+    def get_deploy_strategy(self):
+        """How enabled mod files are placed in the game folder"""
+        strategy = self.config['Deployment'].get('strategy', DEPLOY_AUTO)
+        return strategy if strategy in DEPLOY_STRATEGIES else DEPLOY_AUTO
+    
+    def get_database_backend(self):
+        """Where mod records are kept: mods.json or the indexed mods.db"""
+        backend = self.config['Database'].get('backend', BACKEND_JSON)
+        return backend if backend in DATABASE_BACKENDS else BACKEND_JSON
+    
+    def confirm_ue4ss_for_enable(self):
+        """Make sure UE4SS is there before enabling UE4SS mods, returns False to cancel"""
+        if self.manager.ue4ss_installed():
+            return True
         
-        self.refresh_mod_list()
+        result = messagebox.askyesnocancel(
+            "UE4SS Not Found",
+            "⚠ UE4SS is NOT installed in your Brickadia folder!\n\n"
+            "This UE4SS mod requires UE4SS to work.\n\n"
+            "Would you like to download and install UE4SS now?\n\n"
+            "Yes = Download and install UE4SS, then enable mod\n"
+            "No = Enable mod anyway (won't work until UE4SS is installed)\n"
+            "Cancel = Don't enable the mod"
+        )
+        
+        if result is True:  # Yes - download UE4SS
+            # Continue enabling the mod only after a successful installation
+            return bool(self.download_and_install_ue4ss())
+        return result is False  # No = enable anyway, Cancel = abort
     
     def enable_mod(self, mod_id):
-        """Enable a mod by copying all its files to appropriate folder"""
+        """Enable a mod by deploying all its files to the appropriate folder"""
         mod = self.mods[mod_id]
         
-        if mod['enabled']:
-            messagebox.showinfo("Info", f"{mod['name']} is already enabled")
-            return
-        
         try:
-            mod_folder = Path(mod['folder'])
-            mod_type = mod.get('mod_type', 'PAK')  # Default to PAK for old mods
-            
-            if not mod_folder.exists():
-                messagebox.showerror("Error", f"Mod folder not found:\n{mod_folder}")
-                return
+            try:
+                dependencies = self.manager.enable(mod_id)
+            except UE4SSMissingError:
+                if not self.confirm_ue4ss_for_enable():
+                    return
+                dependencies = self.manager.enable(mod_id, require_ue4ss=False)
+            self.save_mods()
             
-            if mod_type == 'UE4SS':
-                # UE4SS mods go to Brickadia/Binaries/Win64/Mods/
-                game_base = Path(self.config['Paths']['brickadia_paks']).parent.parent
-                ue4ss_mods = game_base / 'Binaries' / 'Win64' / 'Mods' / mod['name'].replace(' ', '_')
-                
-                # Check if UE4SS is installed
-                ue4ss_dll = game_base / 'Binaries' / 'Win64' / 'UE4SS.dll'
-                if not ue4ss_dll.exists():
-                    result = messagebox.askyesnocancel(
-                        "UE4SS Not Found",
-                        "⚠ UE4SS is NOT installed in your Brickadia folder!\n\n"
-                        "This UE4SS mod requires UE4SS to work.\n\n"
-                        "Would you like to download and install UE4SS now?\n\n"
-                        "Yes = Download and install UE4SS, then enable mod\n"
-                        "No = Enable mod anyway (won't work until UE4SS is installed)\n"
-                        "Cancel = Don't enable the mod"
-                    )
-                    
-                    if result is True:  # Yes - download UE4SS
-                        if self.download_and_install_ue4ss():
-                            # Continue enabling the mod after successful installation
-                            pass
-                        else:
-                            return  # Download failed, abort
-                    elif result is False:  # No - enable anyway
-                        pass  # Continue with enabling
-                    else:  # Cancel
-                        return
-                
-                os.makedirs(ue4ss_mods, exist_ok=True)
-                
-                # Copy all mod files preserving structure
-                game_paths = []
-                for file_name in mod['files']:
-                    source = mod_folder / file_name
-                    destination = ue4ss_mods / file_name
-                    
-                    if source.exists():
-                        destination.parent.mkdir(parents=True, exist_ok=True)
-                        shutil.copy2(source, destination)
-                        game_paths.append(str(destination))
-                
-                mod['enabled'] = True
-                mod['game_paths'] = game_paths
-                self.save_mods()
-                
-                messagebox.showinfo("Success", f"Enabled UE4SS mod: {mod['name']}")
+            if is_ue4ss_mod(mod):
+                message = f"Enabled UE4SS mod: {mod['name']}"
             else:
-                # Regular PAK mods go to Paks folder
-                game_paks = Path(self.config['Paths']['brickadia_paks'])
-                
-                # Copy all mod files to game directory
-                game_paths = []
-                for file_name in mod['files']:
-                    source = mod_folder / file_name
-                    destination = game_paks / file_name
-                    
-                    if source.exists():
-                        shutil.copy2(source, destination)
-                        game_paths.append(str(destination))
-                
-                mod['enabled'] = True
-                mod['game_paths'] = game_paths
-                self.save_mods()
-                
-                messagebox.showinfo("Success", f"Enabled: {mod['name']}")
+                message = f"Enabled: {mod['name']}"
+            if dependencies:
+                required = "\n".join(f"• {self.mods[m]['name']}" for m in dependencies)
+                message += f"\n\nAlso enabled, as it requires them:\n{required}"
+            messagebox.showinfo("Success", message)
+        except ModStateError as e:
+            messagebox.showinfo("Info", str(e))
+        except DependencyError as e:
+            messagebox.showerror("Can't Enable Mod", f"{mod['name']} can't be enabled:\n\n{e}")
+        except DeploymentError as e:
+            messagebox.showerror("Error", str(e))
         except Exception as e:
             messagebox.showerror("Error", f"Failed to enable mod:\n{str(e)}")
     
     def disable_mod(self, mod_id):
-        """Disable a mod by removing all its files from Brickadia paks folder"""
+        """Disable a mod by removing all its files from the game folder"""
         mod = self.mods[mod_id]
         
-        if not mod['enabled']:
-            messagebox.showinfo("Info", f"{mod['name']} is already disabled")
-            return
-        
         try:
-            mod_type = mod.get('mod_type', 'PAK')
-            
-            if mod_type == 'UE4SS':
-                # For UE4SS mods, remove the entire mod folder
-                game_base = Path(self.config['Paths']['brickadia_paks']).parent.parent
-                ue4ss_mod_folder = game_base / 'Binaries' / 'Win64' / 'Mods' / mod['name'].replace(' ', '_')
-                
-                if ue4ss_mod_folder.exists():
-                    shutil.rmtree(ue4ss_mod_folder)
-            else:
-                # For PAK mods, remove individual files
-                for game_path_str in mod.get('game_paths', []):
-                    game_path = Path(game_path_str)
-                    if game_path.exists():
-                        os.remove(game_path)
-            
-            mod['enabled'] = False
-            if 'game_paths' in mod:
-                del mod['game_paths']
+            self.manager.disable(mod_id)
             self.save_mods()
             
             messagebox.showinfo("Success", f"Disabled: {mod['name']}")
+        except ModStateError as e:
+            messagebox.showinfo("Info", str(e))
         except Exception as e:
             messagebox.showerror("Error", f"Failed to disable mod:\n{str(e)}")
     
+    def apply_mod_set(self, desired_ids, title, resolve=False):
+        """Deploy exactly the given mods (in load order) touching only what differs, returns the PlanResult
+
+        With resolve the mods they require are enabled too; returns None
+        (after saying why) if they can't all be enabled together.
+        """
+        if resolve:
+            try:
+                desired_ids = self.manager.resolve_dependencies(desired_ids).order
+            except DependencyError as e:
+                messagebox.showerror(title, f"These mods can't be enabled together:\n\n{e}")
+                return None
+        plan = self.manager.plan(desired_ids)
+        
+        include_ue4ss = True
+        if any(is_ue4ss_mod(self.mods[m]) for m in plan.to_add):
+            include_ue4ss = self.confirm_ue4ss_for_enable()
+        
+        result = self.manager.apply(desired_ids, include_ue4ss, plan=plan)
+        if result.changed:
+            self.save_mods()
+        if result.reordered:
+            self.invalidate(self.VIEW_LOAD_ORDER)
+        
+        if result.failed:
+            details = "\n".join(f"• {self.mods[m]['name']}: {e}" for m, e in result.failed[:10])
+            messagebox.showwarning(title, f"{len(result.failed)} mod(s) could not be changed:\n\n{details}")
+        return result
+    
     def delete_mod(self, mod_id):
         """Delete a mod completely"""
         mod = self.mods[mod_id]
         
         try:
-            # Disable first if enabled
-            if mod['enabled']:
-                self.disable_mod(mod_id)
-            
-            # Delete mod folder and all its contents
-            mod_folder = Path(mod['folder'])
-            if mod_folder.exists():
-                shutil.rmtree(mod_folder)
-            
-            # Remove from database
-            del self.mods[mod_id]
+            self.manager.delete(mod_id)
+            self.forget_mod_icons(mod_id)
             self.save_mods()
             
             messagebox.showinfo("Success", f"Deleted: {mod['name']}")
@@ -2062,59 +2018,54 @@ FullMemoryDump = 0
             messagebox.showerror("Error", f"Failed to delete mod:\n{str(e)}")
     
     def refresh_mod_list(self):
-        """Refresh the mod list display - uses filter_mods to apply current filters"""
-        self.filter_mods()
-        self.update_load_order_list()
-        # Check for duplicates automatically
-        self.check_for_duplicates_silent()
+        """Redraw every view on the next refresh pass"""
+        self.invalidate(*self.ALL_VIEWS)
+    
+    def invalidate(self, *views):
+        """Mark views as out of date; they are redrawn once, when Tk is next idle
+        
+        However many operations invalidate views before then, each view is
+        redrawn at most once per pass.
+        """
+        self.dirty_views.update(views)
+        if self.refresh_job is None:
+            self.refresh_job = self.root.after_idle(self.refresh_views)
+    
+    def refresh_views(self):
+        """Redraw the views marked dirty since the last pass"""
+        self.refresh_job = None
+        dirty = self.dirty_views
+        self.dirty_views = set()
+        if self.VIEW_TREE in dirty:
+            self.filter_mods()
+        if self.VIEW_LOAD_ORDER in dirty:
+            self.update_load_order_list()
+        if self.VIEW_DUPLICATES in dirty:
+            # Check for duplicates automatically
+            self.check_for_duplicates_silent()
+        if self.VIEW_COUNTS in dirty:
+            self.update_mod_count()
     
     def check_for_duplicates_silent(self):
         """Silently check for duplicates and update UI indicator"""
-        duplicates = self.find_duplicate_mods()
-        # You could add a visual indicator here if duplicates are found
-        if duplicates:
-            print(f"Warning: {len(duplicates)} duplicate mod(s) detected")
+        # Kept up to date by the manager's duplicate index, nothing is rescanned
+        conflicts = self.manager.duplicate_count()
+        if conflicts:
+            self.check_dupes_btn.config(text=f"⚠️ Duplicates ({conflicts})", fg=self.THEME_WARNING)
+        else:
+            self.check_dupes_btn.config(text="🔍 Check Duplicates", fg=self.THEME_TEXT)
     
     def find_duplicate_mods(self):
-        """Find duplicate mods by name or file"""
-        duplicates = []
-        seen_names = {}
-        seen_files = {}
-        
-        for mod_id, mod in self.mods.items():
-            mod_name = mod['name'].lower()
-            
-            # Check for duplicate names
-            if mod_name in seen_names:
-                duplicates.append({
-                    'type': 'name',
-                    'mod1': seen_names[mod_name],
-                    'mod2': mod_id,
-                    'name': mod['name']
-                })
-            else:
-                seen_names[mod_name] = mod_id
-            
-            # Check for duplicate PAK files
-            for file_name in mod['files']:
-                file_lower = file_name.lower()
-                if file_lower in seen_files:
-                    duplicates.append({
-                        'type': 'file',
-                        'mod1': seen_files[file_lower],
-                        'mod2': mod_id,
-                        'file': file_name
-                    })
-                else:
-                    seen_files[file_lower] = mod_id
-        
-        return duplicates
+        """Find duplicate mods by name, file or identical file content"""
+        return self.manager.find_duplicates(content=True)
     
     def check_for_duplicates(self):
         """Show dialog with duplicate mods information"""
         duplicates = self.find_duplicate_mods()
+        # Enabled mods whose paks replace the same game assets
+        conflicts = self.manager.asset_conflicts()
         
-        if not duplicates:
+        if not duplicates and not conflicts:
             messagebox.showinfo(
                 "No Duplicates Found",
                 "✓ No duplicate mods detected!\n\n"
@@ -2125,8 +2076,12 @@ FullMemoryDump = 0
         # Create detailed message
         dup_by_name = [d for d in duplicates if d['type'] == 'name']
         dup_by_file = [d for d in duplicates if d['type'] == 'file']
+        dup_by_hash = [d for d in duplicates if d['type'] == 'hash']
         
-        message = f"⚠️ Found {len(duplicates)} potential duplicate(s):\n\n"
+        message = f"⚠️ Found {len(duplicates)} potential duplicate(s)"
+        if conflicts:
+            message += f" and {len(conflicts)} overridden asset(s)"
+        message += ":\n\n"
         
         if dup_by_name:
             message += f"📝 Duplicate Names ({len(dup_by_name)}):\n"
@@ -2146,84 +2101,107 @@ FullMemoryDump = 0
                 message += f"  ... and {len(dup_by_file) - 5} more\n"
             message += "\n"
         
+        if dup_by_hash:
+            message += f"🧬 Identical Files ({len(dup_by_hash)}):\n"
+            for dup in dup_by_hash[:5]:  # Show first 5
+                message += f"  • {dup['file']} ({self.mods[dup['mod1']]['name']} / {self.mods[dup['mod2']]['name']})\n"
+            if len(dup_by_hash) > 5:
+                message += f"  ... and {len(dup_by_hash) - 5} more\n"
+            message += "\n"
+        
+        if conflicts:
+            message += f"🎯 Assets Overridden by Several Enabled Mods ({len(conflicts)}):\n"
+            for asset, mod_ids in list(conflicts.items())[:5]:  # Show first 5
+                names = ", ".join(self.mods[mod_id]['name'] for mod_id in mod_ids)
+                message += f"  • {asset} ({names})\n"
+            if len(conflicts) > 5:
+                message += f"  ... and {len(conflicts) - 5} more\n"
+            message += "The mod loaded last wins for each asset.\n\n"
+        
         message += "Having duplicate mods may cause conflicts!\nConsider removing or disabling duplicates."
         
         messagebox.showwarning("Duplicate Mods Detected", message)
     
+    def auto_sort_load_order(self):
+        """Reorder enabled mods by their modinfo.json rules and asset conflicts"""
+        solution = self.manager.solve_load_order()
+        
+        if solution.cycles:
+            message = "Some load order rules contradict each other:\n\n"
+            for cycle in solution.cycles[:5]:  # Show first 5
+                names = [self.mods[mod_id]['name'] for mod_id in cycle]
+                message += "  • " + " → ".join(names + names[:1]) + "\n"
+            if len(solution.cycles) > 5:
+                message += f"  ... and {len(solution.cycles) - 5} more\n"
+            message += "\nEach loop was broken at its first mod. Sort anyway?"
+            if not messagebox.askyesno("Auto Sort", message):
+                return
+        
+        if solution.order == self.enabled_mod_ids():
+            messagebox.showinfo("Auto Sort", "✓ The load order already follows every rule.")
+            return
+        # Only the mods that move get renamed in Paks; the panel redraws on the next refresh
+        self.apply_mod_set(solution.order, "Auto Sort")
+    
     def update_load_order_list(self):
         """Update the load order display with enabled mods and their icons"""
-        # Clear existing items
-        for item in self.order_items:
-            item.destroy()
-        self.order_items.clear()
+        self.order_ids = self.manager.enabled_ids()
+        self.order_hover = None
         
-        # Get all enabled mods sorted by load order
-        enabled_mods = [(mod_id, mod) for mod_id, mod in self.mods.items() if mod['enabled']]
-        enabled_mods.sort(key=lambda x: x[1].get('load_order', 999))
-        
-        for i, (mod_id, mod) in enumerate(enabled_mods, 1):
-            self.create_load_order_item(i, mod_id, mod)
-        
-        # Update canvas scroll region
-        self.order_canvas.update_idletasks()
-        self.order_canvas.configure(scrollregion=self.order_canvas.bbox("all"))
+        # Rows are only drawn for the part of the list in view
+        height = len(self.order_ids) * self.ORDER_ROW_PITCH + self.ORDER_ROW_GAP
+        self.order_canvas.configure(scrollregion=(0, 0, self.order_canvas.winfo_width(), height))
+        self.render_order_rows(redraw=True)
+    
+    def render_order_rows(self, redraw=False):
+        """Draw the load order rows in view and drop the ones scrolled out of it"""
+        canvas = self.order_canvas
+        top = canvas.canvasy(0)
+        bottom = canvas.canvasy(canvas.winfo_height())
+        first = max(0, int(top // self.ORDER_ROW_PITCH) - 1)
+        last = min(len(self.order_ids), int(bottom // self.ORDER_ROW_PITCH) + 2)
+        visible = set(self.order_ids[first:last])
+        dragged = self.drag_data.get("mod_id")
+        
+        for mod_id in list(self.order_rows):
+            if mod_id != dragged and (redraw or mod_id not in visible):
+                canvas.delete(self.order_rows.pop(mod_id)['tag'])
+        for index in range(first, last):
+            mod_id = self.order_ids[index]
+            if mod_id not in self.order_rows:
+                self.create_load_order_item(index, mod_id, self.mods[mod_id])
+        if dragged in self.order_rows:
+            canvas.tag_raise(self.order_rows[dragged]['tag'])
+    
+    def order_row_top(self, index):
+        return index * self.ORDER_ROW_PITCH + self.ORDER_ROW_GAP
     
     def create_load_order_item(self, index, mod_id, mod):
-        """Create a visual load order item with icon and info"""
-        # Create item frame
-        item_frame = tk.Frame(
-            self.order_inner_frame,
-            bg="#353535",
-            bd=0,
-            highlightthickness=1,
-            highlightbackground="#404040"
-        )
-        item_frame.pack(fill=tk.X, padx=5, pady=3)
-        
-        # Store mod_id as attribute
-        item_frame.mod_id = mod_id
-        item_frame.index = index
-        self.order_items.append(item_frame)
+        """Draw one load order row (number badge, icon, name and metadata) on the canvas"""
+        canvas = self.order_canvas
+        self.order_row_tags += 1
+        tag = f"order_row{self.order_row_tags}"
+        tags = (tag, "order_row")
+        width = max(canvas.winfo_width(), 200)
+        left, right = 5, width - 5
+        top = self.order_row_top(index)
+        bottom = top + self.ORDER_ROW_HEIGHT
+        
+        background = canvas.create_rectangle(left, top, right, bottom, fill="#353535", outline="#404040", tags=tags)
         
         # Left side: Number badge
-        number_frame = tk.Frame(item_frame, bg="#2d2d2d", width=35)
-        number_frame.pack(side=tk.LEFT, fill=tk.Y, padx=0, pady=0)
-        number_frame.pack_propagate(False)
-        
-        number_label = tk.Label(
-            number_frame,
-            text=f"#{index}",
-            font=("Segoe UI", 9, "bold"),
-            bg="#2d2d2d",
-            fg=self.THEME_ACCENT
-        )
-        number_label.pack(expand=True)
+        canvas.create_rectangle(left + 1, top + 1, left + 36, bottom - 1, fill="#2d2d2d", width=0, tags=tags)
+        number = canvas.create_text(left + 18, (top + bottom) // 2, text=f"#{index + 1}",
+                                    font=("Segoe UI", 9, "bold"), fill=self.THEME_ACCENT, tags=tags)
         
         # Mod icon
-        icon_label = tk.Label(item_frame, bg="#353535")
-        icon_label.pack(side=tk.LEFT, padx=5, pady=5)
-        
-        # Load icon or use fallback
         icon_image = self.get_load_order_icon(mod_id, mod)
-        icon_label.config(image=icon_image)
-        icon_label.image = icon_image  # Keep reference
-        
-        # Right side: Mod info
-        info_frame = tk.Frame(item_frame, bg="#353535")
-        info_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5, pady=5)
+        if icon_image:
+            canvas.create_image(left + 42, top + 6, image=icon_image, anchor="nw", tags=tags)
         
-        # Mod name
-        name_label = tk.Label(
-            info_frame,
-            text=mod['name'],
-            font=("Segoe UI", 10, "bold"),
-            bg="#353535",
-            fg=self.THEME_TEXT,
-            anchor="w"
-        )
-        name_label.pack(fill=tk.X)
-        
-        # Mod metadata (version and author)
+        # Right side: Mod name and metadata (version and author)
+        text_left = left + 42 + ORDER_ICON_SIZE + 8
+        text_width = right - text_left - 6
         metadata_parts = []
         if mod.get('version'):
             metadata_parts.append(f"v{mod['version']}")
@@ -2231,93 +2209,139 @@ FullMemoryDump = 0
             author_display = mod['author'][:20] + "..." if len(mod['author']) > 20 else mod['author']
             metadata_parts.append(f"by {author_display}")
         
+        name_y = top + 16 if metadata_parts else (top + bottom) // 2
+        canvas.create_text(text_left, name_y, text=self.fit_text(mod['name'], self.order_name_font, text_width),
+                           font=self.order_name_font, fill=self.THEME_TEXT, anchor="w", tags=tags)
         if metadata_parts:
-            metadata_label = tk.Label(
-                info_frame,
-                text=" • ".join(metadata_parts),
-                font=("Segoe UI", 8),
-                bg="#353535",
-                fg=self.THEME_TEXT_DIM,
-                anchor="w"
-            )
-            metadata_label.pack(fill=tk.X)
+            canvas.create_text(text_left, top + 34,
+                               text=self.fit_text(" • ".join(metadata_parts), self.order_meta_font, text_width),
+                               font=self.order_meta_font, fill=self.THEME_TEXT_DIM, anchor="w", tags=tags)
         
-        # Bind drag events to all components
-        for widget in [item_frame, number_frame, number_label, icon_label, info_frame, name_label]:
-            widget.bind('<Button-1>', self.on_load_order_click)
-            widget.bind('<B1-Motion>', self.on_load_order_drag)
-            widget.bind('<ButtonRelease-1>', self.on_load_order_drop)
-            widget.bind('<Enter>', lambda e, f=item_frame: f.config(bg="#404040"))
-            widget.bind('<Leave>', lambda e, f=item_frame: f.config(bg="#353535"))
+        self.order_rows[mod_id] = {'tag': tag, 'index': index, 'background': background, 'number': number}
+    
+    def fit_text(self, text, font, width):
+        """Cut text to fit width pixels, ending with ... if it was cut"""
+        if width <= 0 or font.measure(text) <= width:
+            return text
+        low, high = 0, len(text)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if font.measure(text[:middle] + "...") <= width:
+                low = middle
+            else:
+                high = middle - 1
+        return text[:low] + "..."
+    
+    def move_order_row(self, mod_id, index):
+        """Move a drawn row to another slot and renumber it"""
+        row = self.order_rows.get(mod_id)
+        if row is None:
+            return
+        self.order_canvas.move(row['tag'], 0, (index - row['index']) * self.ORDER_ROW_PITCH)
+        self.order_canvas.itemconfig(row['number'], text=f"#{index + 1}")
+        row['index'] = index
+    
+    def redraw_order_row(self, mod_id):
+        """Draw a row again, e.g. once its icon thumbnail is ready"""
+        row = self.order_rows.pop(mod_id, None)
+        if row is not None:
+            self.order_canvas.delete(row['tag'])
+            self.create_load_order_item(row['index'], mod_id, self.mods[mod_id])
+    
+    def order_index_at(self, y):
+        """Row index under a y position in canvas window coordinates"""
+        index = int((self.order_canvas.canvasy(y) - self.ORDER_ROW_GAP) // self.ORDER_ROW_PITCH)
+        return min(max(index, 0), len(self.order_ids) - 1)
+    
+    def on_load_order_hover(self, event):
+        if self.drag_data["mod_id"] is None and self.order_ids:
+            self.set_order_hover(self.order_ids[self.order_index_at(event.y)])
+    
+    def set_order_hover(self, mod_id):
+        """Highlight the row under the mouse"""
+        if mod_id == self.order_hover:
+            return
+        for hover_id, fill in ((self.order_hover, "#353535"), (mod_id, "#404040")):
+            row = self.order_rows.get(hover_id)
+            if row is not None:
+                self.order_canvas.itemconfig(row['background'], fill=fill)
+        self.order_hover = mod_id
     
     def get_load_order_icon(self, mod_id, mod):
         """Get or create icon for load order display"""
-        # Check cache first
-        if mod_id in self.load_order_icons:
-            return self.load_order_icons[mod_id]
+        return self.get_mod_icon(mod_id, mod, ORDER_ICON_SIZE)
+    
+    def get_mod_icon(self, mod_id, mod, size):
+        """Mod icon at a thumbnail size, loaded from the thumbnail cache
         
-        # Try to load mod's icon
-        icon_path = mod.get('icon', '')
-        if icon_path and Path(icon_path).exists():
-            try:
-                from PIL import Image, ImageTk
-                img = Image.open(icon_path)
-                img = img.resize((40, 40), Image.Resampling.LANCZOS)
-                icon_image = ImageTk.PhotoImage(img)
-                self.load_order_icons[mod_id] = icon_image
-                return icon_image
-            except Exception as e:
-                print(f"Failed to load icon for {mod['name']}: {e}")
+        Full-size icons are never decoded here: a mod without a thumbnail
+        yet shows the fallback icon while one is made in the background.
+        """
+        cache = self.mod_icons if size == TREE_ICON_SIZE else self.load_order_icons
+        if mod_id in cache:
+            return cache[mod_id]
         
-        # Fallback to program logo without white background
-        if self.logo_ui_photo:
-            # Resize logo to 40x40 for load order
-            try:
-                from PIL import Image, ImageTk
-                logo_resized = self.logo_ui.resize((40, 40), Image.Resampling.LANCZOS)
-                icon_image = ImageTk.PhotoImage(logo_resized)
-                self.load_order_icons[mod_id] = icon_image
-                return icon_image
-            except:
-                pass
+        icon_path = mod.get('icon', '')
+        if icon_path:
+            thumbnail = self.manager.thumbnails.get(icon_path, size)
+            if thumbnail is not None:
+                try:
+                    icon_image = tk.PhotoImage(file=str(thumbnail))
+                    cache[mod_id] = icon_image
+                    return icon_image
+                except tk.TclError as e:
+                    print(f"Failed to load icon for {mod['name']}: {e}")
+            elif Path(icon_path).exists():
+                self.queue_thumbnail(mod_id, icon_path)
         
-        # Ultimate fallback: create a simple colored square
-        try:
-            from PIL import Image, ImageTk
-            fallback = Image.new('RGBA', (40, 40), (93, 173, 226, 255))  # Blue color
-            icon_image = ImageTk.PhotoImage(fallback)
-            self.load_order_icons[mod_id] = icon_image
-            return icon_image
-        except:
-            return None
+        return self.get_fallback_icon(size)
     
-    def get_fallback_icon_for_tree(self, mod_id):
-        """Get fallback icon for tree view (48x48)"""
-        # Check if we already have a cached fallback for this mod
-        cache_key = f"tree_{mod_id}"
-        if cache_key in self.mod_icons:
-            return self.mod_icons[cache_key]
-        
-        # Use program logo as fallback
-        if self.logo_ui_photo:
-            try:
-                from PIL import Image, ImageTk
-                logo_resized = self.logo_ui.resize((48, 48), Image.Resampling.LANCZOS)
-                icon_image = ImageTk.PhotoImage(logo_resized)
-                self.mod_icons[cache_key] = icon_image
-                return icon_image
-            except Exception as e:
-                print(f"Failed to create fallback icon: {e}")
+    def queue_thumbnail(self, mod_id, icon_path):
+        """Make a mod's missing thumbnails on a worker thread"""
+        if mod_id in self.thumbnail_jobs:
+            return
+        if not self.thumbnail_jobs:
+            self.root.after(self.INSTALL_POLL_MS, self.poll_thumbnail_jobs)
+        if self.thumbnail_executor is None:
+            self.thumbnail_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="thumbnails")
+        self.thumbnail_jobs[mod_id] = self.thumbnail_executor.submit(self.manager.thumbnails.generate, icon_path)
+    
+    def poll_thumbnail_jobs(self):
+        """Swap in icons whose thumbnails are ready (runs on the Tk thread)"""
+        finished = [mod_id for mod_id, job in self.thumbnail_jobs.items() if job.done()]
+        for mod_id in finished:
+            del self.thumbnail_jobs[mod_id]
+            mod = self.mods.get(mod_id)
+            if mod is not None and self.mod_tree.exists(mod_id):
+                icon_image = self.get_mod_icon(mod_id, mod, TREE_ICON_SIZE)
+                self.mod_tree.item(mod_id, image=icon_image if icon_image else "")
+            if mod_id in self.order_rows:
+                self.redraw_order_row(mod_id)
+        if self.thumbnail_jobs:
+            self.root.after(self.INSTALL_POLL_MS, self.poll_thumbnail_jobs)
+    
+    def forget_mod_icons(self, mod_id):
+        """Drop a deleted mod's icons from the caches"""
+        self.mod_icons.pop(mod_id, None)
+        self.load_order_icons.pop(mod_id, None)
+    
+    def get_fallback_icon(self, size):
+        """Program logo (or a plain square) at a thumbnail size, shared by all mods"""
+        if size in self.fallback_icons:
+            return self.fallback_icons[size]
         
-        # Ultimate fallback: create a simple colored square
+        icon_image = None
         try:
             from PIL import Image, ImageTk
-            fallback = Image.new('RGBA', (48, 48), (93, 173, 226, 255))  # Blue color
-            icon_image = ImageTk.PhotoImage(fallback)
-            self.mod_icons[cache_key] = icon_image
-            return icon_image
-        except:
-            return None
+            if self.logo_ui_photo:
+                icon_image = ImageTk.PhotoImage(self.logo_ui.resize((size, size), Image.Resampling.LANCZOS))
+            else:
+                # Ultimate fallback: create a simple colored square
+                icon_image = ImageTk.PhotoImage(Image.new('RGBA', (size, size), (93, 173, 226, 255)))
+        except Exception as e:
+            print(f"Failed to create fallback icon: {e}")
+        self.fallback_icons[size] = icon_image
+        return icon_image
     
     def move_mod_up(self):
         """Move selected mod up in load order"""
@@ -2333,74 +2357,76 @@ FullMemoryDump = 0
     
     def on_load_order_click(self, event):
         """Handle mouse click on load order item"""
-        # Find which item was clicked
-        widget = event.widget
-        # Traverse up to find the item frame
-        while widget and widget != self.order_inner_frame:
-            if hasattr(widget, 'mod_id'):
-                self.drag_data["item"] = widget
-                self.drag_data["start_y"] = event.y_root
-                self.drag_data["index"] = self.order_items.index(widget)
-                widget.config(cursor="hand2")
-                return
-            widget = widget.master
+        if not self.order_ids:
+            return
+        index = self.order_index_at(event.y)
+        self.drag_data = {
+            "index": index,
+            "mod_id": self.order_ids[index],
+            "start_y": event.y,
+            "last_y": self.order_canvas.canvasy(event.y),
+            "order": list(self.order_ids),
+        }
+        self.order_canvas.config(cursor="hand2")
     
     def on_load_order_drag(self, event):
-        """Handle dragging in load order list"""
-        if self.drag_data["item"] is None:
+        """Move the dragged row with the mouse, sliding only the rows it passes"""
+        mod_id = self.drag_data["mod_id"]
+        if mod_id is None:
             return
         
         # Only start dragging if mouse moved more than 5 pixels
-        if abs(event.y_root - self.drag_data.get("start_y", 0)) < 5:
+        if abs(event.y - self.drag_data["start_y"]) < 5 and self.drag_data["index"] == self.drag_data["order"].index(mod_id):
             return
         
-        # Find where to insert based on mouse position
+        # Scroll when dragging past the top or bottom edge
+        canvas = self.order_canvas
+        if event.y < 10:
+            canvas.yview_scroll(-1, "units")
+        elif event.y > canvas.winfo_height() - 10:
+            canvas.yview_scroll(1, "units")
+        
+        # The dragged row follows the mouse
+        y = canvas.canvasy(event.y)
+        row = self.order_rows.get(mod_id)
+        if row is not None:
+            canvas.move(row['tag'], 0, y - self.drag_data["last_y"])
+            canvas.tag_raise(row['tag'])
+        self.drag_data["last_y"] = y
+        
+        # Slide the rows between the old and new slot over by one
         current_index = self.drag_data["index"]
-        item = self.drag_data["item"]
-        
-        # Calculate new position based on y coordinate
-        for i, other_item in enumerate(self.order_items):
-            if i == current_index:
-                continue
-            
-            # Get the y position of this item
-            y_pos = other_item.winfo_y()
-            height = other_item.winfo_height()
-            
-            # Check if mouse is over this item
-            if y_pos <= event.y_root - self.order_canvas.winfo_rooty() <= y_pos + height:
-                if i != current_index:
-                    # Move the item
-                    self.order_items.pop(current_index)
-                    self.order_items.insert(i, item)
-                    self.drag_data["index"] = i
-                    
-                    # Re-pack items in new order
-                    for item_widget in self.order_items:
-                        item_widget.pack_forget()
-                    for item_widget in self.order_items:
-                        item_widget.pack(fill=tk.X, padx=5, pady=3)
-                    
-                    # Update numbers
-                    self.renumber_load_order()
-                    break
+        new_index = self.order_index_at(event.y)
+        if new_index == current_index:
+            return
+        self.order_ids.pop(current_index)
+        self.order_ids.insert(new_index, mod_id)
+        step = 1 if new_index < current_index else -1
+        for index in range(new_index, current_index, step):
+            self.move_order_row(self.order_ids[index + step], index + step)
+        self.drag_data["index"] = new_index
+        if row is not None:
+            self.order_canvas.itemconfig(row['number'], text=f"#{new_index + 1}")
+            row['index'] = new_index
     
     def on_load_order_drop(self, event):
         """Handle mouse release after dragging"""
-        if self.drag_data["item"]:
-            self.drag_data["item"].config(cursor="")
-        self.drag_data = {"index": None, "item": None, "start_y": None}
-    
-    def renumber_load_order(self):
-        """Renumber the load order items after reordering"""
-        for i, item in enumerate(self.order_items, 1):
-            # Find the number label and update it
-            for child in item.winfo_children():
-                if isinstance(child, tk.Frame):
-                    for label in child.winfo_children():
-                        if isinstance(label, tk.Label) and label.cget('text').startswith('#'):
-                            label.config(text=f"#{i}")
-                            break
+        mod_id = self.drag_data["mod_id"]
+        old_order = self.drag_data.get("order")
+        self.drag_data = {"index": None, "mod_id": None, "start_y": None}
+        self.order_canvas.config(cursor="")
+        if mod_id is None:
+            return
+        
+        # Snap the dragged row into its slot
+        self.redraw_order_row(mod_id)
+        self.render_order_rows()
+        
+        # Persist the new order; only the mods that moved get renamed in Paks
+        new_order = list(self.order_ids)
+        if old_order is not None and new_order != old_order:
+            # Rebuild the list after this event handler returns
+            self.root.after_idle(lambda: self.apply_mod_set(new_order, "Load Order"))
     
     def show_context_menu(self, event):
         """Show right-click context menu for mod"""
@@ -2478,7 +2504,7 @@ FullMemoryDump = 0
         """Open settings window"""
         settings_window = tk.Toplevel(self.root)
         settings_window.title("Settings")
-        settings_window.geometry("500x250")
+        settings_window.geometry("500x330")
         settings_window.configure(bg="#1e1e1e")
         settings_window.transient(self.root)
         settings_window.grab_set()
@@ -2545,15 +2571,38 @@ FullMemoryDump = 0
             relief=tk.FLAT
         ).pack(side=tk.LEFT, padx=5)
         
+        # Deployment strategy
+        tk.Label(
+            settings_window,
+            text="Enable Mods Using (auto = hardlink, then reflink, then copy):",
+            bg="#2b2b2b",
+            fg="#ffffff",
+            font=("Arial", 10)
+        ).pack(pady=(20, 5), padx=20, anchor="w")
+        
+        strategy_var = tk.StringVar(value=self.get_deploy_strategy())
+        ttk.Combobox(
+            settings_window,
+            textvariable=strategy_var,
+            values=list(DEPLOY_STRATEGIES),
+            state="readonly",
+            width=15,
+            font=("Arial", 10)
+        ).pack(padx=20, anchor="w")
+        
         # Save button
         def save_settings():
             self.config['Paths']['brickadia_paks'] = paks_entry.get()
             self.config['Paths']['mods_storage'] = storage_entry.get()
+            self.config['Deployment']['strategy'] = strategy_var.get()
             self.save_config()
             
             # Create mods storage directory if it doesn't exist
             os.makedirs(self.config['Paths']['mods_storage'], exist_ok=True)
             self.mods_storage_path = self.config['Paths']['mods_storage']
+            self.manager.paks_path = self.config['Paths']['brickadia_paks']
+            self.manager.strategy = self.get_deploy_strategy()
+            self.manager.set_storage(self.mods_storage_path)
             
             messagebox.showinfo("Success", "Settings saved!")
             settings_window.destroy()
@@ -2680,80 +2729,119 @@ FullMemoryDump = 0
         except Exception as e:
             messagebox.showerror("Error", f"Failed to open Steam:\n{str(e)}")
     
+    def schedule_search(self):
+        """Run the search once typing pauses instead of on every keystroke"""
+        if self.search_timer is not None:
+            self.root.after_cancel(self.search_timer)
+        self.search_timer = self.root.after(self.SEARCH_DELAY_MS, self.run_search)
+    
+    def run_search(self):
+        self.search_timer = None
+        self.invalidate(self.VIEW_TREE, self.VIEW_COUNTS)
+    
     def filter_mods(self):
-        """Filter mods based on search and filter criteria"""
-        search_text = self.search_var.get().lower()
+        """Filter mods based on search and filter criteria
+        
+        Rows stay in the tree keyed by mod id: rows that stop matching are
+        detached, matching ones are reattached in place and only rows of
+        mods that changed since they were drawn get new values.
+        """
+        if self.search_timer is not None:
+            self.root.after_cancel(self.search_timer)
+            self.search_timer = None
+        search_text = self.search_var.get()
         filter_status = self.filter_var.get()
         
-        # Clear existing items
-        for item in self.mod_tree.get_children():
-            self.mod_tree.delete(item)
-        
-        # Clear old icons
-        self.mod_icons.clear()
-        
-        # Count for display
-        filtered_count = 0
-        
-        # Add filtered mods
-        for mod_id, mod in self.mods.items():
-            # Apply status filter
-            if filter_status == "Enabled Only" and not mod['enabled']:
-                continue
-            elif filter_status == "Disabled Only" and mod['enabled']:
-                continue
-            
-            # Apply search filter
-            if search_text:
-                searchable = f"{mod['name']} {mod.get('description', '')} {mod.get('author', '')}".lower()
-                if search_text not in searchable:
+        # Drop rows of deleted mods
+        gone = [mod_id for mod_id in self.deleted_rows if mod_id in self.tree_rows]
+        self.deleted_rows.clear()
+        if gone:
+            self.mod_tree.delete(*gone)
+            self.tree_rows.difference_update(gone)
+            self.tree_order = [mod_id for mod_id in self.tree_order if mod_id in self.mods]
+        
+        # Matching mods, best match first (from the manager's search index)
+        enabled = {"Enabled Only": True, "Disabled Only": False}.get(filter_status)
+        wanted = self.manager.search(search_text, enabled)
+        wanted_set = set(wanted)
+        
+        # Detach rows that no longer match
+        hidden = [mod_id for mod_id in self.tree_order if mod_id not in wanted_set]
+        if hidden:
+            self.mod_tree.detach(*hidden)
+            self.mod_tree.selection_remove(*hidden)
+            self.tree_order = [mod_id for mod_id in self.tree_order if mod_id in wanted_set]
+        
+        # Refresh rows of mods that changed since they were drawn
+        for mod_id in self.stale_rows & self.tree_rows:
+            mod = self.mods[mod_id]
+            icon_image = self.get_mod_icon(mod_id, mod, TREE_ICON_SIZE)
+            self.mod_tree.item(mod_id, image=icon_image if icon_image else "", values=self.mod_row_values(mod))
+        self.stale_rows.clear()
+        
+        # Insert or reattach matching rows where they belong
+        if self.tree_order != wanted:
+            order = self.tree_order
+            for index, mod_id in enumerate(wanted):
+                if index < len(order) and order[index] == mod_id:
                     continue
-            
-            # Add mod to list
-            status = "✓ Enabled" if mod['enabled'] else "✗ Disabled"
-            
-            # Add mod type badge to name
-            mod_type = mod.get('mod_type', 'PAK')  # Default to PAK for backward compatibility
-            mod_name = f"[{mod_type}] {mod['name']}"
-            
-            info_parts = []
-            if mod.get('description'):
-                info_parts.append(mod['description'])
-            if mod.get('author'):
-                info_parts.append(f"by {mod['author']}")
-            if mod.get('version'):
-                info_parts.append(f"v{mod['version']}")
-            
-            info_text = " | ".join(info_parts) if info_parts else ""
-            
-            # Load icon if available, or use fallback
-            icon_image = None
-            icon_path = mod.get('icon', '')
-            if icon_path and Path(icon_path).exists():
-                try:
-                    from PIL import Image, ImageTk
-                    img = Image.open(icon_path)
-                    img = img.resize((48, 48), Image.Resampling.LANCZOS)
-                    icon_image = ImageTk.PhotoImage(img)
-                    self.mod_icons[mod_id] = icon_image
-                except Exception as e:
-                    print(f"Failed to load icon for {mod['name']}: {e}")
-            
-            # If no icon loaded, use program logo as fallback
-            if not icon_image:
-                icon_image = self.get_fallback_icon_for_tree(mod_id)
-            
-            self.mod_tree.insert("", tk.END, iid=mod_id, image=icon_image if icon_image else "", 
-                               values=(mod_name, status, info_text))
-            filtered_count += 1
-        
-        # Update mod count label
+                if mod_id in self.tree_rows:
+                    if mod_id in order:
+                        order.remove(mod_id)
+                    self.mod_tree.move(mod_id, "", index)
+                else:
+                    mod = self.mods[mod_id]
+                    # Icon from the thumbnail cache, or the fallback
+                    icon_image = self.get_mod_icon(mod_id, mod, TREE_ICON_SIZE)
+                    self.mod_tree.insert("", index, iid=mod_id, image=icon_image if icon_image else "",
+                                         values=self.mod_row_values(mod))
+                    self.tree_rows.add(mod_id)
+                order.insert(index, mod_id)
+    
+    def update_mod_count(self):
+        """Update the mod count label from the rows the mod list shows"""
+        filtered_count = len(self.tree_order)
         total_count = len(self.mods)
         if filtered_count == total_count:
             self.mod_count_label.config(text=f"({total_count} mods)")
         else:
             self.mod_count_label.config(text=f"({filtered_count} of {total_count} mods)")
     
+    def mod_row_values(self, mod):
+        """(name, status, details) shown for a mod in the mod list"""
+        status = "✓ Enabled" if mod['enabled'] else "✗ Disabled"
+        
+        # Add mod type badge to name
+        mod_type = mod.get('mod_type', 'PAK')  # Default to PAK for backward compatibility
+        mod_name = f"[{mod_type}] {mod['name']}"
+        
+        info_parts = []
+        if mod.get('description'):
+            info_parts.append(mod['description'])
+        if mod.get('author'):
+            info_parts.append(f"by {mod['author']}")
+        if mod.get('version'):
+            info_parts.append(f"v{mod['version']}")
+        
+        info_text = " | ".join(info_parts) if info_parts else ""
+        return (mod_name, status, info_text)
+    
+    def on_manager_event(self, event):
+        """Remember which mod list rows and views need redrawing"""
+        if event.kind == EVENT_MOD_INSTALLED:
+            self.stale_rows.add(event.mod_id)
+            self.invalidate(self.VIEW_TREE, self.VIEW_DUPLICATES, self.VIEW_COUNTS)
+        elif event.kind in (EVENT_MOD_ENABLED, EVENT_MOD_DISABLED):
+            self.stale_rows.add(event.mod_id)
+            self.invalidate(self.VIEW_TREE, self.VIEW_LOAD_ORDER, self.VIEW_COUNTS)
+        elif event.kind == EVENT_MOD_DELETED:
+            self.deleted_rows.add(event.mod_id)
+            self.invalidate(self.VIEW_TREE, self.VIEW_DUPLICATES, self.VIEW_COUNTS)
+    
+    def enabled_mod_ids(self):
+        """Ids of enabled mods in their current load order"""
+        return self.manager.enabled_ids()
+    
     def enable_all_mods(self):
         """Enable all installed mods"""
         confirm = messagebox.askyesno(
@@ -2763,17 +2851,16 @@ FullMemoryDump = 0
         if not confirm:
             return
         
-        enabled_count = 0
-        for mod_id, mod in self.mods.items():
-            if not mod['enabled']:
-                try:
-                    self.enable_mod(mod_id)
-                    enabled_count += 1
-                except Exception as e:
-                    print(f"Failed to enable {mod['name']}: {e}")
-        
-        self.refresh_mod_list()
-        messagebox.showinfo("Success", f"Enabled {enabled_count} mod(s)")
+        # Keep the current load order, newly enabled mods go after it; mods
+        # with a missing requirement or a conflict are left out one by one
+        resolution, skipped = self.manager.resolve_each(self.enabled_mod_ids(), list(self.mods))
+        result = self.apply_mod_set(resolution.order, "Enable All Mods")
+        message = f"Enabled {len(result.added)} mod(s)"
+        if skipped:
+            details = "\n".join(f"• {self.mods[m]['name']}: {problems[0]}" for m, problems in skipped[:10])
+            more = f"\n… and {len(skipped) - 10} more" if len(skipped) > 10 else ""
+            message += f"\n\n{len(skipped)} mod(s) skipped:\n{details}{more}"
+        messagebox.showinfo("Success", message)
     
     def disable_all_mods(self):
         """Disable all installed mods"""
@@ -2784,17 +2871,8 @@ FullMemoryDump = 0
         if not confirm:
             return
         
-        disabled_count = 0
-        for mod_id, mod in self.mods.items():
-            if mod['enabled']:
-                try:
-                    self.disable_mod(mod_id)
-                    disabled_count += 1
-                except Exception as e:
-                    print(f"Failed to disable {mod['name']}: {e}")
-        
-        self.refresh_mod_list()
-        messagebox.showinfo("Success", f"Disabled {disabled_count} mod(s)")
+        result = self.apply_mod_set([], "Disable All Mods")
+        messagebox.showinfo("Success", f"Disabled {len(result.removed)} mod(s)")
     
     def open_profiles(self):
         """Open mod profiles manager"""
@@ -2840,19 +2918,12 @@ FullMemoryDump = 0
         scrollbar.config(command=profiles_listbox.yview)
         
         # Load profiles
-        profiles_file = Path("profiles.json")
-        profiles = {}
-        if profiles_file.exists():
-            try:
-                with open(profiles_file, 'r') as f:
-                    profiles = json.load(f)
-            except:
-                pass
+        profiles = self.manager.profiles
         
         def refresh_profiles_list():
             profiles_listbox.delete(0, tk.END)
-            for profile_name in profiles.keys():
-                enabled_count = len([m for m in profiles[profile_name] if m in self.mods])
+            for profile_name in profiles.names():
+                enabled_count = len([m for m in profiles.get(profile_name) if m in self.mods])
                 profiles_listbox.insert(tk.END, f"{profile_name} ({enabled_count} mods)")
         
         refresh_profiles_list()
@@ -2864,12 +2935,8 @@ FullMemoryDump = 0
         def save_profile():
             profile_name = tk.simpledialog.askstring("Save Profile", "Enter profile name:", parent=profiles_window)
             if profile_name:
-                # Save list of enabled mod IDs
-                enabled_mods = [mod_id for mod_id, mod in self.mods.items() if mod['enabled']]
-                profiles[profile_name] = enabled_mods
-                
-                with open(profiles_file, 'w') as f:
-                    json.dump(profiles, f, indent=2)
+                # Save list of enabled mod IDs (in load order)
+                enabled_mods = self.manager.save_profile(profile_name)
                 
                 refresh_profiles_list()
                 messagebox.showinfo("Success", f"Profile '{profile_name}' saved with {len(enabled_mods)} mod(s)")
@@ -2880,32 +2947,31 @@ FullMemoryDump = 0
                 messagebox.showwarning("No Selection", "Please select a profile to load")
                 return
             
-            profile_name = list(profiles.keys())[selection[0]]
-            enabled_mods = profiles[profile_name]
+            profile_name = profiles.names()[selection[0]]
+            enabled_mods = profiles.get(profile_name)
             
             confirm = messagebox.askyesno(
                 "Load Profile",
                 f"Load profile '{profile_name}'?\n\nThis will:\n"
-                f"• Disable all currently enabled mods\n"
+                f"• Disable enabled mods that aren't in this profile\n"
                 f"• Enable {len(enabled_mods)} mod(s) from this profile"
             )
             if not confirm:
                 return
             
-            # Disable all mods first
-            for mod_id in self.mods:
-                if self.mods[mod_id]['enabled']:
-                    self.disable_mod(mod_id)
-            
-            # Enable mods from profile
-            enabled_count = 0
-            for mod_id in enabled_mods:
-                if mod_id in self.mods:
-                    self.enable_mod(mod_id)
-                    enabled_count += 1
+            # Only mods that differ from what is deployed are touched
+            result = self.apply_mod_set(enabled_mods, "Load Profile", resolve=True)
+            if result is None:
+                return
+            # Counts the mods the profile's mods required as well
+            enabled_count = len(self.enabled_mod_ids())
             
-            self.refresh_mod_list()
-            messagebox.showinfo("Success", f"Loaded profile '{profile_name}' ({enabled_count} mods enabled)")
+            messagebox.showinfo(
+                "Success",
+                f"Loaded profile '{profile_name}' ({enabled_count} mods enabled)\n\n"
+                f"{len(result.added)} enabled, {len(result.removed)} disabled, "
+                f"{enabled_count - len(result.added)} already in place"
+            )
             profiles_window.destroy()
         
         def delete_profile():
@@ -2914,12 +2980,10 @@ FullMemoryDump = 0
                 messagebox.showwarning("No Selection", "Please select a profile to delete")
                 return
             
-            profile_name = list(profiles.keys())[selection[0]]
+            profile_name = profiles.names()[selection[0]]
             confirm = messagebox.askyesno("Delete Profile", f"Delete profile '{profile_name}'?")
             if confirm:
-                del profiles[profile_name]
-                with open(profiles_file, 'w') as f:
-                    json.dump(profiles, f, indent=2)
+                profiles.delete(profile_name)
                 refresh_profiles_list()
                 messagebox.showinfo("Success", f"Profile '{profile_name}' deleted")
         
@@ -3231,8 +3295,19 @@ bUseVSync=False
 
 
 def main():
+    # A command or an option runs the command-line interface instead of the GUI
+    from brickadia_mods.cli import main as cli_main, wants_cli
+    if wants_cli(sys.argv[1:]):
+        sys.exit(cli_main(sys.argv[1:]))
+    
+    from tkinterdnd2 import TkinterDnD
     root = TkinterDnD.Tk()
     app = BrickadiaModLoader(root)
+    # Archives opened with or dropped on the exe get installed
+    archives = [path for path in sys.argv[1:]
+                if path.lower().endswith(ARCHIVE_EXTENSIONS) and os.path.isfile(path)]
+    if archives:
+        root.after_idle(app.queue_installs, archives)
     root.mainloop()
 
 
@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+EXAMPLES = Path(__file__).resolve().parent.parent / 'examples'
+EXAMPLE_MOD = EXAMPLES / 'example_mod'
@@ -0,0 +1,89 @@
+import os
+import zipfile
+
+import pytest
+
+from brickadia_mods import ArchiveError, ModArchive, find_member, install_archive, safe_relative_path
+from brickadia_mods.archive import ArchiveMember
+
+from conftest import EXAMPLES
+
+
+def make_zip(path, files):
+    with zipfile.ZipFile(path, 'w') as archive:
+        for name, data in files.items():
+            archive.writestr(name, data)
+    return path
+
+
+def members(*names):
+    return [ArchiveMember(name, 1, 0, None) for name in names]
+
+
+def test_listing_skips_folders(tmp_path):
+    path = make_zip(tmp_path / 'mod.zip', {'a/': b'', 'a/b.pak': b'pak', 'c\\d.lua': b'lua'})
+    with ModArchive(path) as archive:
+        assert [(m.name, m.size) for m in archive.members()] == [('a/b.pak', 3), ('c/d.lua', 3)]
+
+
+def test_unsupported_archive(tmp_path):
+    with pytest.raises(ArchiveError):
+        ModArchive(tmp_path / 'mod.7z')
+
+
+def test_extract_members_streams_in_archive_order(tmp_path):
+    path = make_zip(tmp_path / 'mod.zip', {'one.pak': b'1' * 5000, 'two.pak': b'2', 'three.txt': b'3'})
+    done = []
+    with ModArchive(path) as archive:
+        by_name = {m.name: m for m in archive.members()}
+        plan = [(by_name['two.pak'], tmp_path / 'out' / 'two.pak'),
+                (by_name['one.pak'], tmp_path / 'out' / 'one.pak')]
+        written = archive.extract_members(plan, progress=lambda n, total, m: done.append((n, total, m.name)))
+    assert written == [tmp_path / 'out' / 'one.pak', tmp_path / 'out' / 'two.pak']
+    assert done == [(1, 2, 'one.pak'), (2, 2, 'two.pak')]
+    assert (tmp_path / 'out' / 'one.pak').read_bytes() == b'1' * 5000
+    assert sorted(os.listdir(tmp_path / 'out')) == ['one.pak', 'two.pak']
+
+
+@pytest.mark.parametrize('name', ['../evil.lua', '/etc/evil.lua', 'C:/evil.lua', 'a/../../evil.lua', ''])
+def test_unsafe_paths(name):
+    with pytest.raises(ArchiveError):
+        safe_relative_path(name)
+
+
+def test_safe_path():
+    assert safe_relative_path('Scripts\\./main.lua').as_posix() == 'Scripts/main.lua'
+
+
+def test_find_member_prefers_shallowest():
+    found = members('deep/down/icon.png', 'top/icon.png', 'top/other.png')
+    assert find_member(found, 'icon.png').name == 'top/icon.png'
+    assert find_member(found, '*/other.png').name == 'top/other.png'
+    assert find_member(found, 'missing.png') is None
+
+
+def test_install_pak_archive(tmp_path):
+    result = install_archive(EXAMPLES / 'example_mod.zip', tmp_path)
+    (mod_id,) = result.mods
+    mod = result.mods[mod_id]
+    assert mod_id == 'Gmod_P'
+    assert mod['files'] == ['Gmod_P.pak', 'Gmod_P.ucas', 'Gmod_P.utoc']
+    # Only the pak group, modinfo.json and the icon are written, README.txt isn't
+    assert sorted(os.listdir(mod['folder'])) == ['Gmod_P.pak', 'Gmod_P.ucas', 'Gmod_P.utoc', 'icon.png',
+                                                 'modinfo.json']
+    assert 'hashes' not in mod
+
+
+def test_failed_install_leaves_nothing(tmp_path):
+    path = make_zip(tmp_path / 'bad.zip', {'main.lua': b'ok', '../escape.lua': b'bad'})
+    storage = tmp_path / 'mods'
+    with pytest.raises(ArchiveError):
+        install_archive(path, storage)
+    assert os.listdir(storage) == []
+
+
+def test_installing_twice_gets_a_new_folder(tmp_path):
+    first = install_archive(EXAMPLES / 'example_mod.zip', tmp_path)
+    second = install_archive(EXAMPLES / 'example_mod.zip', tmp_path)
+    assert list(first.mods) == ['Gmod_P']
+    assert list(second.mods) == ['Gmod_P_1']
@@ -0,0 +1,138 @@
+import os
+import threading
+import time
+import zipfile
+
+import pytest
+
+from brickadia_mods import BlobStore, DeploymentError, FingerprintCache, install_archive
+from brickadia_mods.deploy import DEPLOY_HARDLINK, deploy_file, deploy_mod
+
+from conftest import EXAMPLES
+
+
+def part_files(folder):
+    return sorted(str(path) for path in folder.rglob('*.part'))
+
+
+def test_ue4ss_install_leaves_no_staging_files(tmp_path):
+    store = BlobStore.for_storage(tmp_path)
+    result = install_archive(EXAMPLES / 'TestUE4SSMod.zip', tmp_path, store=store)
+    (mod,) = result.mods.values()
+    assert mod['icon'].endswith('icon.png')
+    assert mod['files'].count('icon.png') == 1
+    assert part_files(tmp_path) == []
+
+
+def test_linking_a_blob_onto_itself(tmp_path):
+    store = BlobStore(tmp_path / 'store')
+    source = tmp_path / 'a.pak'
+    source.write_bytes(b'pak')
+    sha = store.ingest_file(source)
+    store.link_to(sha, source)
+    assert source.read_bytes() == b'pak'
+    assert part_files(tmp_path) == []
+
+
+def test_deploying_onto_the_same_file(tmp_path):
+    source = tmp_path / 'a.pak'
+    source.write_bytes(b'pak')
+    destination = tmp_path / 'Paks' / 'a.pak'
+    destination.parent.mkdir()
+    os.link(source, destination)
+    deploy_file(source, destination, DEPLOY_HARDLINK)
+    assert os.path.samefile(source, destination)
+    assert part_files(tmp_path) == []
+
+
+def test_member_index_is_checked_against_the_content(tmp_path):
+    store = BlobStore.for_storage(tmp_path / 'mods')
+    install_archive(EXAMPLES / 'TestUE4SSMod.zip', tmp_path / 'mods', store=store)
+    # Point every remembered member at the wrong blob, as a CRC-32 collision would
+    wrong = store.ingest_file(EXAMPLES / 'example_mod' / 'modinfo.json')
+    for key in store._member_index:
+        store._member_index[key] = wrong
+
+    result = install_archive(EXAMPLES / 'TestUE4SSMod.zip', tmp_path / 'mods', store=store)
+    (mod,) = result.mods.values()
+    main = os.path.join(mod['folder'], 'Scripts', 'main.lua')
+    with zipfile.ZipFile(EXAMPLES / 'TestUE4SSMod.zip') as archive:
+        assert open(main, 'rb').read() == archive.read('Scripts\\main.lua')
+
+
+def test_deploy_refuses_a_blob_edited_in_place(tmp_path):
+    store = BlobStore.for_storage(tmp_path / 'mods')
+    result = install_archive(EXAMPLES / 'example_mod.zip', tmp_path / 'mods', store=store)
+    (mod,) = result.mods.values()
+    pak = os.path.join(mod['folder'], mod['files'][0])
+    with open(pak, 'r+b') as f:
+        f.write(b'edited')
+
+    paks = tmp_path / 'Paks'
+    paks.mkdir()
+    with pytest.raises(DeploymentError, match='changed since it was installed'):
+        deploy_mod(mod, paks, DEPLOY_HARDLINK, cache=FingerprintCache(tmp_path / 'fingerprints.json'))
+    assert list(paks.rglob('*.pak')) == []
+
+
+def test_identical_files_are_stored_once(tmp_path):
+    store = BlobStore.for_storage(tmp_path)
+    first = install_archive(EXAMPLES / 'example_mod.zip', tmp_path, store=store)
+    second = install_archive(EXAMPLES / 'example_mod.zip', tmp_path, store=store)
+    (one,) = first.mods.values()
+    (two,) = second.mods.values()
+    assert one['hashes'] == two['hashes']
+    for file_name, sha in one['hashes'].items():
+        blob = store.blob_path(sha)
+        assert os.path.samefile(os.path.join(one['folder'], file_name), blob)
+        assert os.path.samefile(os.path.join(two['folder'], file_name), blob)
+
+
+def test_release_only_deletes_unused_blobs(tmp_path):
+    store = BlobStore(tmp_path / 'store')
+    for name in ('a.pak', 'b.pak'):
+        (tmp_path / name).write_bytes(b'same')
+    sha = store.ingest_file(tmp_path / 'a.pak')
+    assert store.ingest_file(tmp_path / 'b.pak') == sha
+
+    os.remove(tmp_path / 'a.pak')
+    assert store.release([sha]) == 0
+    os.remove(tmp_path / 'b.pak')
+    assert store.release([sha]) == 1
+    assert not store.has(sha)
+
+
+def test_member_index_survives_a_restart(tmp_path):
+    store = BlobStore.for_storage(tmp_path)
+    install_archive(EXAMPLES / 'example_mod.zip', tmp_path, store=store)
+    assert BlobStore.for_storage(tmp_path)._member_index == store._member_index != {}
+
+
+def test_release_waits_for_a_link_in_progress(tmp_path):
+    store = BlobStore.for_storage(tmp_path)
+    result = install_archive(EXAMPLES / 'TestUE4SSMod.zip', tmp_path, store=store)
+    (mod,) = result.mods.values()
+    sha = mod['hashes']['enabled.txt']
+    # The first install's link is gone: the blob is only held by the store
+    os.remove(os.path.join(mod['folder'], 'enabled.txt'))
+
+    linking = threading.Event()
+    real_link_to = store.link_to
+
+    def slow_link_to(blob_sha, destination):
+        if blob_sha == sha:
+            linking.set()
+            time.sleep(0.2)
+        return real_link_to(blob_sha, destination)
+
+    store.link_to = slow_link_to
+    released = []
+    releaser = threading.Thread(target=lambda: (linking.wait(5), released.append(store.release([sha]))))
+    releaser.start()
+    second = install_archive(EXAMPLES / 'TestUE4SSMod.zip', tmp_path, store=store)
+    releaser.join()
+
+    (mod,) = second.mods.values()
+    assert released == [0]
+    assert store.has(sha)
+    assert os.path.samefile(os.path.join(mod['folder'], 'enabled.txt'), store.blob_path(sha))
@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from brickadia_mods.cli import EXIT_FAILED, EXIT_OK, main, wants_cli
+
+from conftest import EXAMPLE_MOD
+
+
+def test_commands_and_options_go_to_the_cli():
+    assert wants_cli(['list', '--json'])
+    assert wants_cli(['--paks', 'Paks', 'enable', 'x'])
+    assert wants_cli(['--help'])
+
+
+def test_archives_and_nothing_go_to_the_gui():
+    assert not wants_cli([])
+    assert not wants_cli(['C:\\Downloads\\Lamps.zip'])
+    assert not wants_cli(['Lamps.rar', 'Cars.zip'])
+
+
+@pytest.fixture
+def run(tmp_path, capsys):
+    paks = tmp_path / 'Brickadia' / 'Content' / 'Paks'
+    paks.mkdir(parents=True)
+    base = ['--config', str(tmp_path / 'config.ini'), '--paks', str(paks), '--storage', str(tmp_path / 'mods')]
+
+    def run(*argv):
+        capsys.readouterr()
+        status = main(base + list(argv))
+        return status, capsys.readouterr().out
+    run.paks = paks
+    return run
+
+
+def installed_ids(run):
+    status, out = run('list', '--json')
+    assert status == EXIT_OK
+    return json.loads(out)
+
+
+def test_install_enable_and_disable(run):
+    status, out = run('install', str(EXAMPLE_MOD.parent / 'example_mod.zip'), '--enable')
+    assert status == EXIT_OK
+    assert 'installed' in out and 'enabled' in out
+    mods = installed_ids(run)
+    (mod_id,) = mods
+    assert mods[mod_id]['enabled']
+    assert list(run.paks.rglob('*.pak'))
+
+    status, out = run('disable', '--all')
+    assert status == EXIT_OK
+    assert f"disabled {mod_id}" in out
+    assert not installed_ids(run)[mod_id]['enabled']
+    assert not list(run.paks.rglob('*.pak'))
+
+
+def test_profiles(run):
+    run('install', str(EXAMPLE_MOD.parent / 'example_mod.zip'), '--enable')
+    assert run('profile', 'save', 'Race')[0] == EXIT_OK
+    run('disable', '--all')
+    status, out = run('profile', 'list')
+    assert out.startswith('Race\t1 mod(s)')
+
+    assert run('profile', 'apply', 'Race')[0] == EXIT_OK
+    assert all(mod['enabled'] for mod in installed_ids(run).values())
+
+
+def test_verify_repairs_missing_files(run):
+    run('install', str(EXAMPLE_MOD.parent / 'example_mod.zip'), '--enable')
+    for path in run.paks.rglob('*.pak'):
+        path.unlink()
+    assert run('verify')[0] == EXIT_FAILED
+    status, out = run('verify', '--repair')
+    assert status == EXIT_OK
+    assert 'OK: 1 mod(s), 1 enabled' in out
+
+
+def test_errors_exit_with_a_message(tmp_path, capsys):
+    config = str(tmp_path / 'config.ini')
+    assert main(['--config', config, '--storage', str(tmp_path / 'mods'), 'list']) == EXIT_FAILED
+    assert "isn't configured" in capsys.readouterr().err
+
+    paks = tmp_path / 'Brickadia' / 'Content' / 'Paks'
+    paks.mkdir(parents=True)
+    argv = ['--config', config, '--paks', str(paks), '--storage', str(tmp_path / 'mods'), 'enable', 'no-such-mod']
+    assert main(argv) == EXIT_FAILED
+    assert capsys.readouterr().err.startswith('brickadia-mods: ')
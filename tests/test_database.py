@@ -0,0 +1,39 @@
+import json
+import os
+
+import pytest
+
+from brickadia_mods import ModDatabase
+
+
+def test_changes_are_written_once(tmp_path):
+    db = ModDatabase(tmp_path / 'mods.json')
+    mods = {'m1': {'name': 'Lamps', 'files': ['Lamps.pak']}}
+    assert not db.flush(mods)
+    for _ in range(10):
+        db.mark_dirty('m1')
+    assert db.flush(mods)
+    assert not db.flush(mods)
+    assert db.writes == 1
+    assert db.load() == mods
+
+
+def test_flush_leaves_no_temporary_files(tmp_path):
+    db = ModDatabase(tmp_path / 'mods.json')
+    db.flush({'m1': {'name': 'Lamps'}}, force=True)
+    assert os.listdir(tmp_path) == ['mods.json']
+
+
+def test_failed_write_keeps_the_old_database(tmp_path):
+    db = ModDatabase(tmp_path / 'mods.json')
+    db.flush({'m1': {'name': 'Lamps'}}, force=True)
+    db.mark_dirty()
+    with pytest.raises(TypeError):
+        db.flush({'m1': {'name': object()}})
+    assert json.loads((tmp_path / 'mods.json').read_text()) == {'m1': {'name': 'Lamps'}}
+    assert os.listdir(tmp_path) == ['mods.json']
+    assert db.dirty
+
+
+def test_missing_database_loads_empty(tmp_path):
+    assert ModDatabase(tmp_path / 'mods.json').load() == {}
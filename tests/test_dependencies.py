@@ -0,0 +1,143 @@
+import pytest
+
+from brickadia_mods import DependencyGraph, Requirement, VersionRange, parse_requirements, parse_version
+
+
+@pytest.mark.parametrize('text, inside, outside', [
+    ('>=1.2', ['1.2', '1.2.1', '2'], ['1.1.9']),
+    ('>=1.0, <2', ['1', '1.9.9'], ['2', '0.9']),
+    ('^1.2', ['1.2', '1.9'], ['2.0', '1.1']),
+    ('^0.3', ['0.3.5'], ['0.4']),
+    ('~1.2', ['1.2.9'], ['1.3', '1.1']),
+    ('1.x', ['1.0', '1.99'], ['2.0']),
+    ('*', ['0.1', '7'], []),
+    ('1.2', ['1.2', '1.2.0'], ['1.2.1']),
+    ('!=1.5', ['1.4'], ['1.5']),
+])
+def test_version_range(text, inside, outside):
+    version_range = VersionRange(text)
+    assert all(version_range.matches(parse_version(v)) for v in inside)
+    assert not any(version_range.matches(parse_version(v)) for v in outside)
+
+
+def test_version_range_unknown_version():
+    assert VersionRange('').matches(None)
+    assert not VersionRange('>=1').matches(None)
+
+
+def test_bad_version_range():
+    with pytest.raises(ValueError):
+        VersionRange('>=banana')
+
+
+def test_parse_requirements():
+    assert [str(r) for r in parse_requirements('core >=1.0')] == ['core >=1.0']
+    assert [r.id for r in parse_requirements(['a', {'id': 'b', 'version': '^2'}, 'c >=oops'])] == ['a', 'b']
+    assert [str(r) for r in parse_requirements({'lib': '~1.2'})] == ['lib ~1.2']
+    assert parse_requirements(42) == []
+    assert Requirement.parse('lib').matches(None)
+
+
+def graph(mods):
+    dependencies = DependencyGraph()
+    for mod_id, mod in mods.items():
+        dependencies.add(mod_id, mod)
+    return dependencies
+
+
+def test_resolve_adds_requirements_before_dependents():
+    mods = {
+        'app': {'version': '1.0', 'requires': ['lib >=2']},
+        'lib1': {'modinfo_id': 'lib', 'version': '1.5'},
+        'lib2': {'modinfo_id': 'lib', 'version': '2.3', 'requires': ['core']},
+        'core': {'version': '1.0'},
+    }
+    resolution = graph(mods).resolve(['app'])
+    assert resolution.ok
+    assert resolution.order == ['core', 'lib2', 'app']
+    assert resolution.added == ['core', 'lib2']
+
+
+def test_resolve_reports_missing_and_wrong_version():
+    mods = {
+        'app': {'requires': ['lib >=2', 'ghost']},
+        'lib': {'version': '1.0'},
+    }
+    resolution = graph(mods).resolve(['app', 'lib'])
+    assert not resolution.ok
+    assert [(mod_id, str(r), found) for mod_id, r, found in resolution.missing] == [
+        ('app', 'lib >=2', 'lib'), ('app', 'ghost', None)]
+
+
+def test_resolve_reports_conflicts():
+    mods = {
+        'a': {'conflicts': ['b <2']},
+        'b': {'version': '1.0'},
+        'c': {'version': '1.0'},
+    }
+    dependencies = graph(mods)
+    resolution = dependencies.resolve(['a', 'b', 'c'])
+    assert [(mod_id, other) for mod_id, other, _r in resolution.incompatible] == [('a', 'b')]
+    assert dependencies.resolve(['a', 'c']).ok
+
+    mods['b']['version'] = '2.0'
+    dependencies.add('b', mods['b'])
+    assert dependencies.resolve(['a', 'b']).ok
+
+
+def test_resolve_checked_ignores_old_problems():
+    mods = {
+        'broken': {'requires': ['ghost']},
+        'new': {},
+    }
+    resolution = graph(mods).resolve(['broken', 'new'], checked=['new'])
+    assert resolution.ok
+
+
+def test_resolve_each_skips_what_cannot_join():
+    mods = {
+        'a': {},
+        'b': {'requires': ['ghost']},
+        'c': {'conflicts': ['a']},
+        'd': {'requires': ['e']},
+        'e': {},
+    }
+    resolution, skipped = graph(mods).resolve_each(['a'], ['b', 'c', 'd'])
+    assert resolution.order == ['a', 'e', 'd']
+    assert resolution.added == ['e', 'd']
+    assert [mod_id for mod_id, _why in skipped] == ['b', 'c']
+    assert skipped[0][1].missing and skipped[1][1].incompatible
+
+
+def test_resolve_each_takes_back_dependencies_of_skipped_mod():
+    mods = {
+        'a': {},
+        'x': {'requires': ['lib'], 'conflicts': ['a']},
+        'lib': {},
+    }
+    resolution, skipped = graph(mods).resolve_each(['a'], ['x'])
+    assert resolution.order == ['a']
+    assert [mod_id for mod_id, _why in skipped] == ['x']
+
+
+def test_remove_forgets_mod():
+    mods = {'app': {'requires': ['lib']}, 'lib': {}}
+    dependencies = graph(mods)
+    dependencies.remove('lib')
+    assert 'lib' not in dependencies
+    assert not dependencies.resolve(['app']).ok
+
+
+def test_resolve_pulls_required_mod_ahead_of_its_dependent():
+    mods = {'a': {}, 'b': {'requires': ['a']}, 'c': {}}
+    resolution = graph(mods).resolve(['b', 'c', 'a'])
+    assert resolution.order == ['a', 'b', 'c']
+    assert resolution.added == []
+
+
+def test_resolve_survives_requirement_cycles():
+    mods = {'a': {'requires': ['b']}, 'b': {'requires': ['c']}, 'c': {'requires': ['a']}}
+    resolution = graph(mods).resolve(['a'])
+    assert resolution.ok
+    assert sorted(resolution.order) == ['a', 'b', 'c']
+    assert resolution.order[-1] == 'a'
@@ -0,0 +1,121 @@
+import os
+
+import pytest
+
+from brickadia_mods.deploy import (
+    DEPLOY_COPY, DEPLOY_HARDLINK, DEPLOY_REFLINK, DEPLOY_SYMLINK, deploy_file, deploy_mod,
+    is_deployed, normalize_game_paths, remove_deployed, undeploy_mod,
+)
+
+
+@pytest.fixture
+def game(tmp_path):
+    paks = tmp_path / 'Brickadia' / 'Content' / 'Paks'
+    paks.mkdir(parents=True)
+    return paks
+
+
+def make_mod(folder, files, **fields):
+    folder.mkdir(parents=True)
+    for name, data in files.items():
+        (folder / name).write_bytes(data)
+    return {'name': folder.name, 'folder': str(folder), 'files': list(files), **fields}
+
+
+def test_hardlink_shares_the_mod_file(tmp_path):
+    source = tmp_path / 'a.pak'
+    source.write_bytes(b'pak')
+    entry = deploy_file(source, tmp_path / 'Paks' / 'a.pak', DEPLOY_HARDLINK)
+    assert entry['method'] == DEPLOY_HARDLINK
+    assert os.path.samefile(source, entry['path'])
+
+
+@pytest.mark.parametrize('strategy', [DEPLOY_COPY, DEPLOY_REFLINK])
+def test_copies_are_separate_files(tmp_path, strategy):
+    source = tmp_path / 'a.pak'
+    source.write_bytes(b'pak')
+    entry = deploy_file(source, tmp_path / 'Paks' / 'a.pak', strategy)
+    assert entry['method'] in (DEPLOY_COPY, DEPLOY_REFLINK)
+    assert not os.path.samefile(source, entry['path'])
+    assert open(entry['path'], 'rb').read() == b'pak'
+
+
+def test_symlink_points_at_the_mod_file(tmp_path):
+    source = tmp_path / 'a.pak'
+    source.write_bytes(b'pak')
+    try:
+        entry = deploy_file(source, tmp_path / 'Paks' / 'a.pak', DEPLOY_SYMLINK)
+    except OSError:
+        pytest.skip("symlinks not available")
+    if entry['method'] != DEPLOY_SYMLINK:
+        pytest.skip("symlinks not available")
+    assert os.readlink(entry['path']) == str(source)
+
+
+def test_deploy_replaces_an_existing_file(tmp_path):
+    source = tmp_path / 'a.pak'
+    source.write_bytes(b'new')
+    destination = tmp_path / 'Paks' / 'a.pak'
+    destination.parent.mkdir()
+    destination.write_bytes(b'old')
+    deploy_file(source, destination, DEPLOY_COPY)
+    assert destination.read_bytes() == b'new'
+    assert os.listdir(destination.parent) == ['a.pak']
+
+
+def test_old_game_paths_are_copies():
+    assert normalize_game_paths(['a.pak', {'path': 'b.pak', 'method': DEPLOY_HARDLINK}]) == [
+        {'path': 'a.pak', 'method': DEPLOY_COPY},
+        {'path': 'b.pak', 'method': DEPLOY_HARDLINK},
+    ]
+
+
+def test_removing_a_hardlink_leaves_the_mod_file(tmp_path):
+    source = tmp_path / 'a.pak'
+    source.write_bytes(b'pak')
+    entry = deploy_file(source, tmp_path / 'Paks' / 'a.pak', DEPLOY_HARDLINK)
+    assert remove_deployed(entry, source)
+    assert not os.path.exists(entry['path'])
+    assert source.read_bytes() == b'pak'
+
+
+def test_a_replaced_hardlink_is_left_alone(tmp_path):
+    source = tmp_path / 'a.pak'
+    source.write_bytes(b'pak')
+    entry = deploy_file(source, tmp_path / 'Paks' / 'a.pak', DEPLOY_HARDLINK)
+    os.remove(entry['path'])
+    with open(entry['path'], 'wb') as f:
+        f.write(b'someone else')
+    assert not remove_deployed(entry, source)
+    assert os.path.exists(entry['path'])
+
+
+def test_deploy_and_undeploy_a_pak_mod(tmp_path, game):
+    mod = make_mod(tmp_path / 'mods' / 'Cars', {'Cars.pak': b'pak', 'Cars.utoc': b'utoc'}, load_order=3)
+    game_paths = deploy_mod(mod, game, DEPLOY_HARDLINK)
+    assert mod['enabled'] and is_deployed(mod)
+    assert sorted(os.path.basename(entry['path']) for entry in game_paths) == ['Cars.pak', 'Cars.utoc']
+    assert all(entry['method'] == DEPLOY_HARDLINK for entry in game_paths)
+    target = os.path.dirname(game_paths[0]['path'])
+    assert os.path.basename(target) == '00000003_Cars'
+
+    undeploy_mod(mod, game)
+    assert not mod['enabled'] and 'game_paths' not in mod
+    assert not os.path.exists(target)
+    assert (tmp_path / 'mods' / 'Cars' / 'Cars.pak').read_bytes() == b'pak'
+
+
+def test_failed_deploy_takes_placed_files_out_again(tmp_path, game):
+    mod = make_mod(tmp_path / 'mods' / 'Cars', {'a.pak': b'a', 'b.pak': b'b'}, load_order=1)
+    calls = []
+
+    class FailingTxn:
+        def placing(self, source, destination, existed):
+            calls.append(destination)
+            if len(calls) == 2:
+                raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        deploy_mod(mod, game, DEPLOY_COPY, txn=FailingTxn())
+    assert not os.path.exists(calls[0])
+    assert not mod.get('enabled')
@@ -0,0 +1,85 @@
+from brickadia_mods import DuplicateIndex, FingerprintCache, ModRecord, find_duplicates, find_identical_files
+from brickadia_mods.fingerprint import PARTIAL_HASH_BYTES
+
+
+def record(name, files, hashes=None):
+    return ModRecord.from_dict({'name': name, 'folder': f'/store/{name}', 'files': files, 'hashes': hashes})
+
+
+def pairs(index):
+    return {(entry['type'], frozenset((entry['mod1'], entry['mod2']))) for entry in index.duplicates()}
+
+
+def library():
+    return {
+        'm1': record('Lamps', ['Lamps.pak', 'readme.txt'], {'Lamps.pak': 'aa'}),
+        'm2': record('lamps', ['Other.pak', 'readme.txt']),
+        'm3': record('Cars', ['LAMPS.pak']),
+        'm4': record('Cars Renamed', ['CarsCopy.pak'], {'CarsCopy.pak': 'aa'}),
+        'm5': record('Benches', ['Benches.pak']),
+    }
+
+
+def test_same_entries_as_find_duplicates():
+    mods = library()
+    index = DuplicateIndex(mods)
+    found = index.duplicates()
+    assert [entry for entry in found if entry['type'] != 'hash'] == find_duplicates(mods)
+    assert {'type': 'hash', 'mod1': 'm1', 'mod2': 'm4', 'file': 'CarsCopy.pak'} in found
+    assert index.conflict_count == 4
+    assert not index.is_duplicate('m5')
+
+
+def test_add_and_remove_keep_the_counts():
+    mods = library()
+    index = DuplicateIndex()
+    for mod_id, mod in mods.items():
+        index.add(mod_id, mod)
+    index.remove('m1')
+    assert 'm1' not in index
+    assert index.duplicates() == []
+    assert index.conflict_count == 0
+
+    index.add('m1', mods['m1'])
+    index.add('m1', mods['m1'])  # Reindexing the same mod changes nothing
+    assert index.conflict_count == 4
+    assert pairs(index) == pairs(DuplicateIndex(mods))
+
+    index.add('m5', record('Lamps Again', ['lamps.PAK']))
+    assert index.is_duplicate('m5')
+    index.remove('m5')
+    assert not index.is_duplicate('m5')
+    assert index.conflict_count == 4
+
+
+def installed(folder, files, hashes=None):
+    folder.mkdir(parents=True)
+    for name, data in files.items():
+        (folder / name).write_bytes(data)
+    return ModRecord.from_dict({'name': folder.name, 'folder': str(folder), 'files': list(files), 'hashes': hashes})
+
+
+def test_identical_files_under_other_names(tmp_path):
+    big = b'x' * (3 * PARTIAL_HASH_BYTES)
+    middle = b'x' * PARTIAL_HASH_BYTES + b'y' + b'x' * (2 * PARTIAL_HASH_BYTES - 1)
+    mods = {
+        'm1': installed(tmp_path / 'Lamps', {'Lamps.pak': b'pak', 'Big.pak': big, 'readme.txt': b'hi'}),
+        'm2': installed(tmp_path / 'Copy', {'Copy.pak': b'pak', 'readme.md': b'hi'}),
+        'm3': installed(tmp_path / 'Other', {'Other.pak': middle, 'Small.pak': b'pa'}),
+    }
+    cache = FingerprintCache(tmp_path / 'fp.json')
+    assert find_identical_files(mods, cache) == [{'type': 'hash', 'mod1': 'm1', 'mod2': 'm2', 'file': 'Copy.pak'}]
+    # Big.pak and Other.pak only differ in the middle, so they needed a full hash
+    assert cache.known_hash(tmp_path / 'Other' / 'Other.pak') is not None
+    assert cache.known_hash(tmp_path / 'Lamps' / 'Lamps.pak') is None
+    assert str(tmp_path / 'Other' / 'Small.pak') not in cache._entries
+
+
+def test_recorded_hashes_are_not_read_again(tmp_path):
+    mods = {
+        'm1': installed(tmp_path / 'Lamps', {'Lamps.pak': b'one'}, {'Lamps.pak': 'aa'}),
+        'm2': installed(tmp_path / 'Copy', {'Copy.pak': b'two'}, {'Copy.pak': 'aa'}),
+    }
+    cache = FingerprintCache(tmp_path / 'fp.json')
+    assert find_identical_files(mods, cache) == [{'type': 'hash', 'mod1': 'm1', 'mod2': 'm2', 'file': 'Copy.pak'}]
+    assert cache._entries == {}
@@ -0,0 +1,84 @@
+import os
+
+from brickadia_mods import FingerprintCache, hash_file
+from brickadia_mods.deploy import DEPLOY_COPY, deploy_file
+from brickadia_mods.fingerprint import PARTIAL_HASH_BYTES, partial_hash_file
+
+
+def rewrite(path, data):
+    """Change a file's bytes and make sure its mtime moves too"""
+    mtime = os.stat(path).st_mtime_ns
+    path.write_bytes(data)
+    os.utime(path, ns=(mtime + 10**9, mtime + 10**9))
+
+
+def test_hash_is_reused_while_the_file_is_unchanged(tmp_path):
+    path = tmp_path / 'a.pak'
+    path.write_bytes(b'pak')
+    cache = FingerprintCache(tmp_path / 'fp.json')
+    cache.remember(path, 'recorded')
+    assert cache.hash(path) == 'recorded'
+    assert cache.known_hash(path) == 'recorded'
+
+    rewrite(path, b'new')
+    assert cache.known_hash(path) is None
+    assert cache.hash(path) == hash_file(path)
+
+
+def test_cache_survives_a_restart(tmp_path):
+    path = tmp_path / 'a.pak'
+    path.write_bytes(b'pak')
+    (tmp_path / 'gone.pak').write_bytes(b'gone')
+    cache = FingerprintCache(tmp_path / 'fp.json')
+    sha = cache.hash(path)
+    cache.hash(tmp_path / 'gone.pak')
+    os.remove(tmp_path / 'gone.pak')
+    cache.save()
+
+    reloaded = FingerprintCache(tmp_path / 'fp.json')
+    assert reloaded.known_hash(path) == sha
+    assert reloaded._entries.keys() == {os.path.abspath(path)}
+
+
+def test_same_content(tmp_path):
+    a, b, c = tmp_path / 'a', tmp_path / 'b', tmp_path / 'c'
+    a.write_bytes(b'same')
+    b.write_bytes(b'same')
+    c.write_bytes(b'diff')
+    cache = FingerprintCache(tmp_path / 'fp.json')
+    assert cache.same_content(a, b)
+    assert not cache.same_content(a, c)
+    assert not cache.same_content(a, tmp_path / 'missing')
+
+
+def test_partial_hash_only_reads_the_ends(tmp_path):
+    size = 4 * PARTIAL_HASH_BYTES
+    a, b = tmp_path / 'a', tmp_path / 'b'
+    a.write_bytes(b'x' * size)
+    b.write_bytes(b'x' * (size // 2) + b'y' + b'x' * (size // 2 - 1))
+    assert partial_hash_file(a, size) == partial_hash_file(b, size)
+    assert FingerprintCache(tmp_path / 'fp.json').partial_hash(a) == partial_hash_file(a, size)
+
+
+def test_unchanged_destination_is_not_copied_again(tmp_path):
+    source = tmp_path / 'a.pak'
+    source.write_bytes(b'pak')
+    destination = tmp_path / 'Paks' / 'a.pak'
+    cache = FingerprintCache(tmp_path / 'fp.json')
+    deploy_file(source, destination, DEPLOY_COPY, cache)
+    inode = os.stat(destination).st_ino
+    deploy_file(source, destination, DEPLOY_COPY, cache)
+    assert os.stat(destination).st_ino == inode
+
+
+def test_redeploy_after_the_mod_file_changed(tmp_path):
+    source = tmp_path / 'a.pak'
+    source.write_bytes(b'old')
+    destination = tmp_path / 'Paks' / 'a.pak'
+    cache = FingerprintCache(tmp_path / 'fp.json')
+    cache.remember(source, hash_file(source))  # As an install records it
+    deploy_file(source, destination, DEPLOY_COPY, cache)
+
+    rewrite(source, b'new')
+    deploy_file(source, destination, DEPLOY_COPY, cache)
+    assert destination.read_bytes() == b'new'
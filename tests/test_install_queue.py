@@ -0,0 +1,38 @@
+import time
+
+from brickadia_mods import EVENT_FAILED, EVENT_FINISHED, EVENT_PROGRESS, EVENT_STARTED, BlobStore, InstallQueue
+
+from conftest import EXAMPLES
+
+
+def drain(install_queue, timeout=30):
+    events = []
+    deadline = time.monotonic() + timeout
+    while install_queue.busy and time.monotonic() < deadline:
+        time.sleep(0.01)
+    events += install_queue.poll()
+    return events
+
+
+def test_installs_in_the_background(tmp_path):
+    bad = tmp_path / 'bad.zip'
+    bad.write_bytes(b'not a zip')
+    archives = [EXAMPLES / 'example_mod.zip'] * 3 + [bad]
+    install_queue = InstallQueue(max_workers=4)
+    try:
+        install_queue.submit(archives, tmp_path / 'mods', BlobStore.for_storage(tmp_path / 'mods'))
+        events = drain(install_queue)
+    finally:
+        install_queue.shutdown()
+
+    kinds = [event.kind for event in events]
+    assert kinds.count(EVENT_STARTED) == 4
+    assert EVENT_PROGRESS in kinds
+    finished = [event for event in events if event.kind == EVENT_FINISHED]
+    failed = [event for event in events if event.kind == EVENT_FAILED]
+    assert len(finished) == 3
+    assert [event.archive_path for event in failed] == [bad]
+    # Concurrent installs of the same archive never share a folder
+    folders = {mod['folder'] for event in finished for mod in event.result.mods.values()}
+    assert len(folders) == 3
+    assert not install_queue.busy
@@ -0,0 +1,34 @@
+import pytest
+
+from brickadia_mods import UTOC_MAGIC, PakError, read_utoc
+from brickadia_mods.conflicts import read_assets
+
+from conftest import EXAMPLE_MOD
+
+
+def test_example_toc():
+    toc = read_utoc(EXAMPLE_MOD / 'Gmod_P.utoc')
+    assert toc.mount_point == '../../../Brickadia/Content/Tools/Placer/'
+    assert [name for _chunk, name in toc.chunks] == [
+        'Skeleton_Placer.uasset', 'T_Placer.uasset', 'SK_Placer.uasset',
+    ]
+
+
+def test_example_assets():
+    assets = read_assets(EXAMPLE_MOD / 'Gmod_P.utoc')
+    assert sorted(assets) == sorted(f'Brickadia/Content/Tools/Placer/{name}' for name in (
+        'Skeleton_Placer.uasset', 'T_Placer.uasset', 'SK_Placer.uasset'))
+
+
+def test_not_a_toc(tmp_path):
+    path = tmp_path / 'bad.utoc'
+    path.write_bytes(b'\0' * 256)
+    with pytest.raises(PakError):
+        read_utoc(path)
+
+
+def test_truncated_toc(tmp_path):
+    path = tmp_path / 'short.utoc'
+    path.write_bytes((EXAMPLE_MOD / 'Gmod_P.utoc').read_bytes()[:len(UTOC_MAGIC) + 40])
+    with pytest.raises(PakError):
+        read_utoc(path)
@@ -0,0 +1,192 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from brickadia_mods import ACTION_DEPLOY, ACTION_UNDEPLOY, DeploymentJournal, deploy
+from brickadia_mods.deploy import DEPLOY_COPY, deploy_mod, deploy_target, mods_folder
+
+FILES = ['a.pak', 'a.ucas', 'a.utoc', 'a.sig']
+
+
+@pytest.fixture
+def setup(tmp_path):
+    paks = tmp_path / 'Brickadia' / 'Content' / 'Paks'
+    paks.mkdir(parents=True)
+    folder = tmp_path / 'store' / 'mod'
+    folder.mkdir(parents=True)
+    for name in FILES:
+        (folder / name).write_text(name)
+    mod = {'name': 'Mod', 'folder': str(folder), 'files': list(FILES), 'enabled': False, 'load_order': 1024}
+    journal = DeploymentJournal(tmp_path / 'deploy_journal.jsonl')
+    return paks, mod, journal
+
+
+def deployed_files(paks):
+    return sorted(name for _root, _dirs, names in os.walk(paks) for name in names)
+
+
+def test_abort_removes_placed_files(setup, monkeypatch):
+    paks, mod, journal = setup
+    real = deploy.deploy_file
+    calls = []
+
+    def failing(*args):
+        calls.append(args)
+        if len(calls) == 3:
+            raise KeyboardInterrupt
+        return real(*args)
+
+    monkeypatch.setattr(deploy, 'deploy_file', failing)
+    with pytest.raises(KeyboardInterrupt):
+        with journal.transaction('mod', ACTION_DEPLOY) as txn:
+            deploy_mod(mod, paks, DEPLOY_COPY, txn)
+
+    assert deployed_files(paks) == []
+    assert os.listdir(mods_folder(paks)) == []
+    assert not mod['enabled']
+    assert [txn['state'] for txn in journal.pending()] == ['abort']
+
+
+def test_recover_rolls_back_unfinished_deploy(setup):
+    paks, mod, journal = setup
+    # Crash after placing the files, before the transaction ended
+    txn = journal.transaction('mod', ACTION_DEPLOY).__enter__()
+    target = deploy_target(mod, paks)
+    target.mkdir(parents=True)
+    for name in FILES:
+        txn.placing(os.path.join(mod['folder'], name), target / name)
+        deploy.deploy_file(os.path.join(mod['folder'], name), target / name, DEPLOY_COPY)
+
+    mods = {'mod': mod}
+    assert DeploymentJournal(journal.path).recover(mods, paks) == ['mod']
+    assert deployed_files(paks) == []
+    assert os.listdir(mods_folder(paks)) == []
+    assert not mod['enabled']
+
+
+def test_recover_rolls_finished_deploy_forward(setup):
+    paks, mod, journal = setup
+    with journal.transaction('mod', ACTION_DEPLOY) as txn:
+        deploy_mod(mod, paks, DEPLOY_COPY, txn)
+    game_paths = mod['game_paths']
+
+    # Crash before mods.json was saved: the record still says disabled
+    stale = dict(mod, enabled=False)
+    del stale['game_paths']
+    assert DeploymentJournal(journal.path).recover({'mod': stale}, paks) == ['mod']
+    assert stale['enabled']
+    assert [entry['path'] for entry in stale['game_paths']] == [entry['path'] for entry in game_paths]
+    assert deployed_files(paks) == sorted(FILES)
+
+
+def test_recover_rolls_back_deploy_with_missing_files(setup):
+    paks, mod, journal = setup
+    with journal.transaction('mod', ACTION_DEPLOY) as txn:
+        deploy_mod(mod, paks, DEPLOY_COPY, txn)
+    os.remove(mod['game_paths'][0]['path'])
+
+    stale = dict(mod, enabled=False)
+    del stale['game_paths']
+    DeploymentJournal(journal.path).recover({'mod': stale}, paks)
+    assert not stale['enabled']
+    assert deployed_files(paks) == []
+
+
+def test_recover_finishes_undeploy(setup):
+    paks, mod, journal = setup
+    deploy_mod(mod, paks, DEPLOY_COPY)
+    journal.transaction('mod', ACTION_UNDEPLOY).__enter__()
+
+    DeploymentJournal(journal.path).recover({'mod': mod}, paks)
+    assert not mod['enabled']
+    assert deployed_files(paks) == []
+
+
+def test_checkpoint_empties_journal(setup):
+    paks, mod, journal = setup
+    with journal.transaction('mod', ACTION_DEPLOY) as txn:
+        deploy_mod(mod, paks, DEPLOY_COPY, txn)
+    journal.checkpoint()
+    assert not journal.path.exists()
+    assert DeploymentJournal(journal.path).pending() == []
+
+
+def test_recover_keeps_redeploy_after_finished_undeploy(setup):
+    paks, mod, journal = setup
+    deploy_mod(mod, paks, DEPLOY_COPY)
+    saved = dict(mod, game_paths=list(mod['game_paths']))
+    os.remove(mod['game_paths'][0]['path'])
+
+    # Repairing the mod: undeploy, then deploy again, then crash before saving
+    with journal.transaction('mod', ACTION_UNDEPLOY):
+        deploy.undeploy_mod(mod, paks)
+    with journal.transaction('mod', ACTION_DEPLOY) as txn:
+        deploy_mod(mod, paks, DEPLOY_COPY, txn)
+
+    DeploymentJournal(journal.path).recover({'mod': saved}, paks)
+    assert saved['enabled']
+    assert deployed_files(paks) == sorted(FILES)
+
+
+def test_recover_rolls_back_unfinished_redeploy(setup):
+    paks, mod, journal = setup
+    deploy_mod(mod, paks, DEPLOY_COPY)
+    saved = dict(mod, game_paths=list(mod['game_paths']))
+
+    with journal.transaction('mod', ACTION_UNDEPLOY):
+        deploy.undeploy_mod(mod, paks)
+    txn = journal.transaction('mod', ACTION_DEPLOY).__enter__()
+    target = deploy_target(mod, paks)
+    target.mkdir(parents=True)
+    for name in FILES[:2]:
+        txn.placing(os.path.join(mod['folder'], name), target / name)
+        deploy.deploy_file(os.path.join(mod['folder'], name), target / name, DEPLOY_COPY)
+
+    DeploymentJournal(journal.path).recover({'mod': saved}, paks)
+    assert not saved['enabled']
+    assert deployed_files(paks) == []
+
+
+def test_recover_finished_undeploy_only_updates_record(setup):
+    paks, mod, journal = setup
+    deploy_mod(mod, paks, DEPLOY_COPY)
+    saved = dict(mod, game_paths=list(mod['game_paths']))
+    with journal.transaction('mod', ACTION_UNDEPLOY):
+        deploy.undeploy_mod(mod, paks)
+
+    DeploymentJournal(journal.path).recover({'mod': saved}, paks)
+    assert not saved['enabled']
+    assert 'game_paths' not in saved
+
+
+def test_abort_keeps_files_that_were_there_before(setup, monkeypatch):
+    paks, mod, journal = setup
+    del mod['load_order']  # Legacy record: deployed straight into Paks
+    (paks / 'a.pak').write_text('other')
+    real = deploy.deploy_file
+
+    def failing(source, destination, *args):
+        if Path(destination).name == 'a.utoc':
+            raise OSError('disk full')
+        return real(source, destination, *args)
+
+    monkeypatch.setattr(deploy, 'deploy_file', failing)
+    with pytest.raises(OSError):
+        with journal.transaction('mod', ACTION_DEPLOY) as txn:
+            deploy_mod(mod, paks, DEPLOY_COPY, txn)
+    assert deployed_files(paks) == ['a.pak']
+
+
+def test_recover_keeps_files_that_were_there_before(setup):
+    paks, mod, journal = setup
+    del mod['load_order']
+    (paks / 'a.pak').write_text('other')
+    txn = journal.transaction('mod', ACTION_DEPLOY).__enter__()
+    for name in FILES[:2]:
+        destination = paks / name
+        txn.placing(os.path.join(mod['folder'], name), destination, destination.exists())
+        deploy.deploy_file(os.path.join(mod['folder'], name), destination, DEPLOY_COPY)
+
+    DeploymentJournal(journal.path).recover({'mod': mod}, paks)
+    assert deployed_files(paks) == ['a.pak']
@@ -0,0 +1,54 @@
+from brickadia_mods import LOAD_ORDER_STEP, assign_order_keys, next_order_key, order_sort_key
+
+
+def apply(ordered_ids, keys):
+    keys = dict(keys)
+    keys.update(assign_order_keys(ordered_ids, keys))
+    return keys
+
+
+def test_new_mods_get_spaced_keys():
+    assert assign_order_keys(['a', 'b', 'c'], {}) == {
+        'a': LOAD_ORDER_STEP, 'b': 2 * LOAD_ORDER_STEP, 'c': 3 * LOAD_ORDER_STEP}
+
+
+def test_sorted_order_changes_nothing():
+    assert assign_order_keys(['a', 'b', 'c'], {'a': 5, 'b': 70, 'c': 900}) == {}
+
+
+def test_moving_one_mod_rekeys_only_that_mod():
+    keys = {mod_id: (i + 1) * LOAD_ORDER_STEP for i, mod_id in enumerate('abcdef')}
+    wanted = ['a', 'b', 'f', 'c', 'd', 'e']
+    assert list(assign_order_keys(wanted, keys)) == ['f']
+    new = apply(wanted, keys)
+    assert sorted(wanted, key=new.get) == wanted
+
+
+def test_inserted_run_fits_between_neighbours():
+    changes = assign_order_keys(['a', 'x', 'y', 'b'], {'a': 100, 'b': 400})
+    assert set(changes) == {'x', 'y'}
+    assert 100 < changes['x'] < changes['y'] < 400
+
+
+def test_renumbers_when_there_is_no_gap():
+    changes = assign_order_keys(['a', 'x', 'b'], {'a': 1, 'b': 2})
+    new = apply(['a', 'x', 'b'], {'a': 1, 'b': 2})
+    assert new == {'a': LOAD_ORDER_STEP, 'x': 2 * LOAD_ORDER_STEP, 'b': 3 * LOAD_ORDER_STEP}
+    assert set(changes) == {'a', 'x', 'b'}
+
+
+def test_reversed_order_keeps_one_key():
+    keys = {'a': 1024, 'b': 2048, 'c': 3072}
+    wanted = ['c', 'b', 'a']
+    changes = assign_order_keys(wanted, keys)
+    assert len(changes) == 2
+    new = apply(wanted, keys)
+    assert sorted(wanted, key=new.get) == wanted
+
+
+def test_next_order_key_and_sort_key():
+    mods = {'a': {'enabled': True, 'load_order': 2048}, 'b': {'enabled': False, 'load_order': 9999},
+            'c': {'enabled': True}}
+    assert next_order_key(mods) == 2048 + LOAD_ORDER_STEP
+    assert next_order_key({}) == LOAD_ORDER_STEP
+    assert sorted(mods, key=lambda mod_id: order_sort_key(mods[mod_id])) == ['a', 'b', 'c']
@@ -0,0 +1,54 @@
+import pytest
+
+from brickadia_mods import MOD_TYPE_PAK, MOD_TYPE_UE4SS, ArchiveError, ArchiveManifest
+from brickadia_mods.archive import ArchiveMember
+
+
+def manifest(*names):
+    return ArchiveManifest(ArchiveMember(name, 1, 0, None) for name in names)
+
+
+def test_pak_groups_collect_companions():
+    found = manifest('Mod/Lamps.pak', 'Mod/Lamps.utoc', 'Mod/LAMPS.ucas', 'Mod/Lamps.sig',
+                     'Other/Lamps.ucas', 'Mod/Cars.pak', 'Mod/readme.md')
+    assert found.mod_type == MOD_TYPE_PAK
+    assert [(group.stem, group.file_names) for group in found.pak_groups] == [
+        ('Lamps', ['Lamps.pak', 'LAMPS.ucas', 'Lamps.utoc', 'Lamps.sig']),
+        ('Cars', ['Cars.pak']),
+    ]
+
+
+def test_paks_win_over_ue4ss_files():
+    assert manifest('a.pak', 'Scripts/main.lua').mod_type == MOD_TYPE_PAK
+
+
+@pytest.mark.parametrize('names, subtype', [
+    (['Scripts/main.lua'], 'Lua'),
+    (['Content/BP.uasset', 'dlls/main.dll', 'Scripts/x.lua'], 'Lua/Blueprint/C++'),
+    (['Maps/Level.umap'], 'Blueprint'),
+])
+def test_ue4ss_subtypes(names, subtype):
+    found = manifest(*names)
+    assert found.mod_type == MOD_TYPE_UE4SS
+    assert found.ue4ss_subtype == subtype
+
+
+def test_nothing_installable():
+    found = manifest('readme.txt', 'icon.png')
+    assert found.mod_type is None
+    with pytest.raises(ArchiveError):
+        found.validate()
+
+
+def test_unsafe_ue4ss_paths_are_rejected_up_front():
+    with pytest.raises(ArchiveError):
+        manifest('Scripts/main.lua', '../../evil.dll').validate()
+
+
+def test_modinfo_and_icon():
+    found = manifest('Mod/Deep/modinfo.json', 'Mod/modinfo.json', 'Mod/icon.jpg', 'Mod/Art/logo.png', 'a.pak')
+    assert found.modinfo.name == 'Mod/modinfo.json'
+    assert found.find_icon(None).name == 'Mod/icon.jpg'
+    assert found.find_icon({'icon': 'Art/logo.png'}).name == 'Mod/Art/logo.png'
+    assert found.find_icon({'icon': 'LOGO.PNG'}).name == 'Mod/Art/logo.png'
+    assert found.find_icon({'icon': 'missing.png'}) is None
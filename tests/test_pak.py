@@ -0,0 +1,108 @@
+import struct
+
+import pytest
+
+from brickadia_mods import PAK_MAGIC, PakError, asset_path, read_pak_index
+
+
+def fstring(text):
+    data = text.encode() + b'\0'
+    return struct.pack('<i', len(data)) + data
+
+
+def fstring16(text):
+    data = text.encode('utf-16-le') + b'\0\0'
+    return struct.pack('<i', -(len(data) // 2)) + data
+
+
+def legacy_pak(version, mount_point, names):
+    """Pak with a v1-v9 index (names stored next to their entries)"""
+    payload = b'X' * 1000
+    index = fstring(mount_point) + struct.pack('<i', len(names))
+    for name in names:
+        index += fstring16(name) if not name.isascii() else fstring(name)
+        index += struct.pack('<qqq', 0, 10, 10)
+        index += struct.pack('<I' if version >= 8 else '<i', 1 if version >= 3 else 0)
+        if version < 2:
+            index += b'\0' * 8
+        index += b'\0' * 20
+        if version >= 3:
+            index += struct.pack('<i', 2) + b'\0' * 32 + b'\0' + struct.pack('<I', 65536)
+    footer = b''
+    if version >= 7:
+        footer += b'\0' * 16
+    if version >= 4:
+        footer += b'\0'
+    footer += struct.pack('<Iiqq20s', PAK_MAGIC, version, len(payload), len(index), b'\0' * 20)
+    if version == 9:
+        footer += b'\0'
+    if version >= 8:
+        footer += b'\0' * (32 * (4 if version == 8 else 5))
+    return payload + index + footer
+
+
+def modern_pak(version, mount_point, directories, encrypted=False):
+    """Pak with a v10+ index (names in the full directory index)"""
+    payload = b'Y' * 500
+    blob = struct.pack('<i', len(directories))
+    for directory, names in directories.items():
+        blob += fstring(directory) + struct.pack('<i', len(names))
+        blob += b''.join(fstring(name) + struct.pack('<i', 0) for name in names)
+    count = sum(len(names) for names in directories.values())
+    index = fstring(mount_point) + struct.pack('<i', count) + b'\0' * 8 + struct.pack('<i', 0)
+    index += struct.pack('<i', 1) + struct.pack('<qq', len(payload), len(blob)) + b'\0' * 20
+    index += struct.pack('<ii', 0, 0)
+    footer = b'\0' * 16 + (b'\1' if encrypted else b'\0')
+    footer += struct.pack('<Iiqq20s', PAK_MAGIC, version, len(payload) + len(blob), len(index), b'\0' * 20)
+    footer += b'\0' * 160
+    return payload + blob + index + footer
+
+
+@pytest.mark.parametrize('version', range(1, 10))
+def test_legacy_index(tmp_path, version):
+    path = tmp_path / 'mod.pak'
+    path.write_bytes(legacy_pak(version, '../../../Brickadia/', ['Content/A.uasset', 'Content/Ä.uasset']))
+    assert read_pak_index(path) == ('../../../Brickadia/', ['Content/A.uasset', 'Content/Ä.uasset'])
+
+
+@pytest.mark.parametrize('version', [10, 11])
+def test_directory_index(tmp_path, version):
+    path = tmp_path / 'mod.pak'
+    path.write_bytes(modern_pak(version, '../../../', {
+        '/Brickadia/Content/': ['A.uasset', 'A.uexp'],
+        '/Brickadia/Content/Sub/': ['B.uasset'],
+    }))
+    mount_point, paths = read_pak_index(path)
+    assert mount_point == '../../../'
+    assert paths == ['Brickadia/Content/A.uasset', 'Brickadia/Content/A.uexp', 'Brickadia/Content/Sub/B.uasset']
+
+
+def test_encrypted_index(tmp_path):
+    path = tmp_path / 'mod.pak'
+    path.write_bytes(modern_pak(11, '../../../', {'/': ['A.uasset']}, encrypted=True))
+    with pytest.raises(PakError, match='encrypted'):
+        read_pak_index(path)
+
+
+def test_not_a_pak(tmp_path):
+    path = tmp_path / 'mod.pak'
+    path.write_bytes(b'{}' * 200)
+    with pytest.raises(PakError):
+        read_pak_index(path)
+
+
+def test_index_outside_file(tmp_path):
+    data = bytearray(legacy_pak(8, '/', ['A.uasset']))
+    # Point the index offset past the end of the file
+    magic_at = data.rindex(struct.pack('<I', PAK_MAGIC))
+    struct.pack_into('<q', data, magic_at + 8, len(data) * 2)
+    path = tmp_path / 'mod.pak'
+    path.write_bytes(bytes(data))
+    with pytest.raises(PakError, match='outside'):
+        read_pak_index(path)
+
+
+def test_asset_path():
+    assert asset_path('../../../Brickadia/Content/', 'Tools/A.uasset') == 'Brickadia/Content/Tools/A.uasset'
+    assert asset_path('../../../', '/Brickadia/A.uasset') == 'Brickadia/A.uasset'
+    assert asset_path('/', 'Engine\\B.uexp') == 'Engine/B.uexp'
@@ -0,0 +1,79 @@
+import os
+
+import pytest
+
+from brickadia_mods import LOAD_ORDER_STEP, apply_plan, plan_deployment
+from brickadia_mods.deploy import DEPLOY_COPY
+
+
+@pytest.fixture
+def setup(tmp_path):
+    paks = tmp_path / 'Brickadia' / 'Content' / 'Paks'
+    paks.mkdir(parents=True)
+    mods = {}
+    for mod_id in 'abcd':
+        folder = tmp_path / 'store' / mod_id
+        folder.mkdir(parents=True)
+        (folder / f'{mod_id}.pak').write_text(mod_id)
+        mods[mod_id] = {'name': mod_id.upper(), 'folder': str(folder), 'files': [f'{mod_id}.pak'],
+                        'enabled': False}
+    return paks, mods
+
+
+def enabled(mods):
+    return sorted((mod_id for mod_id, mod in mods.items() if mod['enabled']),
+                  key=lambda mod_id: mods[mod_id]['load_order'])
+
+
+def test_plan_from_nothing(setup):
+    _paks, mods = setup
+    plan = plan_deployment(mods, ['b', 'a', 'zzz', 'b'])
+    assert plan.to_add == ['b', 'a']
+    assert plan.to_remove == []
+    assert plan.unknown == ['zzz']
+    assert plan.order == ['b', 'a']
+    assert plan.load_order == {'b': LOAD_ORDER_STEP, 'a': 2 * LOAD_ORDER_STEP}
+
+
+def test_applied_plan_leaves_nothing_to_do(setup):
+    paks, mods = setup
+    result = apply_plan(plan_deployment(mods, ['a', 'b', 'c']), mods, paks, DEPLOY_COPY)
+    assert result.failed == []
+    assert sorted(result.added) == ['a', 'b', 'c']
+    assert enabled(mods) == ['a', 'b', 'c']
+    assert plan_deployment(mods, ['a', 'b', 'c']).empty
+
+
+def test_switching_sets_only_touches_the_difference(setup):
+    paks, mods = setup
+    apply_plan(plan_deployment(mods, ['a', 'b', 'c']), mods, paks, DEPLOY_COPY)
+    plan = plan_deployment(mods, ['a', 'c', 'd'])
+    assert plan.to_remove == ['b']
+    assert plan.to_add == ['d']
+    assert list(plan.load_order) == ['d']
+
+    result = apply_plan(plan, mods, paks, DEPLOY_COPY)
+    assert result.removed == ['b'] and result.added == ['d']
+    assert enabled(mods) == ['a', 'c', 'd']
+
+
+def test_reorder_moves_one_mod(setup):
+    paks, mods = setup
+    apply_plan(plan_deployment(mods, ['a', 'b', 'c', 'd']), mods, paks, DEPLOY_COPY)
+    plan = plan_deployment(mods, ['a', 'd', 'b', 'c'])
+    assert plan.to_add == [] and plan.to_remove == []
+    assert list(plan.load_order) == ['d']
+
+    result = apply_plan(plan, mods, paks, DEPLOY_COPY)
+    assert result.reordered == ['d']
+    assert enabled(mods) == ['a', 'd', 'b', 'c']
+    assert plan_deployment(mods, ['a', 'd', 'b', 'c']).empty
+
+
+def test_missing_files_are_redeployed(setup):
+    paks, mods = setup
+    apply_plan(plan_deployment(mods, ['a', 'b']), mods, paks, DEPLOY_COPY)
+    os.remove(mods['a']['game_paths'][0]['path'])
+    plan = plan_deployment(mods, ['a', 'b'])
+    assert plan.to_add == ['a']
+    assert plan.load_order == {}
@@ -0,0 +1,73 @@
+import json
+import os
+
+from brickadia_mods import ModRecord, ModType
+from brickadia_mods.record import encode_record, records_from_dicts
+
+BASE = os.path.join(os.sep, 'storage')
+
+
+def entry(**fields):
+    mod = {
+        'name': 'Lamps',
+        'folder': os.path.join(BASE, 'm1'),
+        'files': ['Lamps.pak'],
+        'enabled': True,
+        'mod_type': 'PAK',
+        'icon': os.path.join(BASE, 'm1', 'icon.png'),
+    }
+    mod.update(fields)
+    return mod
+
+
+def test_round_trip():
+    data = entry(hashes={'Lamps.pak': 'aa'}, load_order=1024)
+    record = ModRecord.from_dict(data, BASE)
+    assert record.to_dict() == data
+    assert list(record.to_dict()) == list(data)
+    assert record == data
+    assert json.loads(json.dumps(record, default=encode_record)) == data
+
+
+def test_paths_under_the_storage_folder_are_relative():
+    record = ModRecord.from_dict(entry(), BASE)
+    assert record._folder == 'm1'
+    assert record['folder'] == os.path.join(BASE, 'm1')
+    assert record['icon'] == os.path.join(BASE, 'm1', 'icon.png')
+
+    elsewhere = os.path.join(os.sep, 'other', 'm1')
+    record['folder'] = elsewhere
+    assert record['folder'] == elsewhere
+    assert record['icon'] == os.path.join(BASE, 'm1', 'icon.png')
+
+
+def test_behaves_like_the_dict():
+    record = ModRecord.from_dict(entry(), BASE)
+    assert record['mod_type'] == 'PAK' and record['mod_type'] is ModType.PAK
+    assert record.files == ('Lamps.pak',)
+    assert 'load_order' not in record
+    assert record.get('load_order') is None
+    assert record.pop('load_order', 5) == 5
+
+    record['load_order'] = 7
+    assert record['load_order'] == 7
+    del record['load_order']
+    assert 'load_order' not in record
+    assert record.to_dict() == entry()
+
+
+def test_unknown_keys_are_kept():
+    data = entry(mod_type='Lua', rating=5)
+    record = ModRecord.from_dict(data, BASE)
+    assert record['rating'] == 5
+    assert record['mod_type'] == 'Lua'
+    assert record.to_dict() == data
+    del record['rating']
+    assert 'rating' not in record
+    assert len(record) == len(entry())
+
+
+def test_records_from_dicts():
+    records = records_from_dicts({'m1': entry(), 'm2': entry(name='Cars')}, BASE)
+    assert [record['name'] for record in records.values()] == ['Lamps', 'Cars']
+    assert all(isinstance(record, ModRecord) for record in records.values())
@@ -0,0 +1,53 @@
+from brickadia_mods import SearchIndex, normalize
+
+
+def mod(name, author='', description=''):
+    return {'name': name, 'author': author, 'description': description}
+
+
+def index():
+    return SearchIndex({
+        'desc': mod('Street Pack', description='adds lamps to every road'),
+        'word': mod('Big Lamps'),
+        'author': mod('Signs', author='Lampsmith'),
+        'prefix': mod('Lamps Deluxe'),
+        'inside': mod('Flamps'),
+        'exact': mod('Lamps'),
+    })
+
+
+def test_normalize():
+    assert normalize('Café LAMPS') == 'cafe lamps'
+
+
+def test_results_are_ranked():
+    assert index().search('lamps') == ['exact', 'prefix', 'word', 'inside', 'author', 'desc']
+
+
+def test_empty_query_lists_everything_in_order():
+    assert index().search('  ') == ['desc', 'word', 'author', 'prefix', 'inside', 'exact']
+
+
+def test_short_queries_and_accents():
+    search = SearchIndex({'a': mod('Ré Pack'), 'b': mod('Other')})
+    assert search.search('re') == ['a']
+    assert search.search('RÉ P') == ['a']
+
+
+def test_typos_are_forgiven_when_nothing_matches():
+    search = SearchIndex({'car': mod('Racing Cars'), 'lamp': mod('Street Lamps')})
+    assert search.search('racng') == ['car']
+    assert search.search('stret lampz') == ['lamp']
+    assert search.search('zzzzzz') == []
+
+
+def test_add_and_remove():
+    search = index()
+    search.add('exact', mod('Benches'))
+    assert 'exact' not in search.search('lamps')
+    assert search.search('benches') == ['exact']
+    search.remove('exact')
+    assert 'exact' not in search
+    assert len(search) == 5
+    assert search.search('benches') == []
+    assert search._word_grams.get(' be') is None
@@ -0,0 +1,65 @@
+from brickadia_mods import LoadRules, solve_load_order
+
+
+def test_sorted_order_stays_put():
+    rules = {'b': LoadRules(load_after=['a']), 'c': LoadRules(load_after=['b'])}
+    solution = solve_load_order(['a', 'b', 'c'], rules)
+    assert solution.order == ['a', 'b', 'c']
+    assert solution.cycles == [] and solution.missing == []
+
+
+def test_only_constrained_mod_moves():
+    rules = {'c': LoadRules(load_before=['a'])}
+    assert solve_load_order(['a', 'b', 'c'], rules).order == ['c', 'a', 'b']
+
+
+def test_load_after_pulls_predecessor_forward():
+    rules = {'b': LoadRules(load_after=['d'])}
+    assert solve_load_order(['a', 'b', 'c', 'd'], rules).order == ['a', 'd', 'b', 'c']
+
+
+def test_sorting_twice_moves_nothing():
+    rules = {'e': LoadRules(load_before=['b']), 'a': LoadRules(load_after=['d'])}
+    first = solve_load_order(list('abcde'), rules).order
+    assert solve_load_order(first, rules).order == first
+
+
+def test_cycle_is_reported_and_broken():
+    rules = {
+        'a': LoadRules(load_after=['c']),
+        'b': LoadRules(load_after=['a']),
+        'c': LoadRules(load_after=['b']),
+    }
+    solution = solve_load_order(['a', 'b', 'c', 'd'], rules)
+    assert sorted(solution.order) == ['a', 'b', 'c', 'd']
+    assert len(solution.cycles) == 1
+    assert sorted(solution.cycles[0]) == ['a', 'b', 'c']
+    assert solution.cycles[0][0] == 'a'
+
+
+def test_two_mod_cycle():
+    rules = {'a': LoadRules(load_before=['b']), 'b': LoadRules(load_before=['a'])}
+    solution = solve_load_order(['a', 'b'], rules)
+    assert sorted(solution.order) == ['a', 'b']
+    assert solution.cycles == [['a', 'b']]
+
+
+def test_missing_and_aliased_names():
+    rules = {'x': LoadRules(load_after=['Nope', 'Fancy Lamps'])}
+    solution = solve_load_order(['x', 'lamps'], rules, aliases={'fancy lamps': 'lamps'})
+    assert solution.order == ['lamps', 'x']
+    assert solution.missing == [('x', 'Nope')]
+
+
+def test_priority_decides_conflicts():
+    rules = {'a': LoadRules(priority=5), 'b': LoadRules(priority=1)}
+    conflicts = {'Brickadia/Content/A.uasset': ['a', 'b']}
+    assert solve_load_order(['a', 'b', 'c'], rules, conflicts).order == ['b', 'a', 'c']
+
+
+def test_rules_beat_priority():
+    rules = {'a': LoadRules(priority=5, load_before=['b']), 'b': LoadRules(priority=1)}
+    conflicts = {'Brickadia/Content/A.uasset': ['a', 'b']}
+    solution = solve_load_order(['a', 'b'], rules, conflicts)
+    assert solution.order == ['a', 'b']
+    assert solution.cycles == []
@@ -0,0 +1,122 @@
+import json
+
+from brickadia_mods import SQLiteModDatabase, SQLiteProfileStore
+
+
+def record(name, **fields):
+    mod = {'name': name, 'folder': f'/store/{name}', 'files': [f'{name}.pak'], 'enabled': False}
+    mod.update(fields)
+    return mod
+
+
+def legacy_files(tmp_path):
+    mods = {
+        'm1': record('Lamps', author='Ann', hashes={'Lamps.pak': 'aa'}),
+        'm2': record('Cars', enabled=True, load_order=1024),
+        'm3': record('Lamps Copy', hashes={'Lamps Copy.pak': 'aa'}),
+    }
+    (tmp_path / 'mods.json').write_text(json.dumps(mods))
+    (tmp_path / 'profiles.json').write_text(json.dumps({'Race': ['m2']}))
+    return mods
+
+
+def test_imports_mods_json(tmp_path):
+    mods = legacy_files(tmp_path)
+    db = SQLiteModDatabase(tmp_path / 'mods.db', tmp_path / 'mods.json')
+    loaded = db.load()
+    assert loaded == mods
+    assert list(loaded) == ['m1', 'm2', 'm3']
+    assert db.enabled_ids(loaded) == ['m2']
+    assert db.ids_with_file(loaded, 'cars.PAK') == ['m2']
+    assert sorted(db.ids_with_hash(loaded, 'aa')) == ['m1', 'm3']
+    db.close()
+
+    # The JSON files are left alone and not imported a second time
+    assert json.loads((tmp_path / 'mods.json').read_text()) == mods
+    (tmp_path / 'mods.json').write_text(json.dumps({'m9': record('Other')}))
+    db = SQLiteModDatabase(tmp_path / 'mods.db', tmp_path / 'mods.json')
+    assert list(db.load()) == ['m1', 'm2', 'm3']
+    db.close()
+
+
+def test_empty_library_is_not_imported_later(tmp_path):
+    db = SQLiteModDatabase(tmp_path / 'mods.db', tmp_path / 'mods.json')
+    assert db.load() == {}
+    db.close()
+    legacy_files(tmp_path)
+    db = SQLiteModDatabase(tmp_path / 'mods.db', tmp_path / 'mods.json')
+    assert db.load() == {}
+    db.close()
+
+
+def test_imports_profiles(tmp_path):
+    legacy_files(tmp_path)
+    db = SQLiteModDatabase(tmp_path / 'mods.db', tmp_path / 'mods.json')
+    db.load()
+    profiles = db.profile_store(tmp_path / 'profiles.json')
+    assert isinstance(profiles, SQLiteProfileStore)
+    assert profiles.names() == ['Race']
+    assert profiles.get('Race') == ['m2']
+    db.close()
+
+
+def test_flush_writes_only_marked_mods(tmp_path):
+    legacy_files(tmp_path)
+    db = SQLiteModDatabase(tmp_path / 'mods.db', tmp_path / 'mods.json')
+    mods = db.load()
+    writes = db.writes
+
+    mods['m1']['enabled'] = True
+    mods['m3']['name'] = 'Not written'  # changed without marking it
+    del mods['m2']
+    db.mark_dirty('m1', 'm2')
+    assert db.flush(mods)
+    assert db.writes == writes + 1
+    assert not db.flush(mods)
+    db.close()
+
+    db = SQLiteModDatabase(tmp_path / 'mods.db', tmp_path / 'mods.json')
+    reloaded = db.load()
+    assert list(reloaded) == ['m1', 'm3']
+    assert reloaded['m1']['enabled']
+    assert reloaded['m3']['name'] == 'Lamps Copy'
+    db.close()
+
+
+def test_mark_dirty_without_ids_compares_everything(tmp_path):
+    legacy_files(tmp_path)
+    db = SQLiteModDatabase(tmp_path / 'mods.db', tmp_path / 'mods.json')
+    mods = db.load()
+    mods['m3']['name'] = 'Renamed'
+    mods['m4'] = record('New')
+    db.mark_dirty()
+    db.flush(mods)
+    db.close()
+
+    db = SQLiteModDatabase(tmp_path / 'mods.db', tmp_path / 'mods.json')
+    reloaded = db.load()
+    assert reloaded['m3']['name'] == 'Renamed'
+    assert list(reloaded) == ['m1', 'm2', 'm3', 'm4']
+    assert db.ids_with_file(reloaded, 'New.pak') == ['m4']
+    db.close()
+
+
+def test_queries_never_write(tmp_path):
+    legacy_files(tmp_path)
+    db = SQLiteModDatabase(tmp_path / 'mods.db', tmp_path / 'mods.json')
+    mods = db.load()
+    writes = db.writes
+
+    mods['m1']['enabled'] = True
+    mods['m1']['load_order'] = 10
+    mods['m3']['hashes'] = {'Lamps Copy.pak': 'bb'}
+    db.mark_dirty('m1', 'm3')
+    # Pending changes are answered from the records, nothing is written
+    assert db.enabled_ids(mods) == ['m1', 'm2']
+    assert db.ids_with_hash(mods, 'aa') == ['m1']
+    assert db.writes == writes and db.dirty
+
+    assert db.flush(mods)
+    assert db.enabled_ids(mods) == ['m1', 'm2']
+    assert db.ids_with_hash(mods, 'bb') == ['m3']
+    db.close()
@@ -0,0 +1,56 @@
+import os
+
+import pytest
+
+from brickadia_mods import ThumbnailCache
+from brickadia_mods.thumbnails import ORDER_ICON_SIZE, TREE_ICON_SIZE
+
+Image = pytest.importorskip('PIL.Image')
+
+
+@pytest.fixture
+def icon(tmp_path):
+    path = tmp_path / 'icon.png'
+    Image.new('RGB', (256, 256), 'red').save(path)
+    return path
+
+
+def test_generate_makes_each_size(tmp_path, icon):
+    cache = ThumbnailCache.for_storage(tmp_path)
+    thumbnails = cache.generate(str(icon))
+    assert sorted(thumbnails) == [ORDER_ICON_SIZE, TREE_ICON_SIZE]
+    for size, path in thumbnails.items():
+        with Image.open(path) as img:
+            assert img.size == (size, size)
+    assert cache.get(str(icon), TREE_ICON_SIZE) == thumbnails[TREE_ICON_SIZE]
+    assert not list(cache.folder.glob('*.tmp'))
+
+
+def test_changed_icon_gets_a_new_thumbnail(tmp_path, icon):
+    cache = ThumbnailCache.for_storage(tmp_path)
+    old = cache.generate(str(icon), (TREE_ICON_SIZE,))[TREE_ICON_SIZE]
+    Image.new('RGB', (128, 128), 'blue').save(icon)
+    mtime = os.stat(icon).st_mtime_ns + 10**9
+    os.utime(icon, ns=(mtime, mtime))
+    assert cache.get(str(icon), TREE_ICON_SIZE) is None
+
+    new = cache.generate(str(icon), (TREE_ICON_SIZE,))[TREE_ICON_SIZE]
+    assert new != old
+    assert list(cache.folder.iterdir()) == [new]
+
+
+def test_forget_deletes_every_size(tmp_path, icon):
+    cache = ThumbnailCache.for_storage(tmp_path)
+    cache.generate_for([{'icon': str(icon)}, {'name': 'no icon'}])
+    assert len(list(cache.folder.iterdir())) == 2
+    cache.forget(str(icon))
+    assert not list(cache.folder.iterdir())
+
+
+def test_unreadable_icons_give_no_thumbnails(tmp_path):
+    broken = tmp_path / 'icon.png'
+    broken.write_bytes(b'not an image')
+    cache = ThumbnailCache.for_storage(tmp_path)
+    assert cache.generate(str(broken)) == {}
+    assert cache.generate(str(tmp_path / 'missing.png')) == {}
+    assert cache.get('', TREE_ICON_SIZE) is None